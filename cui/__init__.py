@@ -3,14 +3,16 @@
 # SPDX-FileCopyrightText: 2021 grommunio GmbH
 """The main module of grommunio-cui."""
 import sys
+import time
 from typing import Tuple, Union
+from cui.profiling import profiler
+_IMPORT_START = time.monotonic()
 # from pudb.remote import set_trace
 import urwid
 from cui import classes
 from cui.classes.gwidgets import GText, GEdit
 from cui import util, parameter
 from cui import distro, localetime, network  # noqa: F401  pulled in for `cui.distro` etc.
-import cui.classes.parser
 from cui.classes.application import Header, MainFrame, GScreen, ButtonStore
 from cui.classes.handler import ApplicationHandler
 from cui.classes.scroll import ScrollBar, Scrollable
@@ -20,10 +22,10 @@ from cui.symbol import PRODUCTION, MAIN, MAIN_MENU, TERMINAL, LOGIN, REBOOT, SHU
     UNSUPPORTED, PASSWORD, MESSAGE_BOX, INPUT_BOX, LOG_VIEWER, ADMIN_WEB_PW, TIMESYNCD, \
     KEYBOARD_SWITCH, REPO_SELECTION
 
-try:
-    import asyncio
-except ImportError:
-    import trollius as asyncio
+if __name__ != "__main__":
+    # Run as a script, this file is executed a second time as `cui` by the
+    # imports above; that run already measured the real import time.
+    profiler.add("module imports", _IMPORT_START)
 
 _ = util.init_localization()
 
@@ -41,8 +43,13 @@ def create_application() -> Tuple[Union[Application, None], bool]:
         print(_("\tOPTIONS:"))
         print(_("\t\t--help: Show this message."))
         print(_("\t\t-v/--debug: Verbose/Debugging mode."))
+        print(_("\t\t--profile-startup[=FILE]: Report startup phase timings to stderr "
+                "or FILE."))
+        print(_("\t\t--render-stats[=FILE]: Report key-to-paint latency and render "
+                "times per window to stderr or FILE on exit."))
         return None, PRODUCTION
-    app = Application()
+    with profiler.phase("Application() total"):
+        app = Application()
     if "-v" in sys.argv:
         app.set_debug(True)
     else:
@@ -56,14 +63,14 @@ def create_application() -> Tuple[Union[Application, None], bool]:
     return app, production
 
 
-def main_app(immediate_restart: bool = False):
+def main_app():
     """Starts main application."""
     # application, PRODUCTION = create_application()
     application = create_application()[0]
     # application.set_debug(True)
     # application.gscreen.quiet = False
     # # PRODUCTION = False
-    application.start(immediate_restart)
+    application.start()
     print("\n\x1b[J")
 
 
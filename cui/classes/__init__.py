@@ -5,6 +5,6 @@ import cui.classes.application
 import cui.classes.button
 import cui.classes.gwidgets
 import cui.classes.interface
+import cui.classes.loop
 import cui.classes.menu
-import cui.classes.parser
 import cui.classes.scroll
@@ -3,7 +3,9 @@
 """In this module all application classes are hold."""
 import os
 import subprocess
-from typing import Optional, List, Union, Tuple, Any, Dict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Optional, List, Union, Tuple, Any, Dict, Callable, Set
 
 import urwid
 
@@ -16,15 +18,17 @@ import cui.classes.menu
 import cui.symbol
 import cui.util
 from cui.classes.interface import BaseApplication
-from cui.classes.gwidgets import GText, GEdit
+from cui.classes.gwidgets import GText, GEdit, GTail, GLineList
 from cui.classes.scroll import ScrollBar
 from cui.classes.menu import MenuItem
 from cui.classes.button import GBoxButton
+from cui.localization import localization
 
 _ = cui.util.init_localization()
 
+# Untranslated, so they match in whatever language the menu is shown
 ADMIN_DEPENDENT_MENU_CAPTIONS = [
-    _('Change admin-web password')
+    'Change admin-web password'
 ]
 
 
@@ -36,9 +40,31 @@ class SetupState:
     is_tymsyncd_upset: bool = False
     is_nginx_upset: bool = False
     is_grommunio_admin_installed: bool = False
+    # (state attribute, probe method, error points if the state is not set)
+    PROBES: Tuple[Tuple[str, str, int], ...] = (
+        ("is_system_pw_upset", "check_system_pw", 1),
+        ("is_network_upset", "check_network_config", 2),
+        ("is_grommunio_upset", "check_grommunio_setup", 4),
+        # give 0 error points cause timesyncd configuration is not necessarily
+        # needed.
+        ("is_tymsyncd_upset", "check_timesyncd_config", 0),
+        ("is_nginx_upset", "check_nginx_config", 16),
+        ("is_grommunio_admin_installed", "check_grommunio_admin", 32),
+    )
+    # Seconds a single probe may block on a socket or a subprocess
+    probe_timeout: float = 3.0
+    # State attributes whose probe has not finished yet
+    pending: Set[str]
+    _executor: Optional[ThreadPoolExecutor] = None
+
+    def __init__(self):
+        self.pending = set()
+
+    def check_system_pw(self):
+        return cui.util.check_if_password_is_set("root")
 
     def check_network_config(self):
-        return cui.util.check_socket("127.0.0.1", 22)
+        return cui.util.check_socket("127.0.0.1", 22, timeout=self.probe_timeout)
 
     def check_grommunio_setup(self):
         # return os.path.isfile('/etc/grommunio/setup_done')
@@ -48,7 +74,9 @@ class SetupState:
 
     def check_timesyncd_config(self):
         try:
-            out = subprocess.check_output(["timedatectl", "status"]).decode()
+            out = subprocess.check_output(
+                ["timedatectl", "status"], timeout=self.probe_timeout
+            ).decode()
             items = {}
             for line in out.splitlines():
                 key, value = line.partition(":")[::2]
@@ -58,50 +86,55 @@ class SetupState:
                 and items.get("NTP synchronized") == "yes"
             ):
                 return True
-        except OSError:
+        except (OSError, subprocess.SubprocessError):
             pass
         return False
 
     def check_nginx_config(self):
-        return cui.util.check_socket("127.0.0.1", 8080)
-
-    def set_setup_states(self):
-        # check if pw is set
-        self.is_system_pw_upset = cui.util.check_if_password_is_set("root")
-        # check network config (2)
-        self.is_network_upset = self.check_network_config()
-        # check grommunio-setup config (4)
-        self.is_grommunio_upset = self.check_grommunio_setup()
-        # check timesyncd config (8)
-        self.is_tymsyncd_upset = self.check_timesyncd_config()
-            # give 0 error points cause timesyncd configuration is not necessarily
-            # needed.
-        # check nginx config (16)
-        self.is_nginx_upset = self.check_nginx_config()
-        self.is_grommunio_admin_installed = cui.util.check_if_gradmin_exists()
+        return cui.util.check_socket("127.0.0.1", 8080, timeout=self.probe_timeout)
+
+    def check_grommunio_admin(self):
+        return cui.util.check_if_gradmin_exists()
+
+    def refresh(self, notify: Optional[Callable[[], Any]] = None) -> List[Future]:
+        """
+        Start all probes in a worker pool and return their futures.
+
+        Each state keeps its last value and is listed in pending until its
+        probe finished. notify is called from the worker thread after every
+        finished probe.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=len(self.PROBES), thread_name_prefix="setup-probe"
+            )
+        futures: List[Future] = []
+        for attribute, check, _points in self.PROBES:
+            if attribute in self.pending:
+                # Still running from an earlier refresh
+                continue
+            self.pending.add(attribute)
+            future = self._executor.submit(getattr(self, check))
+            future.add_done_callback(partial(self._probe_done, attribute, notify))
+            futures.append(future)
+        return futures
+
+    def _probe_done(self, attribute: str, notify: Optional[Callable[[], Any]], future: Future):
+        """Store the result of a finished probe and notify the caller."""
+        try:
+            setattr(self, attribute, bool(future.result()))
+        except Exception:  # pylint: disable=broad-except
+            setattr(self, attribute, False)
+        self.pending.discard(attribute)
+        if notify:
+            notify()
 
     def check_setup_state(self):
+        """Return the error points of all finished probes."""
         ret_val = 0
-        # check if pw is set
-        if not self.is_system_pw_upset:
-            ret_val += 1
-        # check network config (2)
-        if not self.is_network_upset:
-            ret_val += 2
-        # check grommunio-setup config (4)
-        if not self.is_grommunio_upset:
-            ret_val += 4
-        # check timesyncd config (8)
-        if not self.is_tymsyncd_upset:
-            # give 0 error points cause timesyncd configuration is not necessarily
-            # needed.
-            ret_val += 0
-        # check nginx config (16)
-        if not self.is_nginx_upset:
-            ret_val += 16
-        # check grommunio-admin installed (32)
-        if not self.is_grommunio_admin_installed:
-            ret_val += 32
+        for attribute, _check, points in self.PROBES:
+            if attribute not in self.pending and not getattr(self, attribute):
+                ret_val += points
         return ret_val
 
 
@@ -113,13 +146,25 @@ class Header:
 
     class Info:
         """The Info class contains additional information"""
-        header: GText
+        header: Optional[urwid.AttrMap] = None
         app: BaseApplication
         authorized_options: str = ""
-        kbdlayout: str = cui.util.get_current_kbdlayout()
+        # Resolved on first use, so importing this module never asks localectl
+        _kbdlayout: Optional[str] = None
         # The default color palette
         colormode: str = "light"
 
+        @property
+        def kbdlayout(self) -> str:
+            """Return the keyboard layout, querying the host only once"""
+            if self._kbdlayout is None:
+                self._kbdlayout = cui.util.get_current_kbdlayout()
+            return self._kbdlayout
+
+        @kbdlayout.setter
+        def kbdlayout(self, kbdlayout: str):
+            self._kbdlayout = kbdlayout
+
         def debug_out(self, msg):
             """Prints all elements of the class. """
             for elem in dir(self):
@@ -141,6 +186,11 @@ class Header:
 
         def __init__(self, info):
             self.info_ref = info
+            self.text_header = []
+            self.tb_intro = GText("", align=urwid.CENTER, wrap=urwid.SPACE)
+            self.tb_sysinfo_top = GText("", align=urwid.LEFT, wrap=urwid.SPACE)
+            self.tb_sysinfo_bottom = GText("", align=urwid.LEFT, wrap=urwid.SPACE)
+            self.tb_header = GText("", align=urwid.CENTER, wrap=urwid.SPACE)
             self.refresh_content()
 
         def refresh_content(self):
@@ -156,18 +206,12 @@ class Header:
                 _("If you need help, press the 'L' key to view logs."),
                 "\n",
             ]
-            self.tb_intro = GText(
-                text_intro, align=urwid.CENTER, wrap=urwid.SPACE
-            )
-            text_sysinfo_top = cui.util.get_system_info("top")
-            self.tb_sysinfo_top = GText(
-                text_sysinfo_top, align=urwid.LEFT, wrap=urwid.SPACE
-            )
-            text_sysinfo_bottom = cui.util.get_system_info("bottom")
-            self.tb_sysinfo_bottom = GText(
-                text_sysinfo_bottom, align=urwid.LEFT, wrap=urwid.SPACE
-            )
-            self.tb_header = GText(self.text, align=urwid.CENTER, wrap=urwid.SPACE,)
+            # The widgets are kept and only their text is replaced, so the
+            # MainFrame built around them always shows the current content.
+            self.tb_intro.set_text(text_intro)
+            self.tb_sysinfo_top.set_text(cui.util.get_system_info("top"))
+            self.tb_sysinfo_bottom.set_text(cui.util.get_system_info("bottom"))
+            self.tb_header.set_text(self.text)
 
         def debug_out(self, msg):
             """Prints all elements of the class. """
@@ -184,8 +228,10 @@ class Header:
                 authorized_options=self.info_ref.authorized_options,
             )
 
-    info: Info = Info()
-    tb: TextBlock = TextBlock(info)
+    info: Info
+    _tb: Optional[TextBlock] = None
+    # Set whenever something shown in the head text changed
+    dirty: bool = True
     _app: BaseApplication
 
     def __init__(
@@ -194,6 +240,7 @@ class Header:
             kbd_layout: str = None,
             application: BaseApplication = None
     ):
+        self.info = self.Info()
         if colormode:
             self.info.colormode = colormode
         if kbd_layout:
@@ -201,11 +248,18 @@ class Header:
         if application:
             self.info.app = application
         self.info.authorized_options = ""
-        self.refresh_content()
+
+    @property
+    def tb(self) -> TextBlock:
+        """Return the text block, collecting the system info on first use"""
+        if self._tb is None:
+            self._tb = self.TextBlock(self.info)
+        return self._tb
 
     def refresh_content(self):
         """Refresh header content and translate"""
         self.tb.refresh_content()
+        self.dirty = False
 
     def set_app(self, application: BaseApplication):
         """Set the main app"""
@@ -213,7 +267,9 @@ class Header:
 
     def set_kbdlayout(self, kbdlayout):
         """Set the keyboard layout"""
-        self.info.kbdlayout = kbdlayout
+        if kbdlayout != self.info.kbdlayout:
+            self.info.kbdlayout = kbdlayout
+            self.dirty = True
 
     def get_kbdlayout(self):
         """Return the current keyboard layout"""
@@ -221,7 +277,9 @@ class Header:
 
     def set_colormode(self, colormode):
         """Set the color mode"""
-        self.info.colormode = colormode
+        if colormode != self.info.colormode:
+            self.info.colormode = colormode
+            self.dirty = True
 
     def get_colormode(self):
         """return the mode of color"""
@@ -229,26 +287,27 @@ class Header:
 
     def set_authorized_options(self, options):
         """Set the authorized options"""
-        self.info.authorized_options = options
+        if options != self.info.authorized_options:
+            self.info.authorized_options = options
+            self.dirty = True
 
     def get_authorized_options(self):
         """Return the authorized options"""
         return self.info.authorized_options
 
     def refresh_header(self):
-        """Refresh header"""
-        self.refresh_head_text()
-        self.info.header = urwid.AttrMap(
-            urwid.Padding(self.tb.tb_header, align=urwid.CENTER), "header"
-        )
-        if getattr(self.info, "app", None):
-            if getattr(self.info.app, "view", None):
-                self.info.app.view.top_main_menu.refresh_main_menu()
-        self.refresh_content()
+        """Refresh the head text if something shown in it changed"""
+        if getattr(self.info, "header", None) is None:
+            self.info.header = urwid.AttrMap(
+                urwid.Padding(self.tb.tb_header, align=urwid.CENTER), "header"
+            )
+        if self.dirty:
+            self.refresh_head_text()
 
     def refresh_head_text(self):
         """Refresh head text."""
         self.tb.tb_header.set_text(self.tb.text)
+        self.dirty = False
 
     def debug_out(self, msg):
         """Prints all elements of the class. """
@@ -341,8 +400,13 @@ class MainMenu:
     current_menu_focus: int = -1
     last_menu_focus: int = -2
     menu_description: urwid.Widget
-    main_menu: urwid.Frame
+    main_menu: Optional[urwid.Frame] = None
     main_menu_list: urwid.ListBox
+    description_box: urwid.ListBox
+    # Language the menu model was built in
+    _language: Optional[str] = None
+    # Whether the admin dependent items are enabled, None until first applied
+    _admin_enabled: Optional[bool] = None
     _app: BaseApplication
 
     def __init__(self, application: BaseApplication):
@@ -394,7 +458,56 @@ class MainMenu:
         return self.current_menu_focus
 
     def refresh_main_menu(self):
-        """Refresh main menu."""
+        """
+        Refresh main menu.
+
+        The menu model is built once per language; afterwards only the focus
+        and the state of the admin dependent items are updated.
+        """
+        if self.main_menu is None or self._language != localization.language:
+            self._build_main_menu()
+        self.refresh_admin_state()
+        if self.app.control.app_control.current_window != cui.symbol.MAIN_MENU:
+            return
+        if self.current_menu_focus > 0:
+            position = min(self.current_menu_focus, len(self.main_menu_list.body)) - 1
+            self.main_menu_list.focus_position = position
+            self.description_box.body[0] = \
+                self.main_menu_list.body[position].base_widget.get_description()
+        self.app.control.app_control.loop.widget = self.main_menu
+        self.app.control.app_control.body = self.main_menu
+
+    def refresh_admin_state(self):
+        """Enable the admin dependent items if grommunio-admin is installed."""
+        if "is_grommunio_admin_installed" in setup_state.pending \
+                and self._admin_enabled is not None:
+            # Keep the last result until the running probe has finished
+            return
+        if "is_grommunio_admin_installed" in setup_state.pending:
+            enabled = cui.util.check_if_gradmin_exists()
+        else:
+            enabled = setup_state.is_grommunio_admin_installed
+        if enabled == self._admin_enabled:
+            return
+        self._admin_enabled = enabled
+        captions = [_(msg) for msg in ADMIN_DEPENDENT_MENU_CAPTIONS]
+        for entry in self.main_menu_list.body:
+            item: MenuItem = entry.base_widget
+            if item.text not in captions:
+                continue
+            urwid.disconnect_signal(item, "activate", self.app.handle_nothing)
+            urwid.disconnect_signal(item, "activate", self.app.handle_event)
+            if enabled:
+                urwid.connect_signal(item, "activate", self.app.handle_event)
+                entry.set_attr_map({None: "selectable"})
+                item.enable()
+            else:
+                urwid.connect_signal(item, "activate", self.app.handle_nothing)
+                entry.set_attr_map({None: "disabled"})
+                item.disable()
+
+    def _build_main_menu(self):
+        """Build the main menu model in the current language."""
 
         def create_menu_description(description_title, description):
             item: urwid.Pile = urwid.Pile([
@@ -480,19 +593,10 @@ class MainMenu:
         }
         if os.getppid() != 1:
             items["Exit"] = urwid.Pile([GText(_("Exit CUI"), urwid.CENTER)])
-        self.app.view.top_main_menu.main_menu_list = self._prepare_menu_list(items)
-        if self.app.control.app_control.current_window == cui.symbol.MAIN_MENU \
-                and self.app.view.top_main_menu.current_menu_focus > 0:
-            off: int = 1
-            if self.app.control.app_control.last_current_window == cui.symbol.MAIN_MENU:
-                off = 1
-            self.app.view.top_main_menu.main_menu_list.focus_position = \
-                self.app.view.top_main_menu.current_menu_focus - off
-        self.app.view.top_main_menu.main_menu = self._menu_to_frame(
-            self.app.view.top_main_menu.main_menu_list)
-        if self.app.control.app_control.current_window == cui.symbol.MAIN_MENU:
-            self.app.control.app_control.loop.widget = self.app.view.top_main_menu.main_menu
-            self.app.control.app_control.body = self.app.view.top_main_menu.main_menu
+        self.main_menu_list = self._prepare_menu_list(items)
+        self.main_menu = self._menu_to_frame(self.main_menu_list)
+        self._language = localization.language
+        self._admin_enabled = None
 
     def _prepare_menu_list(self, items: Dict[str, urwid.Widget]) -> urwid.ListBox:
         """
@@ -507,10 +611,11 @@ class MainMenu:
     def _menu_to_frame(self, listbox: urwid.ListBox):
         """Put menu(urwid.ListBox) into a urwid.Frame."""
         fopos: int = listbox.focus_position
+        self.description_box = urwid.ListBox(urwid.SimpleListWalker([
+            listbox.body[fopos].original_widget.get_description()
+        ]))
         menu = urwid.Columns([
-            urwid.AttrMap(listbox, "body"), urwid.AttrMap(urwid.ListBox(urwid.SimpleListWalker([
-                listbox.body[fopos].original_widget.get_description()
-            ])), "reverse", ),
+            urwid.AttrMap(listbox, "body"), urwid.AttrMap(self.description_box, "reverse", ),
         ])
         return urwid.Frame(menu, header=self.app.view.header.info.header,
                            footer=self.app.view.main_footer.footer)
@@ -527,14 +632,8 @@ class MainMenu:
         for idx, caption in enumerate(items.keys(), 1):
             if getattr(self, "app", None):
                 item = MenuItem(idx, caption, items.get(caption), self.app)
-                if not cui.util.check_if_gradmin_exists() and _(caption) in ADMIN_DEPENDENT_MENU_CAPTIONS:
-                    urwid.connect_signal(item, "activate", self.app.handle_nothing)
-                    attr = "disabled"
-                    item.disable()
-                else:
-                    urwid.connect_signal(item, "activate", self.app.handle_event)
-                    attr = "selectable"
-                menu_items.append(urwid.AttrMap(item, attr, "focus"))
+                urwid.connect_signal(item, "activate", self.app.handle_event)
+                menu_items.append(urwid.AttrMap(item, "selectable", "focus"))
         return menu_items
 
     def debug_out(self, msg):
@@ -630,6 +729,54 @@ class ButtonStore:
         return self.app is not None
 
 
+class DialogRegistry:
+    """
+    The DialogRegistry builds dialog widgets on first use and hands out the
+    cached instance afterwards. Whoever changes the data a dialog shows has
+    to invalidate it, so it gets rebuilt on the next use.
+    """
+    _factories: Dict[str, Callable[..., Any]]
+    _dialogs: Dict[str, Any]
+
+    def __init__(self):
+        self._factories = {}
+        self._dialogs = {}
+
+    def register(self, name: str, factory: Callable[..., Any]):
+        """Register the factory building the dialog name."""
+        self._factories[name] = factory
+
+    def get(self, name: str, *args) -> Any:
+        """Return dialog name, building it with factory(*args) if needed.
+
+        A factory returning None (e.g. no data available) is asked again on
+        the next call.
+        """
+        if name not in self._dialogs:
+            dialog = self._factories[name](*args)
+            if dialog is None:
+                return None
+            self._dialogs[name] = dialog
+        return self._dialogs[name]
+
+    def is_built(self, name: str) -> bool:
+        """Return whether dialog name is currently cached."""
+        return name in self._dialogs
+
+    def invalidate(self, *names: str):
+        """Drop the given dialogs, or every dialog if no name is given."""
+        if not names:
+            self._dialogs.clear()
+        for name in names:
+            self._dialogs.pop(name, None)
+
+    def debug_out(self, msg):
+        """Prints all elements of the class. """
+        for elem in dir(self):
+            print(elem)
+        print(msg)
+
+
 class LoginWindow:
     """The LoginControl class contains all login controlling code."""
     login_body: Optional[urwid.Widget]
@@ -669,6 +816,8 @@ class ApplicationControl:
     last_input_box_value: str = ""
     log_file_caller: str = ""
     log_file_caller_body: urwid.Widget = None
+    busy_caller: str = ""
+    busy_caller_body: urwid.Widget = None
     current_event = ""
     current_bottom_info = _("Idle")
     menu_items: List[str] = []
@@ -704,6 +853,7 @@ class ApplicationControl:
 class MenuControl:
     """The MenuControl class contains all menu controlling code."""
     repo_selection_body: urwid.LineBox
+    repo_defaults: Dict[str, Any] = {}
     timesyncd_vars: Dict[str, str] = {}
     keyboard_rb: List
     keyboard_content: List
@@ -738,6 +888,50 @@ class LogControl:
     log_line_count: int = 200
     log_finished: bool = False
     log_viewer: urwid.LineBox
+    # The unit shown, and whether the logs of all units are shown merged
+    # instead, except for the hidden ones
+    log_unit: str = ""
+    log_merged: bool = False
+    log_hidden_units: Tuple[str, ...] = ()
+    # (units, journal state) the cached log viewer was built for
+    log_viewer_stamp: Tuple = ()
+    # The journal read of the shown unit
+    log_tail: Optional["cui.journal.JournalTail"] = None
+    # The line widgets and the header of the cached log viewer
+    log_lines: Optional[urwid.Pile] = None
+    log_header: Optional[GText] = None
+    # Holds the scrolled lines, or the followed lines in follow mode
+    log_body: Optional[urwid.WidgetPlaceholder] = None
+    # Follow mode: the reader of new entries, the lines and their view, the
+    # handles of the watched file descriptor and of the redraw alarm, and the
+    # buffer version shown
+    log_follow: Optional["cui.journal.JournalFollow"] = None
+    log_buffer: Optional["cui.journal.LogBuffer"] = None
+    log_follow_tail: Optional[GTail] = None
+    log_follow_handle: Any = None
+    log_follow_alarm: Any = None
+    log_follow_seen: int = -1
+    # The filter of the shown lines, and whether its text is being typed; the
+    # journal module is imported when the log viewer is first prepared
+    log_filter: Optional["cui.journal.LogFilter"] = None
+    log_filter_editing: bool = False
+    # The row showing the filter, and the row widget of every line read
+    log_filter_row: Optional[GText] = None
+    log_rows: List[GText] = []
+    # The positions of the rows shown for log_shown_filter, None if all are
+    # shown, and those of the rows with highlighted matches
+    log_shown: Optional[List[int]] = None
+    log_shown_filter: Optional["cui.journal.LogFilter"] = None
+    log_marked: Set[int] = set()
+    # The search of all logfiles, its input fields, status and results
+    log_search: Optional["cui.journal.JournalSearch"] = None
+    log_search_edit: Optional[GEdit] = None
+    log_search_since: Optional[GEdit] = None
+    log_search_until: Optional[GEdit] = None
+    log_search_status: Optional[GText] = None
+    log_search_results: Optional[GLineList] = None
+    # The cursor of the search result the log viewer shows the context of
+    log_cursor: str = ""
     # The hidden input string
     hidden_input: str = ""
     hidden_pos: int = 0
@@ -794,11 +988,64 @@ class Control:
 
 
 class Footer:
-    """The Footer class contains all footer elements."""
+    """
+    The Footer class contains all footer elements.
+
+    The footer is built once; its cells are updated in place with set_text
+    and only laid out again if a cell width or the screen width changed.
+    """
     footer_content = []
-    footer: urwid.Pile
+    footer: urwid.AttrMap
+    clock: GText
+    footerbar: GText
+    avg_load: GText
+    status: GText
+    debug_info: GText
+    # (screen columns, cell widths, quiet, debug) of the current layout
+    _layout: Tuple = ()
     _app: BaseApplication
 
+    def __init__(self):
+        self.clock = GText("", right=1)
+        self.footerbar = GText("", left=1, right=0)
+        self.avg_load = GText("", left=1, right=2)
+        self.status = GText("", left=1, right=2)
+        self.debug_info = GText("")
+        self._pile = urwid.Pile([])
+        self.footer = urwid.AttrMap(self._pile, "footer")
+
+    def tick(self):
+        """Update the clock and the load cells."""
+        self.clock.set_text(cui.util.get_clockstring())
+        self.avg_load.set_text(cui.util.get_load_avg_format_list())
+
+    def layout(self, cols: int, quiet: bool, debug: bool) -> bool:
+        """Arrange the cells in rows of cols width, return True if that changed."""
+        elements = [self.clock, self.footerbar, self.avg_load]
+        if not quiet:
+            elements += [self.status]
+        layout = (cols, tuple(len(elem) for elem in elements), quiet, debug)
+        if layout == self._layout:
+            return False
+        self._layout = layout
+        content = []
+        rest = []
+        width = 0
+        for elem in elements:
+            if width + len(elem) < cols:
+                content.append(elem)
+                width += len(elem)
+            else:
+                rest.append(elem)
+        col_list = [urwid.Columns([(len(elem), elem) for elem in content])]
+        if len(rest) > 0:
+            col_list += [urwid.Columns([(len(elem), elem) for elem in rest])]
+        if debug:
+            col_list += [urwid.Columns([self.debug_info])]
+        self.footer_content = col_list
+        self._pile.contents = [(elem, self._pile.options()) for elem in col_list]
+        return True
+
     def debug_out(self, msg):
         """Prints all elements of the class. """
         for elem in dir(self):
@@ -822,16 +1069,20 @@ class Footer:
 class View:
     """The view class contains all view elements that are visible"""
     main_frame: MainFrame
-    header: Header = Header()
+    header: Header
     top_main_menu: MainMenu
-    main_footer: Footer = Footer()
+    main_footer: Footer
     gscreen: GScreen
     button_store: ButtonStore = ButtonStore()
     login_window: LoginWindow = LoginWindow()
+    dialogs: DialogRegistry
     _app: BaseApplication
 
     def __init__(self, application: BaseApplication):
         self.app = application
+        self.header = Header()
+        self.main_footer = Footer()
+        self.dialogs = DialogRegistry()
         self.top_main_menu = MainMenu(self.app)
 
     def debug_out(self, msg):
@@ -1,10 +1,14 @@
 # SPDX-License-Identifier: AGPL-3.0-or-later
 # SPDX-FileCopyrightText: 2021 grommunio GmbH
 """The gwidgets module contains all grommunio widgets"""
-from typing import Any, Tuple
+import bisect
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 import urwid
 
+from cui.classes.scroll import ScrollBar
+
 
 class GText(urwid.WidgetWrap):
     """The grommunio Text field widget"""
@@ -183,3 +187,396 @@ class GEdit(urwid.WidgetWrap):
                   interact with, ``False`` otherwise,
         """
         return self._selectable
+
+
+class GTail(urwid.Widget):
+    """
+    Box widget showing the end of a cui.pkgupdate.Scrollback.
+
+    Only the lines fitting into the box are rendered, so the size of the
+    buffer does not matter. offset scrolls back from the end.
+    """
+    _sizing = frozenset([urwid.BOX])
+    _selectable = False
+    offset: int = 0
+
+    def __init__(self, scrollback):
+        super().__init__()
+        self.scrollback = scrollback
+        self._rows = 1
+
+    def refresh(self):
+        """Show the new output on the next draw."""
+        self._invalidate()
+
+    def scroll(self, lines: int):
+        """Scroll back (positive) or forward (negative) by lines."""
+        limit = max(len(self.scrollback) - self._rows, 0)
+        self.offset = min(max(self.offset + lines, 0), limit)
+        self._invalidate()
+
+    def render(self, size: Tuple[int, int], focus: bool = False) -> urwid.Canvas:
+        cols, rows = size
+        self._rows = rows
+        text = []
+        for line in self.scrollback.tail(rows, self.offset):
+            end = urwid.util.calc_text_pos(line, 0, len(line), cols)[0]
+            text.append(line[:end].encode("utf-8"))
+        text += [b""] * (rows - len(text))
+        return urwid.TextCanvas(text, maxcol=cols)
+
+
+class ChoiceIndex:
+    """
+    Type-ahead matching of choices.
+
+    The words of the choices (split at "/", "_", "-", "." and blanks) and the
+    choices themselves are kept in a sorted array, so the choices with a
+    word starting with the query are found by bisection. A query without
+    such a match falls back to the choices containing it, then to those
+    containing its letters in order. While the query is only extended, the
+    fallback looks at the previous fallback matches only.
+    """
+    _WORDS = re.compile(r"[^/_\-.\s]+")
+
+    def __init__(self, choices: Sequence[str]):
+        self._lowered = [choice.lower() for choice in choices]
+        entries = sorted(
+            (word, index)
+            for index, choice in enumerate(self._lowered)
+            for word in {choice, *self._WORDS.findall(choice)}
+        )
+        self._words = [word for word, _ in entries]
+        self._indices = [index for _, index in entries]
+        # Last fallback query and the choices containing its letters in order
+        self._fuzzy: Tuple[str, Sequence[int]] = ("", range(len(self._lowered)))
+
+    def match(self, query: str) -> Sequence[int]:
+        """Return the indices of the choices matching query, in their order."""
+        query = query.strip().lower()
+        if not query:
+            return range(len(self._lowered))
+        found = set()
+        for pos in range(bisect.bisect_left(self._words, query), len(self._words)):
+            if not self._words[pos].startswith(query):
+                break
+            found.add(self._indices[pos])
+        if found:
+            return sorted(found)
+        last_query, candidates = self._fuzzy
+        if not query.startswith(last_query):
+            candidates = range(len(self._lowered))
+        fuzzy = [i for i in candidates if self._in_order(query, self._lowered[i])]
+        self._fuzzy = (query, fuzzy)
+        return [i for i in fuzzy if query in self._lowered[i]] or fuzzy
+
+    @staticmethod
+    def _in_order(query: str, text: str) -> bool:
+        rest = iter(text)
+        return all(char in rest for char in query)
+
+
+class RadioListWalker(urwid.ListWalker):
+    """
+    List walker over the choices of a radio list.
+
+    The state of every choice is kept in the states array; radio buttons are
+    created only for the positions the list box asks for, i.e. the visible
+    ones, and a bounded number of them is kept. view holds the indices of
+    the choices shown, in ascending order; positions are indices into view.
+    """
+    # Radio buttons kept before the cache is started anew
+    ROW_CACHE_SIZE: int = 256
+
+    def __init__(self, choices: Sequence[str]):
+        self.choices = list(choices)
+        self.states = [False] * len(self.choices)
+        self.view: Sequence[int] = range(len(self.choices))
+        self.focus = 0
+        self._selected: Optional[int] = None
+        self._rows: Dict[int, urwid.Widget] = {}
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    def __getitem__(self, position: int) -> urwid.Widget:
+        if not 0 <= position < len(self.view):
+            raise IndexError(position)
+        index = self.view[position]
+        row = self._rows.get(index)
+        if row is None:
+            if len(self._rows) >= self.ROW_CACHE_SIZE:
+                self._rows = {}
+            button = urwid.RadioButton([], self.choices[index], self.states[index])
+            urwid.connect_signal(button, "change", self._changed, user_args=[index])
+            row = self._rows[index] = urwid.AttrMap(button, "selectable", "focus")
+        return row
+
+    def next_position(self, position: int) -> int:
+        if position + 1 >= len(self.view):
+            raise IndexError(position)
+        return position + 1
+
+    def prev_position(self, position: int) -> int:
+        if position <= 0:
+            raise IndexError(position)
+        return position - 1
+
+    def positions(self, reverse: bool = False):
+        """Positions for home and end"""
+        if reverse:
+            return range(len(self.view) - 1, -1, -1)
+        return range(len(self.view))
+
+    def set_focus(self, position: int):
+        self.focus = position
+        self._modified()
+
+    def position_of(self, index: int) -> Optional[int]:
+        """Return the position of the choice at index, None if it is not shown."""
+        position = bisect.bisect_left(self.view, index)
+        if position < len(self.view) and self.view[position] == index:
+            return position
+        return None
+
+    def set_view(self, view: Sequence[int]):
+        """Show the choices at the indices in view; keep the focused one if shown."""
+        focused = self.view[self.focus] if self.focus < len(self.view) else None
+        self.view = view
+        position = self.position_of(focused) if focused is not None else None
+        self.focus = position or 0
+        self._modified()
+
+    def _changed(self, index: int, _button, state: bool):
+        if state:
+            self.select(index)
+
+    def select(self, index: Optional[int]):
+        """Select the choice at index, or none."""
+        if self._selected is not None:
+            self._set_state(self._selected, False)
+        self._selected = index
+        if index is not None:
+            self._set_state(index, True)
+
+    def _set_state(self, index: int, state: bool):
+        self.states[index] = state
+        row = self._rows.get(index)
+        if row is not None:
+            row.original_widget.set_state(state, do_callback=False)
+
+    @property
+    def selected(self) -> str:
+        """The selected choice, "" if there is none."""
+        if self._selected is None:
+            return ""
+        return self.choices[self._selected]
+
+
+class LineListWalker(urwid.ListWalker):
+    """
+    List walker over one-row lines, which may grow while they are shown.
+
+    As in RadioListWalker, rows are created only for the positions the list
+    box asks for, and a bounded number of them is kept.
+    """
+    # Rows kept before the cache is started anew
+    ROW_CACHE_SIZE: int = 256
+
+    def __init__(self, lines: Sequence[str]):
+        self.lines = lines
+        self.focus = 0
+        self._rows: Dict[int, urwid.Widget] = {}
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __getitem__(self, position: int) -> urwid.Widget:
+        if not 0 <= position < len(self.lines):
+            raise IndexError(position)
+        row = self._rows.get(position)
+        if row is None:
+            if len(self._rows) >= self.ROW_CACHE_SIZE:
+                self._rows = {}
+            icon = urwid.SelectableIcon(self.lines[position], 0, wrap=urwid.CLIP)
+            row = self._rows[position] = urwid.AttrMap(
+                urwid.Padding(icon, left=2, right=2), "selectable", "focus"
+            )
+        return row
+
+    def next_position(self, position: int) -> int:
+        if position + 1 >= len(self.lines):
+            raise IndexError(position)
+        return position + 1
+
+    def prev_position(self, position: int) -> int:
+        if position <= 0:
+            raise IndexError(position)
+        return position - 1
+
+    def positions(self, reverse: bool = False):
+        """Positions for home and end"""
+        if reverse:
+            return range(len(self.lines) - 1, -1, -1)
+        return range(len(self.lines))
+
+    def set_focus(self, position: int):
+        self.focus = position
+        self._modified()
+
+    def set_lines(self, lines: Sequence[str]):
+        """Show lines instead, from the top."""
+        self.lines = lines
+        self.focus = 0
+        self._rows = {}
+        self._modified()
+
+    def refresh(self):
+        """Show the lines appended since the last call."""
+        self._modified()
+
+
+class OneRowListBox(urwid.ListBox):
+    """
+    List box of one-row items supporting the scrolling API of
+    cui.classes.scroll.ScrollBar without measuring its items.
+    """
+    def get_scrollpos(self, size=None, focus=False) -> int:
+        """Index of the first visible row."""
+        if not self.body:
+            return 0
+        offset = self.get_focus_offset_inset(size)[0] if size is not None else 0
+        lowest = len(self.body) - size[1] if size is not None else len(self.body) - 1
+        return max(0, min(self.focus_position - offset, lowest))
+
+    def set_scrollpos(self, position: int):
+        """Scroll the row at position to the top."""
+        if self.body:
+            self.set_focus(min(max(int(position), 0), len(self.body) - 1))
+            self.set_focus_valign("top")
+
+    def rows_max(self, size=None, focus=False) -> int:
+        """Number of rows, one per item."""
+        _ = size
+        _ = focus
+        return len(self.body)
+
+
+class GLineList(OneRowListBox):
+    """
+    List of one-row lines, e.g. search results, which may grow while shown.
+
+    Rendering and moving the focus only touch the visible rows, so the
+    number of lines does not matter. <ENTER> calls on_activate with the
+    index of the focused line.
+    """
+    def __init__(self, lines: Sequence[str], on_activate: Callable[[int], Any]):
+        super().__init__(LineListWalker(lines))
+        self.on_activate = on_activate
+
+    def set_lines(self, lines: Sequence[str]):
+        """Show lines instead, from the top."""
+        self.body.set_lines(lines)
+
+    def refresh(self):
+        """Show the lines appended since the last call."""
+        self.body.refresh()
+
+    def keypress(self, size, key):
+        if key == "enter" and self.body:
+            self.on_activate(self.focus_position)
+            return None
+        return super().keypress(size, key)
+
+
+class GRadioList(OneRowListBox):
+    """
+    Radio button list of one-row choices.
+
+    Rendering and moving the focus only touch the visible rows, so the
+    number of choices does not matter. Supports the scrolling API of
+    cui.classes.scroll.ScrollBar.
+    """
+    def __init__(self, choices: Sequence[str]):
+        super().__init__(RadioListWalker(choices))
+        self._index = {choice: i for i, choice in enumerate(choices)}
+        self._matcher: Optional[ChoiceIndex] = None
+
+    @property
+    def choices(self) -> List[str]:
+        """All choices, in their order."""
+        return self.body.choices
+
+    @property
+    def selected(self) -> str:
+        """The selected choice, "" if there is none."""
+        return self.body.selected
+
+    def select(self, choice: str):
+        """Select choice and move the focus onto it, in the middle of the list.
+
+        Opening a long picker at the top forces the user to scroll down to
+        their current entry; start the focus and the viewport on it instead.
+        """
+        index = self._index.get(choice)
+        self.body.select(index)
+        position = self.body.position_of(index) if index is not None else None
+        if position is not None:
+            self.set_focus(position)
+            self.set_focus_valign("middle")
+
+    def set_filter(self, query: str):
+        """Show only the choices matching query, all of them if it is empty."""
+        if not query.strip():
+            self.body.set_view(range(len(self.body.choices)))
+            self._refocus()
+            return
+        if self._matcher is None:
+            # Built on the first keystroke, opening the list does not pay for it
+            self._matcher = ChoiceIndex(self.body.choices)
+        self.body.set_view(self._matcher.match(query))
+        self._refocus()
+
+    def _refocus(self):
+        """Drop the focus offset of the previous view"""
+        if self.body:
+            self.set_focus(self.body.focus)
+            self.set_focus_valign("middle")
+
+
+class GRadioPicker(urwid.WidgetWrap):
+    """
+    GRadioList with a type-ahead filter line above it.
+
+    Printable keys and backspace edit the filter, which narrows the list on
+    every keystroke; all other keys, space included, go to the list.
+    """
+    def __init__(self, radio_list: GRadioList, caption: str = ""):
+        self.radio_list = radio_list
+        self.filter_edit = urwid.Edit(caption)
+        super().__init__(urwid.Frame(
+            ScrollBar(radio_list),
+            header=urwid.Pile([self.filter_edit, urwid.Divider("\u2500")]),
+        ))
+
+    @property
+    def selected(self) -> str:
+        """The selected choice, "" if there is none."""
+        return self.radio_list.selected
+
+    def view_state(self) -> Tuple[str, int, str]:
+        """The filter text, focus position and selection, which the user changes."""
+        return self.filter_edit.edit_text, self.radio_list.body.focus, self.selected
+
+    def select(self, choice: str):
+        """Clear the filter and select choice, see GRadioList.select."""
+        self.filter_edit.set_edit_text("")
+        self.radio_list.set_filter("")
+        self.radio_list.select(choice)
+
+    def keypress(self, size, key):
+        if key == "backspace" or (len(key) == 1 and key != " " and key.isprintable()):
+            self.filter_edit.keypress((size[0],), key)
+            self.radio_list.set_filter(self.filter_edit.edit_text)
+            return None
+        return super().keypress(size, key)
@@ -4,28 +4,21 @@
 import os
 import re
 import subprocess
-from pathlib import Path
 from typing import Any, Tuple
 from getpass import getuser
 
-try:
-    import requests
-except ImportError:  # requests is optional; only the repo dialog uses it
-    requests = None
-
 import urwid
 
 import cui.classes
 import cui.distro
 import cui.network
 import cui.localetime
-from cui.classes.application import setup_state
 from cui.classes.menu import MenuItem
 from cui.symbol import LOG_VIEWER, MAIN, MESSAGE_BOX, INPUT_BOX, TERMINAL, PASSWORD, LOGIN, \
     REBOOT, SHUTDOWN, MAIN_MENU, UNSUPPORTED, ADMIN_WEB_PW, TIMESYNCD, REPO_SELECTION, \
     KEYBOARD_SWITCH, PRODUCTION, LOCALE_SELECTION, KEYBOARD_SELECTION, \
     TIMEZONE_SELECTION, HOSTNAME_CONFIG, NETWORK_INTERFACE_SELECT, \
-    NETWORK_INTERFACE_EDIT, NETWORK_BOND_CREATE
+    NETWORK_INTERFACE_EDIT, NETWORK_BOND_CREATE, BUSY, REPO_APPLY, PKG_UPDATE, LOG_SEARCH
 from cui import util, parameter
 from cui.classes.model import ApplicationModel
 from cui.util import _
@@ -35,9 +28,33 @@ from cui.classes.gwidgets import GText
 
 _ = cui.util.init_localization()
 
+# Seconds between two redraws of the package update output
+UPDATE_REDRAW_INTERVAL: float = 0.25
+# Keys of the log viewer's filter
+LOG_FILTER_KEYS = frozenset(("/", "v", "V", "w", "W"))
+# Keys leaving the log viewer or changing what it shows
+LOG_VIEW_CHANGE_KEYS = frozenset((
+    "ctrl f1", "H", "h", "L", "l", "esc", "left", "right", "+", "-", "f", "F", "m", "M",
+    "1", "2", "3", "4", "5", "6", "7", "8", "9", "g", "G",
+)) | LOG_FILTER_KEYS
+# Keys of the log viewer leaving the entries around a search result
+LOG_CONTEXT_LEAVE_KEYS = frozenset((
+    "ctrl f1", "H", "h", "L", "l", "left", "right", "f", "F", "m", "M",
+))
+# The lowest priorities <V> steps through in the log viewer, None shows all
+LOG_FILTER_PRIORITIES = (None, 3, 4, 5, 6)
+# The lowest priority <W> switches on and off: warnings and above
+LOG_FILTER_WARNING = 4
+
 
 class ApplicationHandler(ApplicationModel):
     """Add the handler functionality in this class"""
+    def __init__(self):
+        super().__init__()
+        self.view.dialogs.register(LOCALE_SELECTION, self._prepare_locale_selection)
+        self.view.dialogs.register(KEYBOARD_SELECTION, self._prepare_keyboard_selection)
+        self.view.dialogs.register(TIMEZONE_SELECTION, self._prepare_timezone_selection)
+
     def handle_event(self, event: Any):
         """
         Handles user input to the console UI.
@@ -59,6 +76,14 @@ class ApplicationHandler(ApplicationModel):
         """Handle keyboard event."""
         # event was a keystroke
         key: str = str(event)
+        if self.control.app_control.current_window == BUSY:
+            # Input waits until the running host command has finished
+            return
+        if self.control.app_control.current_window == PKG_UPDATE:
+            # No global keys: they would be typed into the package manager,
+            # and F10 must not end the CUI while it runs.
+            self._key_ev_pkg_update(key)
+            return
         if self.control.log_control.log_finished and \
                 self.control.app_control.current_window != LOG_VIEWER:
             self.control.log_control.log_finished = False
@@ -73,10 +98,12 @@ class ApplicationHandler(ApplicationModel):
             SHUTDOWN: (self._key_ev_shutdown, key),
             MAIN_MENU: (self._key_ev_mainmenu, key),
             LOG_VIEWER: (self._key_ev_logview, key),
+            LOG_SEARCH: (self._key_ev_log_search, key),
             UNSUPPORTED: (self._key_ev_unsupp, key),
             ADMIN_WEB_PW: (self._key_ev_aapi, key),
             TIMESYNCD: (self._key_ev_timesyncd, key),
             REPO_SELECTION: (self._key_ev_repo_selection, key),
+            REPO_APPLY: (self._key_ev_repo_apply, key),
             KEYBOARD_SWITCH: (self._key_ev_kbd_switch, key),
             LOCALE_SELECTION: (self._key_ev_locale_selection, key),
             KEYBOARD_SELECTION: (self._key_ev_keyboard_selection, key),
@@ -90,7 +117,10 @@ class ApplicationHandler(ApplicationModel):
             func(var)
         else:
             func()
-        self._key_ev_anytime(key)
+        if self.control.app_control.current_window != LOG_VIEWER \
+                or not self.control.log_control.log_filter_editing:
+            # Not while typing the filter of the log viewer
+            self._key_ev_anytime(key)
 
     def _key_ev_main(self, key):
         """Handle event on mainframe."""
@@ -236,16 +266,6 @@ class ApplicationHandler(ApplicationModel):
 
     def _key_ev_mainmenu(self, key):
         """Handle event on main menu."""
-        def menu_language():
-            locale_path = cui.distro.get_locale_conf_path()
-            pre = cui.classes.parser.ConfigParser(infile=locale_path) \
-                if Path(locale_path).is_file() else None
-            self._open_locale_selection()
-            post = cui.classes.parser.ConfigParser(infile=locale_path) \
-                if Path(locale_path).is_file() else None
-            if pre != post:
-                util._ = util.restart_gui()
-
         def exit_main_loop():
             raise urwid.ExitMainLoop()
 
@@ -256,7 +276,7 @@ class ApplicationHandler(ApplicationModel):
         )
         if key.endswith("enter") or key in range(ord("1"), ord("9") + 1):
             (func, val) = {
-                1: (menu_language, None),
+                1: (self._open_locale_selection, None),
                 2: (self._open_keyboard_selection, None),
                 3: (self._open_change_password, None),
                 4: (self._open_network_interface_select, None),
@@ -277,17 +297,108 @@ class ApplicationHandler(ApplicationModel):
             else:
                 func()
         elif key == "esc":
-            setup_state.set_setup_states()
+            self.refresh_setup_state()
             self._open_mainframe()
 
+    def _key_ev_log_follow(self, key) -> bool:
+        """Handle the keys of the log viewer's follow mode; return True if handled.
+
+        Keys leaving the viewer or changing what it shows end the follow mode
+        and are handled by _key_ev_logview() then.
+        """
+        tail = self.control.log_control.log_follow_tail
+        rows = self.view.gscreen.screen.get_cols_rows()[1]
+        scroll = {
+            "page up": rows // 2,
+            "page down": -(rows // 2),
+            "home": len(tail.scrollback),
+            "end": -tail.offset,
+        }
+        if key in scroll:
+            tail.scroll(scroll[key])
+            return True
+        if key not in LOG_VIEW_CHANGE_KEYS:
+            return False
+        self._stop_log_follow()
+        if key in ("f", "F") or key in LOG_FILTER_KEYS:
+            # The filter keys apply to the scrolled lines, show them again
+            self._open_log_viewer(
+                self.control.log_control.log_unit, self.control.log_control.log_line_count
+            )
+        return key in ("f", "F")
+
+    def _key_ev_log_filter(self, key):
+        """Handle the keys typing the log viewer's filter text."""
+        log_control = self.control.log_control
+        text = log_control.log_filter.text
+        if key in ("enter", "esc"):
+            log_control.log_filter_editing = False
+            if key == "esc":
+                text = ""
+        elif key == "backspace":
+            text = text[:-1]
+        elif len(key) == 1 and key.isprintable():
+            text += key
+        if text != log_control.log_filter.text:
+            self._set_log_filter(log_control.log_filter.max_priority, text)
+        else:
+            self._show_log_filter()
+
     def _key_ev_logview(self, key):
         """Handle event on log viewer menu."""
-        if key in ["ctrl f1", "H", "h", "L", "l", "esc"]:
+        if self.control.log_control.log_follow is not None and self._key_ev_log_follow(key):
+            return
+        log_control = self.control.log_control
+        if log_control.log_filter_editing:
+            self._key_ev_log_filter(key)
+            return
+        if log_control.log_cursor and key in LOG_CONTEXT_LEAVE_KEYS:
+            log_control.log_cursor = ""
+            if key in ("f", "F"):
+                # Follow from the end of the logfile, not from the search result
+                self._open_log_viewer(log_control.log_unit, log_control.log_line_count)
+        if key in ("f", "F"):
+            self._start_log_follow(log_control.log_tail.units)
+        elif key == "esc" and log_control.log_cursor:
+            log_control.log_cursor = ""
+            self._open_log_search()
+        elif key in ("g", "G"):
+            self._open_log_search()
+        elif key == "/":
+            log_control.log_filter_editing = True
+            self._show_log_filter()
+        elif key in ("v", "V", "w", "W"):
+            priority = log_control.log_filter.max_priority
+            if key in ("w", "W"):
+                priority = None if priority == LOG_FILTER_WARNING else LOG_FILTER_WARNING
+            elif priority in LOG_FILTER_PRIORITIES:
+                index = LOG_FILTER_PRIORITIES.index(priority) + 1
+                priority = LOG_FILTER_PRIORITIES[index % len(LOG_FILTER_PRIORITIES)]
+            else:
+                priority = None
+            self._set_log_filter(priority, log_control.log_filter.text)
+        elif key in ("m", "M"):
+            log_control.log_merged = not log_control.log_merged
+            self._open_log_viewer(log_control.log_unit, log_control.log_line_count)
+        elif log_control.log_merged and key in ("1", "2", "3", "4", "5", "6", "7", "8", "9"):
+            sources = self._get_log_sources()
+            if int(key) <= len(sources):
+                src = sources[int(key) - 1]
+                hidden = log_control.log_hidden_units
+                if src in hidden:
+                    log_control.log_hidden_units = tuple(unit for unit in hidden if unit != src)
+                else:
+                    log_control.log_hidden_units = hidden + (src,)
+                self._open_log_viewer(log_control.log_unit, log_control.log_line_count)
+        elif key in ["ctrl f1", "H", "h", "L", "l", "esc"]:
             self.control.app_control.current_window = self.control.app_control.log_file_caller
             self.control.app_control.body = self.control.app_control.log_file_caller_body
             self._reset_layout()
             self.control.log_control.log_finished = True
         elif key in ["left", "right", "+", "-"]:
+            if key in ("left", "right"):
+                # Switching the logfile leaves the merged view
+                log_control.log_merged = False
             line_offset = {
                 "-": -100,
                 "+": +100,
@@ -329,6 +440,20 @@ class ApplicationHandler(ApplicationModel):
             self.control.log_control.log_finished = True
             self._reset_layout()
 
+    def _key_ev_log_search(self, key):
+        """Handle event on the search of all logfiles."""
+        log_control = self.control.log_control
+        if key == "enter":
+            self._start_log_search()
+        elif key == "esc":
+            search = log_control.log_search
+            if search is not None and not search.done:
+                self._stop_log_search()
+                log_control.log_search_status.set_text(("body", _("Cancelling ...")))
+            else:
+                log_control.log_cursor = ""
+                self._open_log_viewer(log_control.log_unit, log_control.log_line_count)
+
     def _key_ev_anytime(self, key):
         """Handle event at anytime."""
         if key in ["f10", "Q"]:
@@ -342,6 +467,7 @@ class ApplicationHandler(ApplicationModel):
         elif (
                 key in ["ctrl f1", "H", "h", "L", "l"]
                 and self.control.app_control.current_window != LOG_VIEWER
+                and self.control.app_control.current_window != LOG_SEARCH
                 and self.control.app_control.current_window != UNSUPPORTED
                 and not self.control.log_control.log_finished
         ):
@@ -394,6 +520,8 @@ class ApplicationHandler(ApplicationModel):
             updateable, url = util.check_repo_dialog(self, height)
             if not updateable:
                 return
+            # The form shows the repo file as read, so rebuild it on next open
+            self.view.dialogs.invalidate(REPO_SELECTION)
             if cui.distro.is_debian_family():
                 # apt: we rewrite the .list file from scratch below; nothing
                 # to update in `config` here.
@@ -418,7 +546,9 @@ class ApplicationHandler(ApplicationModel):
                 self._process_changed_repo_config(height, repo_res)
 
     def _process_changed_repo_config(self, height, repo_res, raw_url: str = None):
-        if requests is None:
+        """Apply the changed repository in the background, showing its progress."""
+        import cui.repository  # pylint: disable=import-outside-toplevel
+        if util.import_requests() is None:
             self.message_box(
                 parameter.MsgBoxParams(
                     _('The "requests" Python package is required to download '
@@ -427,112 +557,73 @@ class ApplicationHandler(ApplicationModel):
                 size=parameter.Size(height=height + 2),
             )
             return
+        repofile = repo_body = None
+        # On Debian/Ubuntu we also need to write the .list file from scratch.
+        if cui.distro.is_debian_family() and raw_url:
+            repofile = repo_res.get("repofile")
+            repo_body = cui.distro.render_repo_file(
+                baseurl=raw_url if raw_url.startswith("http") else f"https://{raw_url}",
+                key_destination=repo_res.get("keyfile"),
+            )
+        job = cui.repository.RepoApply(
+            repo_res.get("keyurl"), repo_res.get("keyfile"), repofile, repo_body,
+        )
+        self._repo_apply = job
+        self._repo_apply_stage = GText(job.describe())
         header = GText(_("One moment, please ..."))
-        footer = GText(_('Fetching GPG-KEY file and refreshing '
-                          'repositories. This may take a while ...'))
-        self.control.app_control.progressbar = self._create_progress_bar()
-        pad = urwid.Padding(self.control.app_control.progressbar)
-        fil = urwid.Filler(pad)
-        linebox = urwid.LineBox(fil)
-        frame: parameter.Frame = parameter.Frame(linebox, header, footer)
-        self.dialog(frame)
-        self._draw_progress(20)
-        keyurl = repo_res.get("keyurl")
-        keyfile = repo_res.get("keyfile")
-        try:
-            res = requests.get(keyurl, timeout=30)
-        except requests.RequestException:
+        body = urwid.LineBox(urwid.Filler(urwid.Pile([
+            urwid.Padding(self._create_progress_bar()),
+            urwid.Divider(),
+            self._repo_apply_stage,
+        ])))
+        footer = self._create_footer(False, True)
+        caller_body = self.control.app_control.loop.widget
+        self.control.app_control.current_window = REPO_APPLY
+        self.dialog(parameter.Frame(body, header, footer), size=parameter.Size(60, 12))
+        self.control.app_control.loop.set_alarm_in(0.2, self._show_repo_apply_progress)
+        self.run_host_task(
+            job.run(), lambda err: self._on_repo_applied(err, caller_body, height),
+            on_error=lambda exc: self._on_repo_applied(
+                str(exc) or repr(exc), caller_body, height
+            ),
+        )
+
+    def _show_repo_apply_progress(self, cb_loop: urwid.MainLoop, _data: Any = None):
+        """Show the stage and progress of the repository update while it runs."""
+        job = self._repo_apply
+        if job is None:
+            return
+        self._repo_apply_stage.set_text(job.describe())
+        self._draw_progress(round(job.fraction() * 100))
+        cb_loop.set_alarm_in(0.2, self._show_repo_apply_progress)
+
+    def _key_ev_repo_apply(self, key):
+        """Handle event on the repository update progress dialog."""
+        if self._repo_apply is not None and (key == "esc" or key.endswith("enter")):
+            self._repo_apply_stage.set_text(_("Cancelling ..."))
+            self._repo_apply.cancel()
+
+    def _on_repo_applied(self, err: str, caller_body: urwid.Widget, height: int):
+        """Return to the repository selection and report the result."""
+        self._repo_apply = None
+        self.control.app_control.current_window = REPO_SELECTION
+        self.control.app_control.loop.widget = caller_body
+        if err:
             self.message_box(
-                parameter.MsgBoxParams(
-                    _("Could not download the grommunio GPG key from %s.") % keyurl,
-                ),
+                parameter.MsgBoxParams(err),
                 size=parameter.Size(height=height + 1),
             )
             return
-        got_keyfile: bool = False
-        if res.status_code == 200:
-            self._draw_progress(30)
-            tmp = Path(keyfile)
-            try:
-                tmp.parent.mkdir(parents=True, exist_ok=True)
-                with tmp.open('w', encoding="utf-8") as file:
-                    file.write(res.content.decode())
-                self._draw_progress(40)
-            except OSError as exc:
-                self.message_box(
-                    parameter.MsgBoxParams(
-                        _("Failed to write key file %(path)s: %(err)s")
-                        % {"path": keyfile, "err": str(exc)},
-                    ),
-                    size=parameter.Size(height=height + 1),
-                )
-                return
-            # On Debian/Ubuntu we also need to write the .list file from scratch.
-            if cui.distro.is_debian_family() and raw_url:
-                repofile = repo_res.get("repofile")
-                body = cui.distro.render_repo_file(
-                    baseurl=raw_url if raw_url.startswith("http") else f"https://{raw_url}",
-                    key_destination=keyfile,
-                )
-                try:
-                    with open(repofile, "w", encoding="utf-8") as fh:
-                        fh.write(body)
-                except OSError as exc:
-                    self.message_box(
-                        parameter.MsgBoxParams(
-                            _("Failed to write repo file %(path)s: %(err)s")
-                            % {"path": repofile, "err": str(exc)},
-                        ),
-                        size=parameter.Size(height=height + 1),
-                    )
-                    return
-            import_cmd = cui.distro.pkg_import_key_cmd(keyfile)
-            if import_cmd:
-                try:
-                    with subprocess.Popen(
-                            import_cmd,
-                            stderr=subprocess.DEVNULL,
-                            stdout=subprocess.DEVNULL,
-                    ) as ret_code_imp:
-                        ret_code_imp.wait()
-                except OSError:
-                    pass
-            self._draw_progress(60)
-            refresh_cmd = cui.distro.pkg_refresh_cmd()
-            if refresh_cmd:
-                try:
-                    with subprocess.Popen(
-                            refresh_cmd,
-                            stderr=subprocess.DEVNULL,
-                            stdout=subprocess.DEVNULL,
-                    ) as ret_code_ref:
-                        if ret_code_ref.wait() == 0:
-                            self._draw_progress(100)
-                            got_keyfile = True
-                except OSError:
-                    pass
-            else:
-                # No package manager available; we've at least written the files.
-                got_keyfile = True
-        if got_keyfile:
-            self.message_box(
-                parameter.MsgBoxParams(
-                    _('Software repository selection has been '
-                       'updated.'),
-                ),
-                size=parameter.Size(height=height)
-            )
-        else:
-            self.message_box(
-                parameter.MsgBoxParams(
-                    _('Software repository selection has not been '
-                       'updated. Something went wrong while importing '
-                       'key file.'),
-                ),
-                size=parameter.Size(height=height + 1)
-            )
+        self.message_box(
+            parameter.MsgBoxParams(
+                _('Software repository selection has been '
+                   'updated.'),
+            ),
+            size=parameter.Size(height=height)
+        )
 
     def _init_repo_selection(self, key, height):
+        import cui.classes.parser  # pylint: disable=import-outside-toplevel
         self._handle_standard_tab_behaviour(key)
         keyurl = 'https://download.grommunio.com/RPM-GPG-KEY-grommunio'
         keyfile = cui.distro.get_keyfile_destination()
@@ -582,6 +673,7 @@ class ApplicationHandler(ApplicationModel):
             util.lineconfig_write(
                 "/etc/systemd/timesyncd.conf", self.control.menu_control.timesyncd_vars
             )
+            self.view.dialogs.invalidate(TIMESYNCD)
             with subprocess.Popen(
                 ["timedatectl", "set-ntp", "true"],
                 stderr=subprocess.DEVNULL,
@@ -681,6 +773,7 @@ class ApplicationHandler(ApplicationModel):
 
     def _run_update(self):
         """Refresh package metadata and run a full upgrade via the system PM."""
+        import cui.pkgupdate  # pylint: disable=import-outside-toplevel
         refresh = cui.distro.pkg_refresh_cmd()
         update = cui.distro.pkg_update_cmd()
         if not refresh or not update:
@@ -692,17 +785,90 @@ class ApplicationHandler(ApplicationModel):
                 size=parameter.Size(height=10),
             )
             return
-        self.control.app_control.loop.stop()
-        self.view.gscreen.screen.tty_signal_keys(*self.view.gscreen.old_termios)
-        print("\x1b[K")
-        print("\x1b[K \x1b[36m▼\x1b[0m",
-              _("Please wait while %s is invoked.") % refresh[0])
-        print("\x1b[J")
-        subprocess.run(refresh, check=False)
-        subprocess.run(update, check=False)
-        input("\n \x1b[36m▼\x1b[0m " + _("Press ENTER to return to the CUI."))
-        self.view.gscreen.screen.tty_signal_keys(*self.view.gscreen.blank_termios)
-        self.control.app_control.loop.start()
+        job = cui.pkgupdate.PackageUpdate(refresh, update)
+        self._pkg_update = job
+        self._pkg_update_seen = -1
+        self._pkg_update_tail = cui.classes.gwidgets.GTail(job.scrollback)
+        self._pkg_update_status = GText(_("Please wait while %s is invoked.") % refresh[0])
+        body = urwid.Frame(
+            self._pkg_update_tail,
+            header=urwid.Pile([
+                self._pkg_update_status,
+                urwid.Padding(self._create_progress_bar(), left=2, right=2),
+                urwid.Divider("─"),
+            ]),
+        )
+        self._pkg_update_footer = GText(
+            _("PgUp/PgDn: scroll, other keys are passed on to the update")
+        )
+        self.control.app_control.current_window = PKG_UPDATE
+        self.dialog(
+            parameter.Frame(body, footer=self._pkg_update_footer, focus_part="body"),
+            size=parameter.Size(("relative", 96), ("relative", 90)),
+            title=_("System update"),
+        )
+        cols, rows = self.view.gscreen.screen.get_cols_rows()
+        self.control.app_control.loop.set_alarm_in(
+            UPDATE_REDRAW_INTERVAL, self._show_pkg_update
+        )
+        self.run_host_task(
+            job.run(max(cols * 96 // 100 - 2, 40), max(rows * 90 // 100 - 7, 10)),
+            self._on_pkg_updated,
+            on_error=lambda exc: self._on_pkg_update_failed(job, exc),
+        )
+
+    def _show_pkg_update(self, cb_loop: urwid.MainLoop, _data: Any = None):
+        """Show the new output and progress of the update, a few times a second."""
+        job = self._pkg_update
+        if job is None:
+            return
+        if job.scrollback.version != self._pkg_update_seen:
+            self._pkg_update_seen = job.scrollback.version
+            self._pkg_update_tail.refresh()
+            progress = job.progress.describe()
+            if progress:
+                self._pkg_update_status.set_text(progress)
+            self._draw_progress(round(job.progress.fraction() * 100))
+        if job.returncode is None:
+            cb_loop.set_alarm_in(UPDATE_REDRAW_INTERVAL, self._show_pkg_update)
+
+    def _on_pkg_updated(self, returncode: int):
+        """Show the outcome of the update and leave the output for reading."""
+        self._show_pkg_update(self.control.app_control.loop)
+        if returncode:
+            self._pkg_update_status.set_text(
+                ("important", _("The update failed (exit code %d).") % returncode)
+            )
+        else:
+            self._pkg_update_status.set_text(_("The update has finished."))
+            self._draw_progress(100)
+        # Not self.print(): the status cell of the footer is hidden in production
+        self._pkg_update_footer.set_text(
+            _("PgUp/PgDn: scroll, press ENTER or ESC to return to the CUI.")
+        )
+
+    def _on_pkg_update_failed(self, job: "cui.pkgupdate.PackageUpdate", exc: BaseException):
+        """Let the update view be left after the update crashed, and say why."""
+        job.returncode = -1
+        self._on_pkg_updated(-1)
+        self._pkg_update_status.set_text(("important", _("The update failed: %s") % exc))
+
+    def _key_ev_pkg_update(self, key: str):
+        """Handle event on the package update view."""
+        tail = self._pkg_update_tail
+        scroll = {"page up": 10, "page down": -10, "home": len(tail.scrollback), "end": -tail.offset}
+        if key in scroll:
+            tail.scroll(scroll[key])
+        elif self._pkg_update.returncode is not None:
+            if key in ("enter", "esc"):
+                self._pkg_update = None
+                self._open_main_menu()
+        elif key == "enter":
+            self._pkg_update.pty.write("\r")
+        elif key == "backspace":
+            self._pkg_update.pty.write("\x7f")
+        elif len(key) == 1:
+            self._pkg_update.pty.write(key)
 
     def check_login(self, widget=None):
         """
@@ -899,19 +1065,42 @@ class ApplicationHandler(ApplicationModel):
         aliases = self._button_aliases(_("Cancel"), _("cancel"))
         return button_type.lower() in aliases
 
-    def _focused_scroll_list(self, items, choices, current):
-        """Wrap radio items in a scrollable list focused on the current value.
+    def _prepare_locale_selection(self):
+        """Prepare the locale-picker list, or return None without locales."""
+        choices = cui.localetime.list_locales()
+        if not choices:
+            return None
+        self._locale_picker = cui.classes.gwidgets.GRadioPicker(
+            cui.classes.gwidgets.GRadioList(choices), _("Filter: "),
+        )
+        return self._locale_picker
+
+    def _prepare_keyboard_selection(self):
+        """Prepare the keymap-picker list, or return None without keymaps."""
+        choices = cui.localetime.list_keymaps()
+        if not choices:
+            return None
+        self._keymap_picker = cui.classes.gwidgets.GRadioPicker(
+            cui.classes.gwidgets.GRadioList(choices), _("Filter: "),
+        )
+        return self._keymap_picker
+
+    def _prepare_timezone_selection(self):
+        """Prepare the timezone-picker list, or return None without timezones."""
+        choices = cui.localetime.list_timezones()
+        if not choices:
+            return None
+        self._timezone_picker = cui.classes.gwidgets.GRadioPicker(
+            cui.classes.gwidgets.GRadioList(choices), _("Filter: "),
+        )
+        return self._timezone_picker
 
-        Opening a long picker at the top forces the user to scroll down to
-        their current entry; start the focus and the viewport on it instead.
-        """
-        pile = urwid.Pile(items)
-        scrollable = cui.classes.scroll.Scrollable(pile)
-        if items and current in choices:
-            idx = choices.index(current)
-            pile.focus_position = idx
-            scrollable.set_scrollpos(idx)
-        return cui.classes.scroll.ScrollBar(scrollable)
+    @staticmethod
+    def _preselect(picker: cui.classes.gwidgets.GRadioPicker, state: Tuple, choice: str):
+        """Select the current choice looked up in the background, unless the
+        user has typed a filter, moved or selected since state was taken."""
+        if picker.view_state() == state:
+            picker.select(choice)
 
     # ------------------------------------------------------------------
     # Locale selection dialog
@@ -922,8 +1111,8 @@ class ApplicationHandler(ApplicationModel):
         self._reset_layout()
         self.print(_("Opening language selection"))
         self.control.app_control.current_window = LOCALE_SELECTION
-        locales = cui.localetime.list_locales()
-        if not locales:
+        body = self.view.dialogs.get(LOCALE_SELECTION)
+        if body is None:
             self.message_box(
                 parameter.MsgBoxParams(
                     _("Could not enumerate available locales (is localectl installed?)."),
@@ -932,14 +1121,12 @@ class ApplicationHandler(ApplicationModel):
                 size=parameter.Size(height=10),
             )
             return
-        current = cui.localetime.get_current_locale()
-        self._locale_choices = locales
-        self._locale_radiogroup = []
-        items = []
-        for loc in locales:
-            rb = urwid.RadioButton(self._locale_radiogroup, loc, state=(loc == current))
-            items.append(urwid.AttrMap(rb, "selectable", "focus"))
-        body = self._focused_scroll_list(items, locales, current)
+        picker = self._locale_picker
+        state = picker.view_state()
+        self.run_host_task(
+            cui.localetime.get_current_locale_async(),
+            lambda current: self._preselect(picker, state, current),
+        )
         footer = urwid.AttrMap(
             urwid.Columns([
                 self.view.button_store.save_button,
@@ -967,30 +1154,42 @@ class ApplicationHandler(ApplicationModel):
             size=parameter.Size(height=10),
         )
         if self._is_save_or_ok(button_type):
-            selected = next(
-                (rb.label for rb in self._locale_radiogroup if rb.state),
-                "",
+            selected = self._locale_picker.selected
+            if not selected:
+                self._on_locale_set(selected, False)
+                return
+            self.run_host_task(
+                cui.localetime.set_locale_async(selected),
+                lambda ok: self._on_locale_set(selected, ok),
+                parameter.MsgBoxParams(
+                    _("Setting the system language ..."), _("Language configuration"),
+                ),
+                lambda _exc: self._on_locale_set(selected, False),
             )
-            if selected and cui.localetime.set_locale(selected):
-                self.message_box(
-                    parameter.MsgBoxParams(
-                        _("System language set to %s.") % selected,
-                        _("Language configuration"),
-                    ),
-                    size=parameter.Size(height=10),
-                )
-            else:
-                self.message_box(
-                    parameter.MsgBoxParams(
-                        _("Failed to set the system language."),
-                        _("Language configuration"),
-                    ),
-                    size=parameter.Size(height=10),
-                )
-            self._open_main_menu()
         elif self._is_cancel_or_esc(button_type, key):
             self._open_main_menu()
 
+    def _on_locale_set(self, selected: str, ok: bool):
+        """Switch to the set language and report the result."""
+        if ok:
+            util.restart_gui(self)
+            self.message_box(
+                parameter.MsgBoxParams(
+                    _("System language set to %s.") % selected,
+                    _("Language configuration"),
+                ),
+                size=parameter.Size(height=10),
+            )
+        else:
+            self.message_box(
+                parameter.MsgBoxParams(
+                    _("Failed to set the system language."),
+                    _("Language configuration"),
+                ),
+                size=parameter.Size(height=10),
+            )
+        self._open_main_menu()
+
     # ------------------------------------------------------------------
     # Keyboard layout selection dialog
     # ------------------------------------------------------------------
@@ -1000,8 +1199,8 @@ class ApplicationHandler(ApplicationModel):
         self._reset_layout()
         self.print(_("Opening keyboard layout selection"))
         self.control.app_control.current_window = KEYBOARD_SELECTION
-        keymaps = cui.localetime.list_keymaps()
-        if not keymaps:
+        body = self.view.dialogs.get(KEYBOARD_SELECTION)
+        if body is None:
             self.message_box(
                 parameter.MsgBoxParams(
                     _("Could not enumerate keymaps (is localectl installed?)."),
@@ -1010,15 +1209,8 @@ class ApplicationHandler(ApplicationModel):
                 size=parameter.Size(height=10),
             )
             return
-        current = util.get_current_kbdlayout()
-        self._keymap_choices = keymaps
-        self._keymap_radiogroup = []
-        items = []
-        for keymap in keymaps:
-            rb = urwid.RadioButton(self._keymap_radiogroup, keymap,
-                                   state=(keymap == current))
-            items.append(urwid.AttrMap(rb, "selectable", "focus"))
-        body = self._focused_scroll_list(items, keymaps, current)
+        current = self.view.header.get_kbdlayout()
+        self._keymap_picker.select(current)
         footer = urwid.AttrMap(
             urwid.Columns([
                 self.view.button_store.save_button,
@@ -1046,10 +1238,7 @@ class ApplicationHandler(ApplicationModel):
             size=parameter.Size(height=10),
         )
         if self._is_save_or_ok(button_type):
-            selected = next(
-                (rb.label for rb in self._keymap_radiogroup if rb.state),
-                "",
-            )
+            selected = self._keymap_picker.selected
             if selected:
                 self._set_kbd_layout(selected)
                 self.message_box(
@@ -1072,8 +1261,8 @@ class ApplicationHandler(ApplicationModel):
         self._reset_layout()
         self.print(_("Opening timezone selection"))
         self.control.app_control.current_window = TIMEZONE_SELECTION
-        timezones = cui.localetime.list_timezones()
-        if not timezones:
+        body = self.view.dialogs.get(TIMEZONE_SELECTION)
+        if body is None:
             self.message_box(
                 parameter.MsgBoxParams(
                     _("Could not enumerate timezones (is timedatectl installed?)."),
@@ -1082,14 +1271,12 @@ class ApplicationHandler(ApplicationModel):
                 size=parameter.Size(height=10),
             )
             return
-        current = cui.localetime.get_current_timezone()
-        self._timezone_choices = timezones
-        self._timezone_radiogroup = []
-        items = []
-        for tz in timezones:
-            rb = urwid.RadioButton(self._timezone_radiogroup, tz, state=(tz == current))
-            items.append(urwid.AttrMap(rb, "selectable", "focus"))
-        body = self._focused_scroll_list(items, timezones, current)
+        picker = self._timezone_picker
+        state = picker.view_state()
+        self.run_host_task(
+            cui.localetime.get_current_timezone_async(),
+            lambda current: self._preselect(picker, state, current),
+        )
         footer = urwid.AttrMap(
             urwid.Columns([
                 self.view.button_store.save_button,
@@ -1117,30 +1304,41 @@ class ApplicationHandler(ApplicationModel):
             size=parameter.Size(height=10),
         )
         if self._is_save_or_ok(button_type):
-            selected = next(
-                (rb.label for rb in self._timezone_radiogroup if rb.state),
-                "",
+            selected = self._timezone_picker.selected
+            if not selected:
+                self._on_timezone_set(selected, False)
+                return
+            self.run_host_task(
+                cui.localetime.set_timezone_async(selected),
+                lambda ok: self._on_timezone_set(selected, ok),
+                parameter.MsgBoxParams(
+                    _("Setting the system timezone ..."), _("Timezone configuration"),
+                ),
+                lambda _exc: self._on_timezone_set(selected, False),
             )
-            if selected and cui.localetime.set_timezone(selected):
-                self.message_box(
-                    parameter.MsgBoxParams(
-                        _("System timezone set to %s.") % selected,
-                        _("Timezone configuration"),
-                    ),
-                    size=parameter.Size(height=10),
-                )
-            else:
-                self.message_box(
-                    parameter.MsgBoxParams(
-                        _("Failed to set the system timezone."),
-                        _("Timezone configuration"),
-                    ),
-                    size=parameter.Size(height=10),
-                )
-            self._open_main_menu()
         elif self._is_cancel_or_esc(button_type, key):
             self._open_main_menu()
 
+    def _on_timezone_set(self, selected: str, ok: bool):
+        """Report the result of setting the timezone."""
+        if ok:
+            self.message_box(
+                parameter.MsgBoxParams(
+                    _("System timezone set to %s.") % selected,
+                    _("Timezone configuration"),
+                ),
+                size=parameter.Size(height=10),
+            )
+        else:
+            self.message_box(
+                parameter.MsgBoxParams(
+                    _("Failed to set the system timezone."),
+                    _("Timezone configuration"),
+                ),
+                size=parameter.Size(height=10),
+            )
+        self._open_main_menu()
+
     # ------------------------------------------------------------------
     # Hostname configuration dialog
     # ------------------------------------------------------------------
@@ -1150,14 +1348,23 @@ class ApplicationHandler(ApplicationModel):
 
         On a rejected value the dialog is reopened with the offending input
         preserved and the reason shown inline, so it can be corrected.
+        Otherwise the current hostname is filled in once hostnamectl answered.
         """
         self._reset_layout()
         self.print(_("Opening hostname configuration"))
         self.control.app_control.current_window = HOSTNAME_CONFIG
-        current = value if value is not None else cui.localetime.get_hostname()
         self._hostname_edit = cui.classes.gwidgets.GEdit(
-            (18, _("Hostname: ")), edit_text=current,
+            (18, _("Hostname: ")), edit_text=value or "",
         )
+        if value is None:
+            edit = self._hostname_edit
+
+            def fill_in(current):
+                # Unless something was typed in the meantime
+                if not edit.edit_text:
+                    edit.set_edit_text(current)
+
+            self.run_host_task(cui.localetime.get_hostname_async(), fill_in)
         pile_items = [
             GText(_("Enter the system hostname. Letters, digits, hyphens and "
                     "dots are allowed."), urwid.CENTER),
@@ -1224,11 +1431,21 @@ class ApplicationHandler(ApplicationModel):
         """Validate and apply the hostname; reopen with the reason on failure."""
         name = self._hostname_edit.edit_text.strip()
         err = self._validate_hostname(name)
-        if not err and not cui.localetime.set_hostname(name):
-            err = _("Failed to set the hostname.")
         if err:
             self._open_hostname_config(error=err, value=name)
             return
+        self.run_host_task(
+            cui.localetime.set_hostname_async(name),
+            lambda ok: self._on_hostname_set(name, ok),
+            parameter.MsgBoxParams(_("Setting the hostname ..."), _("Configure hostname")),
+            lambda _exc: self._on_hostname_set(name, False),
+        )
+
+    def _on_hostname_set(self, name: str, ok: bool):
+        """Return to the main menu, or reopen the dialog if setting failed."""
+        if not ok:
+            self._open_hostname_config(error=_("Failed to set the hostname."), value=name)
+            return
         self._open_main_menu()
 
     # ------------------------------------------------------------------
@@ -1400,13 +1617,11 @@ class ApplicationHandler(ApplicationModel):
                     parameter.MsgBoxParams(err, _("Network configuration")),
                     size=parameter.Size(height=10),
                 )
-                return
-            self._open_main_menu()
         elif self._is_cancel_or_esc(button_type, key):
             self._open_network_interface_select()
 
     def _save_iface_from_form(self) -> str:
-        """Validate the form and write the new config; return error or ''."""
+        """Validate the form and start writing the new config; return error or ''."""
         iface = getattr(self, "_iface_editing", None)
         if not iface:
             return _("No interface selected.")
@@ -1473,9 +1688,28 @@ class ApplicationHandler(ApplicationModel):
         cfg.extra_network = existing.extra_network
         cfg.extra_lines = existing.extra_lines
         cfg.raw_routes = existing.raw_routes
-        ok = cui.network.save_interface_config(cfg)
+        self.run_host_task(
+            cui.network.save_interface_config_async(cfg),
+            lambda ok: self._on_iface_saved(iface, ok),
+            parameter.MsgBoxParams(
+                _("Applying the configuration of %(iface)s ...") % {"iface": iface},
+                _("Network configuration"),
+            ),
+            lambda _exc: self._on_iface_saved(iface, False),
+        )
+        return ""
+
+    def _on_iface_saved(self, iface: str, ok: bool):
+        """Report the result of saving an interface."""
         if not ok:
-            return _("Failed to write the interface configuration.")
+            self.message_box(
+                parameter.MsgBoxParams(
+                    _("Failed to write the interface configuration."),
+                    _("Network configuration"),
+                ),
+                size=parameter.Size(height=10),
+            )
+            return
         self.message_box(
             parameter.MsgBoxParams(
                 _("Interface %(iface)s saved.") % {"iface": iface},
@@ -1483,7 +1717,7 @@ class ApplicationHandler(ApplicationModel):
             ),
             size=parameter.Size(height=10),
         )
-        return ""
+        self._open_main_menu()
 
     # ------------------------------------------------------------------
     # Bond creation dialog.
@@ -1576,8 +1810,6 @@ class ApplicationHandler(ApplicationModel):
                     parameter.MsgBoxParams(err, _("Bond creation")),
                     size=parameter.Size(height=10),
                 )
-                return
-            self._open_main_menu()
         elif self._is_cancel_or_esc(button_type, key):
             self._open_network_interface_select()
 
@@ -1605,16 +1837,34 @@ class ApplicationHandler(ApplicationModel):
             bond_members=members,
             dhcp4=True,
         )
-        ok = cui.network.create_bond(cfg)
+        self.run_host_task(
+            cui.network.create_bond_async(cfg),
+            lambda ok: self._on_bond_created(name, len(members), ok),
+            parameter.MsgBoxParams(
+                _("Creating the bond device %(name)s ...") % {"name": name},
+                _("Bond creation"),
+            ),
+            lambda _exc: self._on_bond_created(name, len(members), False),
+        )
+        return ""
+
+    def _on_bond_created(self, name: str, count: int, ok: bool):
+        """Report the result of creating a bond."""
         if not ok:
-            return _("Failed to create the bond device.")
+            self.message_box(
+                parameter.MsgBoxParams(
+                    _("Failed to create the bond device."), _("Bond creation"),
+                ),
+                size=parameter.Size(height=10),
+            )
+            return
         self.message_box(
             parameter.MsgBoxParams(
                 _("Bond %(name)s created with %(count)d members.") % {
-                    "name": name, "count": len(members),
+                    "name": name, "count": count,
                 },
                 _("Bond creation"),
             ),
             size=parameter.Size(height=10),
         )
-        return ""
+        self._open_main_menu()
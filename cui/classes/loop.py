@@ -0,0 +1,194 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: 2026 grommunio GmbH
+"""The module contains the main loop used by the console user interface"""
+import asyncio
+import itertools
+import syslog
+import time
+import traceback
+from typing import Any, Callable, Coroutine, List, Optional, Set, Tuple
+
+import urwid
+
+# Keys which are collapsed when they queue up while a key is held
+REPEAT_KEYS = frozenset(("up", "down", "page up", "page down"))
+# A key arriving within this many seconds of the last one continues the hold
+KEY_REPEAT_GAP: float = 0.15
+# Held keys step once more per this many seconds of holding, up to the maximum
+KEY_ACCELERATION_STEP: float = 1.0
+KEY_ACCELERATION_MAX: int = 4
+
+
+def log_task_error(exc: BaseException):
+    """Write the traceback of a failed background task to the system log."""
+    lines = traceback.format_exception(type(exc), exc, exc.__traceback__)
+    for line in "".join(lines).splitlines():
+        syslog.syslog(syslog.LOG_ERR, line)
+
+
+class GMainLoop(urwid.MainLoop):
+    """
+    urwid.MainLoop which paints at most one frame per event loop iteration.
+
+    Code changing the widgets only calls request_draw(); the frame is painted
+    once when the event loop is about to go idle, i.e. after the input, alarm
+    or pipe callback has finished. draw_screen() still paints immediately, for
+    long running actions which block the loop (e.g. progress bars).
+
+    Registered draw hooks are told whenever a frame was painted; frame_time
+    and key_latency tell them how long it took.
+
+    Runs of the same navigation key queued up while a key is held (terminal
+    auto-repeat outpacing the painting) are passed to the widgets in one go,
+    so they scroll by the whole run before the next frame is painted instead
+    of going on scrolling after the key has been released. In the scroll
+    views, i.e. if a widget in the focus path has a true accelerate_keys
+    attribute, a held key moves further the longer it is held.
+
+    The loop runs on asyncio, so coroutines (e.g. host commands from
+    cui.hostcmd) can run alongside the input handling and the clock; see
+    run_task().
+    """
+
+    asyncio_loop: asyncio.AbstractEventLoop
+    draw_hooks: List[Callable[["GMainLoop"], Any]]
+    _tasks: Set[asyncio.Future]
+    # Number of frames painted so far
+    frames: int = 0
+    # The last input and the number of frames it caused
+    key_frames: Optional[Tuple[Any, int]] = None
+    # Seconds the last frame took to render and paint
+    frame_time: float = 0.0
+    # Seconds from the input to the end of the last frame, None if the frame
+    # was not caused by input
+    key_latency: Optional[float] = None
+    _key_time: Optional[float] = None
+    _dirty: bool = True
+    _key: Optional[Any] = None
+    _key_start: int = 0
+    # The held key, when the hold started and when the key came last
+    _held: Optional[str] = None
+    _held_since: float = 0.0
+    _held_last: float = 0.0
+
+    def __init__(self, *args, **kwargs):
+        self.asyncio_loop = asyncio.new_event_loop()
+        # Also attaches the child watcher asyncio subprocesses need
+        asyncio.set_event_loop(self.asyncio_loop)
+        kwargs.setdefault("event_loop", urwid.AsyncioEventLoop(loop=self.asyncio_loop))
+        super().__init__(*args, **kwargs)
+        self.draw_hooks = []
+        self._tasks = set()
+
+    def run_task(
+            self, coro: Coroutine,
+            callback: Optional[Callable[[Any], Any]] = None,
+            errback: Optional[Callable[[BaseException], Any]] = None,
+    ):
+        """
+        Run the coroutine on the loop and pass its result on to callback.
+
+        The callback is called from the loop like an alarm, so the changes it
+        makes to the widgets are painted once it returned. If the coroutine
+        raised or was cancelled, the traceback goes to the system log and
+        errback, if given, is called with the exception instead; raised from
+        the alarm, it would end the console UI.
+        """
+        def done(task: asyncio.Future):
+            self.event_loop.alarm(0, lambda: finish(task))
+
+        def finish(task: asyncio.Future):
+            self._tasks.discard(task)
+            self._dirty = True
+            try:
+                result = task.result()
+            except (Exception, asyncio.CancelledError) as exc:  # pylint: disable=broad-except
+                log_task_error(exc)
+                if errback is not None:
+                    errback(exc)
+                return
+            if callback is not None:
+                callback(result)
+
+        task = self.asyncio_loop.create_task(coro)
+        # asyncio only keeps weak references to running tasks
+        self._tasks.add(task)
+        task.add_done_callback(done)
+        return task
+
+    def request_draw(self):
+        """Have the screen painted once the loop goes idle."""
+        self._dirty = True
+
+    def start(self):
+        """Start the screen and paint it on the next idle."""
+        self._dirty = True
+        return super().start()
+
+    def process_input(self, keys) -> bool:
+        """Pass the input on and count the frames it causes."""
+        self._dirty = True
+        if keys and self._key is None:
+            self._key = keys[-1]
+            self._key_start = self.frames
+        if keys and self._key_time is None:
+            self._key_time = time.perf_counter()
+        runs = []
+        for key, run in itertools.groupby(keys):
+            count = len(list(run))
+            if isinstance(key, str) and key in REPEAT_KEYS:
+                count *= self._acceleration(key)
+            else:
+                self._held = None
+            runs.append([key] * count)
+        # Through urwid, so keys the widgets leave reach unhandled_input
+        return super().process_input(list(itertools.chain.from_iterable(runs)))
+
+    def _acceleration(self, key: str) -> int:
+        """Return the steps per press of a navigation key, more if it is held."""
+        now = time.monotonic()
+        if key != self._held or now - self._held_last > KEY_REPEAT_GAP:
+            self._held = key
+            self._held_since = now
+        self._held_last = now
+        if not self._accelerates_keys():
+            return 1
+        return min(1 + int((now - self._held_since) / KEY_ACCELERATION_STEP),
+                   KEY_ACCELERATION_MAX)
+
+    def _accelerates_keys(self) -> bool:
+        """Return True if a widget in the focus path opted in to accelerated keys."""
+        widget = self._topmost_widget
+        while widget is not None:
+            if getattr(widget, "accelerate_keys", False):
+                return True
+            if isinstance(widget, urwid.WidgetDecoration):
+                widget = widget.original_widget
+            elif isinstance(widget, urwid.WidgetContainerMixin):
+                widget = widget.focus
+            elif isinstance(widget, urwid.WidgetWrap):
+                widget = widget._w  # pylint: disable=protected-access
+            else:
+                return False
+        return False
+
+    def entering_idle(self):
+        """Paint the pending frame, if any."""
+        if self._dirty:
+            super().entering_idle()
+        if self._key is not None:
+            self.key_frames = (self._key, self.frames - self._key_start)
+            self._key = None
+
+    def draw_screen(self):
+        """Render the widgets, paint the screen and call the draw hooks."""
+        self._dirty = False
+        start = time.perf_counter()
+        super().draw_screen()
+        end = time.perf_counter()
+        self.frame_time = end - start
+        self.key_latency = None if self._key_time is None else end - self._key_time
+        self._key_time = None
+        self.frames += 1
+        for hook in list(self.draw_hooks):
+            hook(self)
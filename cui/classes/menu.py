@@ -14,6 +14,8 @@ class MenuItem(GText):
 
     application: BaseApplication = None
     _selectable = True
+    # Registered once for the class by urwid's MetaSignals
+    signals = ["activate"]
 
     def __init__(
         self,
@@ -25,7 +27,6 @@ class MenuItem(GText):
         GText.__init__(self, caption)
         self.idx = menu_id
         self.description = description
-        urwid.register_signal(self.__class__, ["activate"])
         self.application = app
 
     def keypress(self, _, key: str = "") -> str:
@@ -1,32 +1,46 @@
 # SPDX-License-Identifier: AGPL-3.0-or-later
 # SPDX-FileCopyrightText: 2022 grommunio GmbH
 """The module contains the application model of the grommunio-cui"""
-import datetime
+import bisect
 import os
 import re
 import subprocess
-import time
 from pathlib import Path
-from typing import Dict, Any, List, Tuple, Set
+from typing import Callable, Coroutine, Dict, Any, List, Optional, Tuple, Set
 
 import urwid
-import yaml
-from systemd import journal
 
 import cui.classes
 import cui.classes.button
 from cui.symbol import LOG_VIEWER, MAIN, MESSAGE_BOX, INPUT_BOX, PASSWORD, \
-    MAIN_MENU, ADMIN_WEB_PW, TIMESYNCD, REPO_SELECTION, KEYBOARD_SWITCH
-from cui import util, parameter
+    MAIN_MENU, ADMIN_WEB_PW, TIMESYNCD, REPO_SELECTION, KEYBOARD_SWITCH, BUSY, LOG_SEARCH
+from cui import util, parameter, factcache, hostcmd
 from cui.util import _
 from cui.classes.interface import BaseApplication
 from cui.classes.button import GButton, GBoxButton
 from cui.classes.application import MainFrame, setup_state
-from cui.classes.gwidgets import GText, GEdit
+from cui.classes.gwidgets import GText, GEdit, GLineList
 from cui.classes.scroll import ScrollBar, Scrollable
+from cui.profiling import profiler, render_stats
+from cui.localization import localization
 
 _ = cui.util.init_localization()
 
+# Seconds between two frames showing the new entries in the log viewer's follow mode
+FOLLOW_REDRAW_INTERVAL: float = 0.25
+# Seconds between two frames showing the new results of a search of all logfiles
+SEARCH_REDRAW_INTERVAL: float = 0.25
+# Frames of the spinner shown while a host command is running
+SPINNER = ("|", "/", "-", "\\")
+
+# The grommunio-admin config dump is recomputed when one of these changes
+ADMIN_CONFIG_SOURCES = (
+    "/usr/sbin/grommunio-admin",
+    "/etc/grommunio-admin-api/config.yaml",
+    "/etc/grommunio-admin-api/conf.d",
+    "/usr/share/grommunio-admin-api/config.yaml",
+)
+
 
 class ApplicationModel(BaseApplication):
     """
@@ -35,56 +49,73 @@ class ApplicationModel(BaseApplication):
     admin_api_config: Dict[str, Any]
     view: cui.classes.application.View
     control: cui.classes.application.Control
+    # The spinner of the busy box while it is shown
+    _busy_spinner: Optional[GText] = None
+    # The running repository update, see cui.repository
+    _repo_apply: Optional["cui.repository.RepoApply"] = None
+    # The running or finished package update, see cui.pkgupdate
+    _pkg_update: Optional["cui.pkgupdate.PackageUpdate"] = None
 
     def __init__(self):
-        setup_state.set_setup_states()
         self.admin_api_config = {}
         self.view = cui.classes.application.View(self)
         self.control = cui.classes.application.Control(MAIN)
         # MAIN Page
-        self.control.app_control.loop = util.create_main_loop(self)
+        with profiler.phase("create_main_loop"):
+            self.control.app_control.loop = util.create_main_loop(self)
         self.control.app_control.loop.set_alarm_in(1, self._update_clock)
 
-        cui.classes.button.create_application_buttons(self)
+        # The setup state probes run in the background, the welcome screen
+        # shows them as being checked until their results arrive.
+        self._setup_state_pipe = self.control.app_control.loop.watch_pipe(
+            self._on_setup_state_probed
+        )
+        with profiler.phase("setup_state.refresh"):
+            self.refresh_setup_state()
 
-        self.view.top_main_menu.refresh_main_menu()
+        with profiler.phase("create_application_buttons"):
+            cui.classes.button.create_application_buttons(self)
 
-        # Password Dialog
-        self._prepare_password_dialog()
+        with profiler.phase("refresh_main_menu"):
+            self.view.top_main_menu.refresh_main_menu()
+
+        # Dialogs are built on first use and then reused
+        self.view.dialogs.register(PASSWORD, self._prepare_password_dialog)
+        self.view.dialogs.register(TIMESYNCD, self._prepare_timesyncd_config)
+        self.view.dialogs.register(REPO_SELECTION, self._prepare_repo_config)
+        self.view.dialogs.register(KEYBOARD_SWITCH, self._prepare_kbd_config)
+        self.view.dialogs.register(LOG_VIEWER, self._prepare_log_viewer)
+        self.view.dialogs.register(LOG_SEARCH, self._prepare_log_search)
 
         # Read in logging units
-        self._load_journal_units()
+        with profiler.phase("_load_journal_units"):
+            self._load_journal_units()
 
         # Log file viewer
         self.log_file_content: List[str] = [
             _("If this is not that what you expected to see, you probably have insufficient "
                "permissions."),
         ]
-        self._prepare_log_viewer("NetworkManager", self.control.log_control.log_line_count)
-
-        self._prepare_timesyncd_config()
 
         # some settings
         GButton.application = self
 
     def prepare_mainscreen(self):
-        """Prepare main screen."""
-        # self.view.header = Header()
-        self.view.main_frame = MainFrame(self)
+        """Prepare main screen, building its widgets on first use only."""
         self.view.header.refresh_header()
-        self.view.main_frame.vsplitbox = urwid.Pile(
-            [
-                ("weight", 50, urwid.AttrMap(self.view.main_frame.main_top, "body")),
-                ("weight", 50, self.view.main_frame.main_bottom),
-            ]
-        )
-        self.view.main_footer.footer = urwid.Pile(self.view.main_footer.footer_content)
-        frame = urwid.Frame(
-            urwid.AttrMap(self.view.main_frame.vsplitbox, "reverse"),
-            header=self.view.header.info.header,
-            footer=self.view.main_footer.footer,
-        )
-        self.view.main_frame.mainframe = frame
+        if getattr(self.view, "main_frame", None) is None:
+            self.view.main_frame = MainFrame(self)
+            self.view.main_frame.vsplitbox = urwid.Pile(
+                [
+                    ("weight", 50, urwid.AttrMap(self.view.main_frame.main_top, "body")),
+                    ("weight", 50, self.view.main_frame.main_bottom),
+                ]
+            )
+            self.view.main_frame.mainframe = urwid.Frame(
+                urwid.AttrMap(self.view.main_frame.vsplitbox, "reverse"),
+                header=self.view.header.info.header,
+                footer=self.view.main_footer.footer,
+            )
         self.control.app_control.body = self.view.main_frame.mainframe
         # self.print(_("Idle"))
 
@@ -157,8 +188,11 @@ class ApplicationModel(BaseApplication):
                 ]
             ),
         )
+        return self.password_frame
 
-    def _load_journal_units(self):
+    @staticmethod
+    def _read_admin_config_dump() -> str:
+        """Return the output of grommunio-admin config dump."""
         exe = "/usr/sbin/grommunio-admin"
         out = ""
         if Path(exe).exists():
@@ -171,11 +205,18 @@ class ApplicationModel(BaseApplication):
                 out = process.communicate()[0]
             if isinstance(out, bytes):
                 out = out.decode()
+        return out
+
+    def _load_journal_units(self):
+        out = factcache.cached(
+            "admin-config-dump", self._read_admin_config_dump, ADMIN_CONFIG_SOURCES
+        )
         if out == "":
             self.admin_api_config = {
                 "logs": {"gromox-http": {"source": "gromox-http.service"}}
             }
         else:
+            import yaml  # pylint: disable=import-outside-toplevel
             self.admin_api_config = yaml.load(out, Loader=yaml.SafeLoader)
         self.control.log_control.log_units = self.admin_api_config.get(
             "logs", {"gromox-http": {"source": "gromox-http.service"}}
@@ -187,15 +228,13 @@ class ApplicationModel(BaseApplication):
 
     def _get_logging_formatter(self) -> str:
         """Get logging formatter."""
+        import cui.journal  # pylint: disable=import-outside-toplevel
         default = (
             self.admin_api_config.get("logging", {})
             .get("formatters", {})
             .get("mi-default", {})
         )
-        return default.get(
-            "format",
-            '[%(asctime)s] [%(levelname)s] (%(module)s): "%(message)s"',
-        )
+        return default.get("format", cui.journal.DEFAULT_FORMAT)
 
     def _get_log_unit_by_id(self, idx) -> str:
         """Get logging unit by idx."""
@@ -211,35 +250,17 @@ class ApplicationModel(BaseApplication):
         :param unit: The journal unit to be viewed.
         :param lines: The number of lines to be viewed. (0 = unlimited)
         """
-        unitname: str = (
-            unit if unit.strip().endswith(".service") else f"{unit}.service"
-        )
-
-        reader = journal.Reader()
-        reader.this_boot()
-        # reader.log_level(sj.LOG_INFO)
-        reader.add_match(_SYSTEMD_UNIT=unitname)
-        # h = 60 * 60
-        # d = 24 * h
-        # sincetime = time.time() - 4 * d
-        # reader.seek_realtime(sincetime)
-        line_list: List[str] = []
-        for entry in reader:
-            if entry.get("__REALTIME_TIMESTAMP", "") == "":
-                continue
-            format_dict = {
-                "asctime": entry.get(
-                    "__REALTIME_TIMESTAMP",
-                    datetime.datetime(1970, 1, 1, 0, 0, 0),
-                ).isoformat(),
-                "levelname": entry.get("PRIORITY", ""),
-                "module": entry.get(
-                    "_SYSTEMD_UNIT", "gromox-http.service"
-                ).split(".service")[0],
-                "message": entry.get("MESSAGE", ""),
-            }
-            line_list.append(self._get_logging_formatter() % format_dict)
-        self.log_file_content = line_list[-lines:]
+        import cui.journal  # pylint: disable=import-outside-toplevel
+        log_control = self.control.log_control
+        unitname: str = cui.journal.unit_name(unit)
+        units = self._get_log_viewer_units(unit)
+        if log_control.log_filter is None:
+            log_control.log_filter = log_control.log_shown_filter = cui.journal.LogFilter()
+        if log_control.log_tail is None or log_control.log_tail.units != units:
+            log_control.log_tail = cui.journal.JournalTail(
+                units, self._get_logging_formatter(), log_control.log_cursor
+            )
+        self.log_file_content = log_control.log_tail.tail(lines)
         found: bool = False
         pre: List[str] = []
         post: List[str] = []
@@ -253,12 +274,34 @@ class ApplicationModel(BaseApplication):
                     pre.append(src[:-8])
                 else:
                     post.append(src[:-8])
-        header = (
-            _("Use the arrow keys to switch between logfiles. <LEFT> and <RIGHT> "
-              "switch the logfile, while <+> and <-> changes the line count to view. "
-              "(%s)") % self.control.log_control.log_line_count
+        unit_row = [
+            ("body", "*** "),
+            ("body", " ".join(pre[-3:])),
+            ("reverse", cur),
+            ("body", " ".join(post[:3])),
+            ("body", " ***"),
+        ]
+        if log_control.log_merged:
+            # Numbered, for showing and hiding them; the shown ones reversed
+            unit_row = [
+                ("reverse" if src in units else "body", f" {i}:{src[:-8]} ")
+                for i, src in enumerate(self._get_log_sources()[:9], 1)
+            ]
+        log_control.log_header = GText(("body", self._get_log_viewer_header()), urwid.CENTER)
+        log_control.log_filter_row = GText(("body", ""), urwid.CENTER)
+        log_control.log_rows = [GText(line) for line in self.log_file_content]
+        log_control.log_shown = None
+        log_control.log_marked = set()
+        log_control.log_lines = urwid.Pile(list(log_control.log_rows))
+        log_control.log_body = urwid.WidgetPlaceholder(
+            ScrollBar(Scrollable(log_control.log_lines), accelerate_keys=True)
         )
-        self.control.log_control.log_viewer = urwid.LineBox(
+        if log_control.log_filter:
+            self._filter_log_viewer()
+        if log_control.log_tail.anchor_age is not None:
+            self._show_log_anchor()
+        self._show_log_filter()
+        return urwid.LineBox(
             urwid.AttrMap(
                 urwid.Pile(
                     [
@@ -266,7 +309,7 @@ class ApplicationModel(BaseApplication):
                             2,
                             urwid.Filler(
                                 urwid.Padding(
-                                    GText(("body", header), urwid.CENTER),
+                                    log_control.log_header,
                                     urwid.CENTER,
                                     urwid.RELATIVE_100,
                                 )
@@ -276,59 +319,442 @@ class ApplicationModel(BaseApplication):
                             1,
                             urwid.Columns(
                                 [
-                                    urwid.Filler(
-                                        GText(
-                                            [
-                                                ("body", "*** "),
-                                                (
-                                                    "body",
-                                                    " ".join(pre[-3:]),
-                                                ),
-                                                ("reverse", cur),
-                                                (
-                                                    "body",
-                                                    " ".join(post[:3]),
-                                                ),
-                                                ("body", " ***"),
-                                            ],
-                                            urwid.CENTER,
-                                        )
-                                    )
+                                    urwid.Filler(GText(unit_row, urwid.CENTER))
                                 ]
                             ),
                         ),
-                        urwid.AttrMap(
-                            ScrollBar(
-                                Scrollable(
-                                    urwid.Pile(
-                                        [
-                                            GText(line)
-                                            for line in self.log_file_content
-                                        ]
-                                    )
-                                )
-                            ),
-                            "default",
-                        ),
+                        (1, urwid.Filler(log_control.log_filter_row)),
+                        urwid.AttrMap(log_control.log_body, "default"),
                     ]
                 ),
                 "body",
             )
         )
 
+    def _get_log_viewer_header(self) -> str:
+        if self.control.log_control.log_cursor:
+            return _("Showing the entries around a search result. <ESC> returns to the "
+                     "results, while <+> and <-> changes the line count to view. "
+                     "(%s)") % self.control.log_control.log_line_count
+        if self.control.log_control.log_follow is not None:
+            return _("Showing new entries as they are logged. <F> stops following, "
+                     "<PAGE UP> and <PAGE DOWN> scroll, <END> returns to the newest entry.")
+        if self.control.log_control.log_merged:
+            header = _("All logfiles merged by time. <1> to <9> show or hide a logfile, "
+                       "<M> returns to a single logfile, while <+> and <-> changes the "
+                       "line count to view. (%s)") % self.control.log_control.log_line_count
+        else:
+            header = _("Use the arrow keys to switch between logfiles. <LEFT> and <RIGHT> "
+                       "switch the logfile, while <+> and <-> changes the line count to view. "
+                       "(%s)") % self.control.log_control.log_line_count
+            header = f"{header} {_('<M> merges all logfiles.')}"
+        return f"{header} {_('<F> follows new entries.')}"
+
+    def _show_log_filter(self):
+        """Show the filter of the log viewer and how many lines pass it."""
+        import cui.journal  # pylint: disable=import-outside-toplevel
+        log_control = self.control.log_control
+        log_filter = log_control.log_filter
+        if not log_filter and not log_control.log_filter_editing:
+            log_control.log_filter_row.set_text(
+                ("body", _("</> filters the lines by text, <V> and <W> by priority, "
+                           "<G> searches all logfiles."))
+            )
+            return
+        parts = []
+        if log_control.log_filter_editing:
+            parts.append(_("Filter: %s") % f"{log_filter.text}_")
+            parts.append(_("<ENTER> ends the input, <ESC> clears it."))
+        elif log_filter.text:
+            parts.append(_("Filter: %s") % log_filter.text)
+        if log_filter.max_priority is not None:
+            parts.append(_("Priority: %s and above") % cui.journal.PRIORITY_NAMES[
+                log_filter.max_priority
+            ])
+        if log_control.log_follow is None:
+            shown = len(self.log_file_content)
+            if log_control.log_shown is not None:
+                shown = len(log_control.log_shown)
+            parts.append(_("%(shown)d of %(total)d lines") % {
+                "shown": shown, "total": len(self.log_file_content),
+            })
+        log_control.log_filter_row.set_text(("body", "  ".join(parts)))
+
+    def _set_log_filter(self, max_priority: Optional[int], text: str):
+        """Show the lines of max_priority or more severe (all with None) containing text."""
+        import cui.journal  # pylint: disable=import-outside-toplevel
+        self.control.log_control.log_filter = cui.journal.LogFilter(max_priority, text)
+        self._filter_log_viewer()
+        self._show_log_filter()
+
+    def _filter_log_viewer(self):
+        """Show the rows of the log viewer's lines passing the filter, matches highlighted.
+
+        The lines of the wanted priorities come from the index of the journal
+        tail, and a filter narrowing the shown one only searches the lines
+        shown. The row widgets are reused; only those whose highlighting
+        changes are updated.
+        """
+        log_control = self.control.log_control
+        log_filter = log_control.log_filter
+        content = self.log_file_content
+        tail = log_control.log_tail
+        if log_filter.text and log_control.log_shown is not None \
+                and log_filter.narrows(log_control.log_shown_filter):
+            candidates = log_control.log_shown
+        elif log_filter.max_priority is not None:
+            candidates = tail.select(len(content), log_filter.max_priority)
+        else:
+            candidates = range(len(content))
+        first = len(tail.priorities) - len(content)
+        if log_filter.text:
+            shown = [
+                pos for pos in candidates
+                if log_filter.accepts(tail.priorities[first + pos], content[pos])
+            ]
+        else:
+            shown = list(candidates)
+        marked: Set[int] = set()
+        if log_filter.text:
+            retext = log_filter.text != log_control.log_shown_filter.text
+            for pos in shown:
+                if retext or pos not in log_control.log_marked:
+                    spans = log_filter.spans(content[pos])
+                    if not spans:
+                        continue
+                    log_control.log_rows[pos].set_text(self._highlight(content[pos], spans))
+                marked.add(pos)
+        for pos in log_control.log_marked - marked:
+            log_control.log_rows[pos].set_text(content[pos])
+        log_control.log_marked = marked
+        options = log_control.log_lines.options()
+        log_control.log_lines.contents[:] = [
+            (log_control.log_rows[pos], options) for pos in shown
+        ]
+        log_control.log_shown = shown if log_filter else None
+        log_control.log_shown_filter = log_filter
+
+    def _show_log_anchor(self):
+        """Show the entry the log viewer was opened for reversed, in the middle."""
+        log_control = self.control.log_control
+        pos = len(self.log_file_content) - 1 - log_control.log_tail.anchor_age
+        if pos < 0:
+            return
+        log_control.log_rows[pos].set_text(("reverse", self.log_file_content[pos]))
+        log_control.log_marked.add(pos)
+        if log_control.log_shown is not None:
+            pos = bisect.bisect_left(log_control.log_shown, pos)
+        # The Scrollable inside the ScrollBar
+        log_control.log_body.original_widget.original_widget.scroll_to_item(pos)
+
+    @staticmethod
+    def _highlight(line: str, spans: List[Tuple[int, int]]) -> List[Any]:
+        """Return line as markup with the spans reversed."""
+        markup: List[Any] = []
+        end = 0
+        for start, stop in spans:
+            markup += [line[end:start], ("reverse", line[start:stop])]
+            end = stop
+        markup.append(line[end:])
+        return markup
+
+    def _get_log_sources(self) -> List[str]:
+        """Return the units of the configured logfiles, in their order."""
+        import cui.journal  # pylint: disable=import-outside-toplevel
+        return [
+            cui.journal.unit_name(log.get("source", ""))
+            for log in self.control.log_control.log_units.values()
+        ]
+
+    def _get_log_viewer_units(self, unit: str) -> Tuple[str, ...]:
+        """Return the units the log viewer shows: unit, or the merged ones."""
+        import cui.journal  # pylint: disable=import-outside-toplevel
+        log_control = self.control.log_control
+        if not log_control.log_merged:
+            return (cui.journal.unit_name(unit),)
+        return tuple(
+            src for src in self._get_log_sources() if src not in log_control.log_hidden_units
+        )
+
+    def _start_log_follow(self, units: Tuple[str, ...]):
+        """Show the new entries of units below the shown ones as they are logged."""
+        import cui.journal  # pylint: disable=import-outside-toplevel
+        log_control = self.control.log_control
+        loop = self.control.app_control.loop
+        log_control.log_follow = cui.journal.JournalFollow(units, self._get_logging_formatter())
+        lines = self.log_file_content
+        if log_control.log_shown is not None:
+            lines = [lines[pos] for pos in log_control.log_shown]
+        log_control.log_buffer = cui.journal.LogBuffer(lines)
+        log_control.log_follow_tail = cui.classes.gwidgets.GTail(log_control.log_buffer)
+        log_control.log_follow_seen = log_control.log_buffer.version
+        log_control.log_follow_handle = loop.watch_file(
+            log_control.log_follow.fileno(), self._read_log_follow
+        )
+        log_control.log_body.original_widget = log_control.log_follow_tail
+        log_control.log_header.set_text(("body", self._get_log_viewer_header()))
+        self._show_log_filter()
+        log_control.log_follow_alarm = loop.set_alarm_in(
+            FOLLOW_REDRAW_INTERVAL, self._show_log_follow
+        )
+        loop.request_draw()
+
+    def _stop_log_follow(self):
+        """Stop following; the viewer is read anew when it is opened next."""
+        log_control = self.control.log_control
+        if log_control.log_follow is None:
+            return
+        loop = self.control.app_control.loop
+        loop.remove_watch_file(log_control.log_follow_handle)
+        # Else a follow started before the alarm is due would get a second one
+        loop.remove_alarm(log_control.log_follow_alarm)
+        log_control.log_follow.close()
+        log_control.log_follow = None
+        log_control.log_buffer = None
+        log_control.log_follow_tail = None
+        log_control.log_follow_handle = None
+        log_control.log_follow_alarm = None
+        log_control.log_viewer_stamp = ()
+
+    def _read_log_follow(self):
+        """Read the new entries passing the filter into the buffer; they are
+        shown by _show_log_follow().
+
+        Only collecting them here batches a burst of entries into one frame.
+        A large burst is read in steps, so the keys are handled in between.
+        """
+        import cui.journal  # pylint: disable=import-outside-toplevel
+        log_control = self.control.log_control
+        if log_control.log_follow is None:
+            return
+        entries = log_control.log_follow.read()
+        log_filter = log_control.log_filter
+        log_control.log_buffer.extend([
+            line for priority, line in entries if log_filter.accepts(priority, line)
+        ])
+        if len(entries) >= cui.journal.FOLLOW_BATCH:
+            self.control.app_control.loop.set_alarm_in(0, lambda *_: self._read_log_follow())
+
+    def _show_log_follow(self, cb_loop: urwid.MainLoop, _data: Any = None):
+        """Show the new entries, a few times a second."""
+        log_control = self.control.log_control
+        if log_control.log_follow is None:
+            return
+        # Also catches up where the file descriptor does not wake us reliably
+        self._read_log_follow()
+        if log_control.log_buffer.version != log_control.log_follow_seen:
+            log_control.log_follow_seen = log_control.log_buffer.version
+            log_control.log_follow_tail.refresh()
+            cb_loop.request_draw()
+        log_control.log_follow_alarm = cb_loop.set_alarm_in(
+            FOLLOW_REDRAW_INTERVAL, self._show_log_follow
+        )
+
+    def _resize_log_viewer(self, lines: int):
+        """Show the last lines of the cached log viewer's unit.
+
+        Only the lines added or dropped at the top are read and changed.
+        """
+        log_control = self.control.log_control
+        content = log_control.log_tail.tail(lines)
+        shown = len(self.log_file_content)
+        # The positions change, drop the highlighting before
+        for pos in log_control.log_marked:
+            log_control.log_rows[pos].set_text(self.log_file_content[pos])
+        log_control.log_marked = set()
+        if len(content) > shown:
+            rows = [GText(line) for line in content[:len(content) - shown]]
+            log_control.log_rows[:0] = rows
+            if not log_control.log_filter:
+                log_control.log_lines.contents[:0] = [
+                    (row, log_control.log_lines.options()) for row in rows
+                ]
+        elif len(content) < shown:
+            del log_control.log_rows[:shown - len(content)]
+            if not log_control.log_filter:
+                del log_control.log_lines.contents[:shown - len(content)]
+        self.log_file_content = content
+        if log_control.log_filter:
+            log_control.log_shown = None
+            self._filter_log_viewer()
+        if log_control.log_tail.anchor_age is not None:
+            self._show_log_anchor()
+        log_control.log_header.set_text(("body", self._get_log_viewer_header()))
+        self._show_log_filter()
+
     def _open_log_viewer(self, unit: str, lines: int = 0):
         """
         Opens log file viewer.
         """
-        if self.control.app_control.current_window != LOG_VIEWER:
+        if self.control.app_control.current_window not in (LOG_VIEWER, LOG_SEARCH):
             self.control.app_control.log_file_caller = self.control.app_control.current_window
             self.control.app_control.log_file_caller_body = self.control.app_control.body
-            self.control.app_control.current_window = LOG_VIEWER
+        self.control.app_control.current_window = LOG_VIEWER
         self.print(_("Log file viewer has to open file {%s} ...") % unit)
-        self._prepare_log_viewer(unit, lines)
+        self.control.log_control.log_unit = unit
+        stamp = (
+            self._get_log_viewer_units(unit),
+            util.get_journal_stamp(),
+            self.control.log_control.log_cursor,
+        )
+        if stamp != self.control.log_control.log_viewer_stamp:
+            # Another unit or new entries, read the tail anew
+            self.view.dialogs.invalidate(LOG_VIEWER)
+            self.control.log_control.log_viewer_stamp = stamp
+            self.control.log_control.log_tail = None
+        elif self.view.dialogs.is_built(LOG_VIEWER):
+            self._resize_log_viewer(lines)
+        self.control.log_control.log_viewer = self.view.dialogs.get(LOG_VIEWER, unit, lines)
         self.control.app_control.body = self.control.log_control.log_viewer
         self.control.app_control.loop.widget = self.control.app_control.body
 
+    def _prepare_log_search(self):
+        """
+        Prepares the search of all logfiles, showing the last search and its results.
+        """
+        log_control = self.control.log_control
+        texts = [
+            edit.edit_text if edit is not None else ""
+            for edit in (
+                log_control.log_search_edit,
+                log_control.log_search_since,
+                log_control.log_search_until,
+            )
+        ]
+        log_control.log_search_edit = GEdit((14, _("Search for: ")), edit_text=texts[0])
+        log_control.log_search_since = GEdit((14, _("From: ")), edit_text=texts[1])
+        log_control.log_search_until = GEdit((14, _("To: ")), edit_text=texts[2])
+        log_control.log_search_status = GText(("body", ""), urwid.CENTER)
+        search = log_control.log_search
+        log_control.log_search_results = GLineList(
+            search.lines if search is not None else [], self._open_log_context
+        )
+        self._show_log_search_results()
+        header = GText(
+            (
+                "body",
+                _("Searches the messages of all logfiles in the current boot, from and to "
+                  "a time (YYYY-MM-DD HH:MM or HH:MM) if given. <ENTER> starts the search "
+                  "or shows a result in its logfile, <ESC> stops the search or returns "
+                  "to the log viewer."),
+            ),
+            urwid.CENTER,
+        )
+        return urwid.LineBox(
+            urwid.AttrMap(
+                urwid.Pile(
+                    [
+                        (3, urwid.Filler(header)),
+                        (1, urwid.Filler(log_control.log_search_edit)),
+                        (1, urwid.Filler(log_control.log_search_since)),
+                        (1, urwid.Filler(log_control.log_search_until)),
+                        (1, urwid.Filler(urwid.Divider())),
+                        (1, urwid.Filler(log_control.log_search_status)),
+                        urwid.AttrMap(
+                            ScrollBar(log_control.log_search_results),
+                            "default",
+                        ),
+                    ]
+                ),
+                "body",
+            )
+        )
+
+    def _open_log_search(self):
+        """Opens the search of all logfiles."""
+        self.control.app_control.current_window = LOG_SEARCH
+        self.control.app_control.body = self.view.dialogs.get(LOG_SEARCH)
+        self.control.app_control.loop.widget = self.control.app_control.body
+
+    def _start_log_search(self):
+        """Search all logfiles for the text entered, stopping a running search."""
+        import cui.journal  # pylint: disable=import-outside-toplevel
+        log_control = self.control.log_control
+        self._stop_log_search()
+        text = log_control.log_search_edit.edit_text
+        if not text.strip():
+            log_control.log_search_status.set_text(
+                ("important", _("Enter the text to search for."))
+            )
+            return
+        try:
+            since = cui.journal.parse_time(log_control.log_search_since.edit_text)
+            until = cui.journal.parse_time(log_control.log_search_until.edit_text)
+        except ValueError:
+            log_control.log_search_status.set_text(
+                ("important", _("Enter the times as YYYY-MM-DD HH:MM or HH:MM."))
+            )
+            return
+        search = cui.journal.JournalSearch(
+            self._get_log_sources(), text, since, until, self._get_logging_formatter()
+        )
+        log_control.log_search = search
+        log_control.log_search_results.set_lines(search.lines)
+        self._show_log_search_results()
+        self.run_host_task(
+            search.run(),
+            lambda err: self._on_log_search_done(search, err),
+            on_error=lambda exc: self._on_log_search_done(search, str(exc) or repr(exc)),
+        )
+        self.control.app_control.loop.set_alarm_in(
+            SEARCH_REDRAW_INTERVAL, self._show_log_search, search
+        )
+
+    def _stop_log_search(self):
+        """Stop a running search; the results found so far are kept."""
+        search = self.control.log_control.log_search
+        if search is not None and not search.done:
+            search.cancel()
+
+    def _show_log_search(self, cb_loop: urwid.MainLoop, search: "cui.journal.JournalSearch"):
+        """Show the new results of search while it runs, a few times a second."""
+        if search is not self.control.log_control.log_search or search.done:
+            return
+        self._show_log_search_results()
+        if self.control.app_control.current_window == LOG_SEARCH:
+            cb_loop.request_draw()
+        cb_loop.set_alarm_in(SEARCH_REDRAW_INTERVAL, self._show_log_search, search)
+
+    def _show_log_search_results(self):
+        """Show the results found so far and the state of the search."""
+        log_control = self.control.log_control
+        search = log_control.log_search
+        if search is None:
+            log_control.log_search_status.set_text(("body", _("Nothing searched yet.")))
+            return
+        log_control.log_search_results.refresh()
+        counts = {"scanned": search.scanned, "found": len(search.lines)}
+        if not search.done:
+            status = _("Searching ... %(scanned)d entries scanned, %(found)d found.")
+        elif search.cancelled:
+            status = _("Stopped after %(scanned)d entries, %(found)d found.")
+        elif counts["found"] >= search.limit:
+            status = _("Showing the first %(found)d results, %(scanned)d entries scanned.")
+        else:
+            status = _("%(scanned)d entries scanned, %(found)d found.")
+        log_control.log_search_status.set_text(("body", status % counts))
+
+    def _on_log_search_done(self, search: "cui.journal.JournalSearch", err: str):
+        """Show the last results of a search, or why it failed."""
+        if search is not self.control.log_control.log_search:
+            return
+        self._show_log_search_results()
+        if err:
+            self.control.log_control.log_search_status.set_text(
+                ("important", _("The search failed: %s") % err)
+            )
+
+    def _open_log_context(self, index: int):
+        """Open the log viewer on the entries around the search result index."""
+        log_control = self.control.log_control
+        cursor, unit = log_control.log_search.results[index]
+        log_control.log_cursor = cursor
+        log_control.log_merged = False
+        sources = self._get_log_sources()
+        if unit in sources:
+            log_control.current_log_unit = sources.index(unit)
+        self._open_log_viewer(unit.split(".service")[0], log_control.log_line_count)
+
     def _open_reset_aapi_pw(self):
         """Open reset admin-API password."""
         title = _("admin-web Password Change")
@@ -340,7 +766,8 @@ class ApplicationModel(BaseApplication):
         self._reset_layout()
         self.print(_("Opening timesyncd configuration"))
         self.control.app_control.current_window = TIMESYNCD
-        self._prepare_timesyncd_config()
+        self.timesyncd_body = self.view.dialogs.get(TIMESYNCD)
+        self._reset_timesyncd_form()
         self._open_conf_dialog(self.timesyncd_body, [
             self.view.button_store.ok_button, self.view.button_store.cancel_button,
         ], title=_("timesyncd configuration"))
@@ -363,8 +790,8 @@ class ApplicationModel(BaseApplication):
         size: parameter.Size = parameter.Size(60, 15)
         self.dialog(frame, alignment=alignment, size=size, title=title)
 
-    def _prepare_timesyncd_config(self):
-        """Prepare timesyncd configuration form."""
+    def _get_timesyncd_servers(self) -> Tuple[List[str], List[str]]:
+        """Return NTP and fallback NTP servers of the last read timesyncd.conf."""
         ntp_server: List[str] = [
             "0.arch.pool.ntp.org",
             "1.arch.pool.ntp.org",
@@ -377,17 +804,20 @@ class ApplicationModel(BaseApplication):
             "2.opensuse.pool.ntp.org",
             "3.opensuse.pool.ntp.org",
         ]
-        self.control.menu_control.timesyncd_vars = util.lineconfig_read(
-            "/etc/systemd/timesyncd.conf"
-        )
         ntp_from_file = self.control.menu_control.timesyncd_vars.get("NTP", " ".join(ntp_server))
         fallback_from_file = self.control.menu_control.timesyncd_vars.get(
             "FallbackNTP", " ".join(fallback_server)
         )
-        ntp_server = ntp_from_file.split(" ")
-        fallback_server = fallback_from_file.split(" ")
+        return ntp_from_file.split(" "), fallback_from_file.split(" ")
+
+    def _prepare_timesyncd_config(self):
+        """Prepare timesyncd configuration form."""
+        self.control.menu_control.timesyncd_vars = util.lineconfig_read(
+            "/etc/systemd/timesyncd.conf"
+        )
+        ntp_server, fallback_server = self._get_timesyncd_servers()
         text = _("Insert the NTP servers separated by <SPACE> char.")
-        self.timesyncd_body = urwid.Padding(
+        return urwid.Padding(
                 urwid.Filler(
                     urwid.Pile(
                         [
@@ -406,12 +836,19 @@ class ApplicationModel(BaseApplication):
                 )
             )
 
+    def _reset_timesyncd_form(self):
+        """Drop unsaved input from the timesyncd form."""
+        ntp_server, fallback_server = self._get_timesyncd_servers()
+        self.timesyncd_body.base_widget[1].set_edit_text(" ".join(ntp_server))
+        self.timesyncd_body.base_widget[2].set_edit_text(" ".join(fallback_server))
+
     def _open_repo_conf(self):
         """Open repository configuration form."""
         self._reset_layout()
         self.print(_("Opening repository selection"))
         self.control.app_control.current_window = REPO_SELECTION
-        self._prepare_repo_config()
+        self.control.menu_control.repo_selection_body = self.view.dialogs.get(REPO_SELECTION)
+        self._reset_repo_form()
         self._open_conf_dialog(self.control.menu_control.repo_selection_body, [
             self.view.button_store.save_button, self.view.button_store.cancel_button
         ], title=_("Software repository selection"))
@@ -419,6 +856,7 @@ class ApplicationModel(BaseApplication):
     def _prepare_repo_config(self):
         """Prepare repository configuration form."""
         import cui.distro as _distro
+        import cui.classes.parser  # pylint: disable=import-outside-toplevel
         baseurl = _distro.get_repo_baseurl(channel='community')
         repofile = _distro.get_repo_file_path()
         # For rpm-md repos we can use the existing ConfigParser; for apt the
@@ -456,6 +894,12 @@ class ApplicationModel(BaseApplication):
         if default_type == 'supported':
             is_community = False
             is_supported = True
+        self.control.menu_control.repo_defaults = {
+            "is_community": is_community,
+            "is_supported": is_supported,
+            "user": default_user,
+            "password": default_pw,
+        }
         blank = urwid.Divider('-')
         vblank = (2, GText(' '))
         rbg = []
@@ -475,7 +919,16 @@ class ApplicationModel(BaseApplication):
                 vblank, GEdit(_('Password: '), edit_text=default_pw), vblank
             ])
         ]
-        self.control.menu_control.repo_selection_body = urwid.Padding(urwid.Filler(urwid.Pile(body_content), urwid.TOP))
+        return urwid.Padding(urwid.Filler(urwid.Pile(body_content), urwid.TOP))
+
+    def _reset_repo_form(self):
+        """Drop unsaved input from the repository selection form."""
+        defaults = self.control.menu_control.repo_defaults
+        pile = self.control.menu_control.repo_selection_body.base_widget
+        pile[1].set_state(defaults["is_community"])
+        pile[3].set_state(defaults["is_supported"])
+        pile[4][1].set_edit_text(defaults["user"])
+        pile[5][1].set_edit_text(defaults["password"])
 
     def _open_setup_wizard(self):
         """Open grommunio setup wizard."""
@@ -519,6 +972,8 @@ class ApplicationModel(BaseApplication):
         self._reset_layout()
         self.print(_("Returning to main screen."))
         self.control.app_control.current_window = MAIN
+        # The sysinfo panes keep their widgets, only their text is renewed
+        self.view.header.refresh_content()
         self.prepare_mainscreen()
         self.control.app_control.loop.widget = self.control.app_control.body
 
@@ -529,7 +984,7 @@ class ApplicationModel(BaseApplication):
         self.control.app_control.last_current_window = self.control.app_control.current_window
         self.control.app_control.current_window = KEYBOARD_SWITCH
         header = None
-        self._prepare_kbd_config()
+        self.control.menu_control.keyboard_switch_body = self.view.dialogs.get(KEYBOARD_SWITCH)
         footer = None
         frame: parameter.Frame = parameter.Frame(
             body=urwid.AttrMap(self.control.menu_control.keyboard_switch_body, "body"),
@@ -546,7 +1001,8 @@ class ApplicationModel(BaseApplication):
 
         Prefers localectl (works on every supported distro). Falls back to
         editing /etc/vconsole.conf directly and triggering the systemd unit so
-        the system stays usable even if localectl is missing.
+        the system stays usable even if localectl is missing. Both run in the
+        background, the header shows the new layout right away.
         """
         if not isinstance(layout, str):
             # Defensive: when called via the radio button signal we get the
@@ -554,21 +1010,24 @@ class ApplicationModel(BaseApplication):
             # urwid.AttrMap wrapping a RadioButton.
             widget = getattr(layout, "base_widget", layout)
             layout = getattr(widget, "label", str(widget))
+        self.run_host_task(self._store_kbd_layout(layout))
+        self.view.header.set_kbdlayout(layout)
+        # The F5 dialog lists the active layout first
+        self.view.dialogs.invalidate(KEYBOARD_SWITCH)
+        self.view.header.refresh_header()
+
+    @staticmethod
+    async def _store_kbd_layout(layout: str):
+        """Make layout the console keymap, in the background."""
         from cui import localetime as _localetime
-        ok = _localetime.set_keymap(layout)
-        if not ok:
+        if not await _localetime.set_keymap_async(layout):
             file = "/etc/vconsole.conf"
             var = util.minishell_read(file)
             var["KEYMAP"] = layout
             util.minishell_write(file, var)
-            subprocess.run(
-                ["systemctl", "restart", "systemd-vconsole-setup"],
-                check=False,
-                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            await hostcmd.run(
+                ["systemctl", "restart", "systemd-vconsole-setup"], capture=False
             )
-        self.view.header.set_kbdlayout(layout)
-        self.view.header.refresh_head_text()
-        self.view.header.refresh_content()
 
     def _prepare_kbd_config(self):
         """Prepare keyboard config form."""
@@ -599,7 +1058,7 @@ class ApplicationModel(BaseApplication):
             for kbd in all_kbds
             if re.match("^[a-z][a-z]$", kbd)
         ]
-        keyboard_list = [util.get_current_kbdlayout()]
+        keyboard_list = [self.view.header.get_kbdlayout()]
         _ = [
             keyboard_list.append(kbd)
             for kbd in sorted(keyboards)
@@ -619,18 +1078,18 @@ class ApplicationModel(BaseApplication):
         self.control.menu_control.keyboard_list = ScrollBar(Scrollable(
             urwid.Pile(self.control.menu_control.keyboard_content)
         ))
-        self.control.menu_control.keyboard_switch_body = self.control.menu_control.keyboard_list
+        return self.control.menu_control.keyboard_list
 
     def redraw(self):
         """
-        Redraws screen.
+        Redraws screen once the current event has been handled.
         """
-        if getattr(self.control.app_control, "loop", None):
-            if self.control.app_control.loop:
-                self.control.app_control.loop.draw_screen()
         if getattr(self, "view", None):
             if getattr(self.view, "header", None):
                 self.view.header.refresh_header()
+        if getattr(self.control.app_control, "loop", None):
+            if self.control.app_control.loop:
+                self.control.app_control.loop.request_draw()
 
     def _reset_layout(self):
         """
@@ -639,7 +1098,7 @@ class ApplicationModel(BaseApplication):
 
         if getattr(self.control.app_control, "loop", None):
             self.control.app_control.loop.widget = self.control.app_control.body
-            self.control.app_control.loop.draw_screen()
+            self.control.app_control.loop.request_draw()
 
     def print(self, string="", align="left"):
         """
@@ -649,61 +1108,41 @@ class ApplicationModel(BaseApplication):
             string (str): The string to print
             align (str): The alignment of the printed text
         """
-
-        def glen(widget_list):
-            wlist = widget_list
-            res = 0
-            if not wlist:
-                res = 0
-            elif isinstance(wlist, list):
-                for elem in wlist:
-                    if elem:
-                        res += glen(elem)
-            elif isinstance(wlist, GText):
-                res += len(wlist.view)
-            elif isinstance(wlist, str):
-                res += len(wlist)
-            else:
-                res += 0
-            return res
-
-        clock = GText(util.get_clockstring(), right=1)
-        footerbar = GText(util.get_footerbar(2, 10), left=1, right=0)
-        avg_load = GText(util.get_load_avg_format_list(), left=1, right=2)
-        gstring = GText(("footer", string), left=1, right=2)
-        gdebug = GText(
+        footer = self.view.main_footer
+        footer.tick()
+        footer.footerbar.set_text(util.get_footerbar(2, 10))
+        footer.status.set_text(("footer", string))
+        footer.debug_info.set_text(
             [
                 "\n",
                 ("", f"({self.control.app_control.current_event})"),
                 ("", f" on {self.control.app_control.current_window}"),
+                ("", self._get_key_frames_info()),
+                ("", self._get_render_stats_info()),
             ]
         )
-        footer_elements = [clock, footerbar, avg_load]
-        if not self.view.gscreen.quiet:
-            footer_elements += [gstring]
-        content = []
-        rest = []
-        for elem in footer_elements:
-            if glen([content, elem]) < self.view.gscreen.screen.get_cols_rows()[0]:
-                content.append(elem)
-            else:
-                rest.append(elem)
-        col_list = [urwid.Columns([(len(elem), elem) for elem in content])]
-        if len(rest) > 0:
-            col_list += [urwid.Columns([(len(elem), elem) for elem in rest])]
-        if self.view.gscreen.debug:
-            col_list += [urwid.Columns([gdebug])]
-        self.view.main_footer.footer_content = col_list
-        self.view.main_footer.footer = urwid.AttrMap(
-            urwid.Pile(self.view.main_footer.footer_content),
-            "footer"
-        )
+        self._layout_footer()
         swap_widget = getattr(self.control.app_control, "body", None)
         if swap_widget:
             swap_widget.footer = self.view.main_footer.footer
             self.redraw()
         self.control.app_control.current_bottom_info = string
 
+    def _get_key_frames_info(self) -> str:
+        """Return how many frames the previous input caused, for debugging."""
+        loop = getattr(self.control.app_control, "loop", None)
+        if loop is None or loop.key_frames is None:
+            return ""
+        key, frames = loop.key_frames
+        return f" [{key}: {frames} frame{'s' if frames != 1 else ''}]"
+
+    def _get_render_stats_info(self) -> str:
+        """Return the render figures of the current window, for debugging."""
+        if not render_stats.instrumented:
+            return ""
+        info = render_stats.summary(self.control.app_control.current_window)
+        return f"\n{info}" if info else ""
+
     def _create_progress_bar(self, max_progress=100):
         """Create progressbar"""
         self.control.app_control.progressbar = urwid.ProgressBar(
@@ -713,14 +1152,9 @@ class ApplicationModel(BaseApplication):
 
     def _draw_progress(self, progress, max_progress=100):
         """Draw progress at progressbar"""
-        # completion = float(float(progress)/float(max_progress))
-        # self.control.app_control.progressbar.set_completion(completion)
-        time.sleep(0.1)
         self.control.app_control.progressbar.done = max_progress
         self.control.app_control.progressbar.current = progress
-        if progress == max_progress:
-            self._reset_layout()
-        self.control.app_control.loop.draw_screen()
+        self.control.app_control.loop.request_draw()
 
     def message_box(
             self,
@@ -771,6 +1205,81 @@ class ApplicationModel(BaseApplication):
         )
         self.dialog(frame, alignment=alignment, size=size, modal=mb_params.modal)
 
+    def run_host_task(
+            self, coro: Coroutine,
+            on_done: Optional[Callable[[Any], Any]] = None,
+            busy: Optional[parameter.MsgBoxParams] = None,
+            on_error: Optional[Callable[[BaseException], Any]] = None,
+    ):
+        """
+        Runs a host command coroutine without blocking the console UI.
+
+        The clock and the screen keep being updated while it runs. With busy,
+        a box with the message and a spinner is shown and input is ignored
+        until the coroutine has finished; the previous window is restored
+        before on_done is called with the result. If the coroutine raised,
+        the busy box is closed as well and on_error is called instead.
+
+        Args:
+            @param coro: The coroutine, e.g. cui.localetime.set_locale_async().
+            @param on_done: Called with the result of the coroutine.
+            @param busy: Message and title of the busy box.
+            @param on_error: Called with the exception the coroutine raised.
+        """
+        if busy is not None:
+            self._open_busy_box(busy)
+
+        def done(result):
+            if busy is not None:
+                self._close_busy_box()
+            if on_done is not None:
+                on_done(result)
+
+        def failed(exc: BaseException):
+            if busy is not None:
+                self._close_busy_box()
+            if on_error is not None:
+                on_error(exc)
+
+        self.control.app_control.loop.run_task(coro, done, failed)
+
+    def _open_busy_box(self, mb_params: parameter.MsgBoxParams):
+        """Show a message box with a spinner and no buttons."""
+        self.control.app_control.busy_caller = self.control.app_control.current_window
+        self.control.app_control.busy_caller_body = self.control.app_control.loop.widget
+        self.control.app_control.current_window = BUSY
+        self._busy_spinner = GText(SPINNER[0], urwid.CENTER)
+        body = urwid.LineBox(urwid.Padding(
+            urwid.Filler(
+                urwid.Pile([GText(mb_params.msg, urwid.CENTER), urwid.Divider(),
+                            self._busy_spinner]),
+                urwid.TOP,
+            )
+        ))
+        title = _("Please wait") if mb_params.title is None else mb_params.title
+        frame: parameter.Frame = parameter.Frame(
+            body=body,
+            header=GText(title, urwid.CENTER),
+            footer=urwid.Divider(),
+            focus_part="body",
+        )
+        self.dialog(frame, size=parameter.Size(45, 9))
+        self.control.app_control.loop.set_alarm_in(0.1, self._spin_busy_box, 1)
+
+    def _spin_busy_box(self, cb_loop: urwid.MainLoop, step: int):
+        """Advance the spinner of the busy box while it is shown."""
+        if self._busy_spinner is None:
+            return
+        self._busy_spinner.set_text(SPINNER[step % len(SPINNER)])
+        cb_loop.request_draw()
+        cb_loop.set_alarm_in(0.1, self._spin_busy_box, step + 1)
+
+    def _close_busy_box(self):
+        """Return to the window the busy box was opened from."""
+        self._busy_spinner = None
+        self.control.app_control.current_window = self.control.app_control.busy_caller
+        self.control.app_control.loop.widget = self.control.app_control.busy_caller_body
+
     def input_box(
             self,
             ib_params: parameter.InputBoxParams = parameter.InputBoxParams(
@@ -889,29 +1398,104 @@ class ApplicationModel(BaseApplication):
         """
         self.view.gscreen.debug = yes
 
+    def switch_language(self, language: str):
+        """
+        Switch the running UI to language.
+
+        The widgets on screen are re-translated in place, the header, menus
+        and buttons are rebuilt from the cached host facts and the cached
+        dialogs are dropped, so they are built in the new language when
+        opened next time.
+        """
+        previous = localization.active
+        translate = util.init_localization(language=language)
+        if localization.active is previous:
+            return translate
+        localization.retranslate_widget(self.control.app_control.loop.widget, previous)
+        cui.classes.button.create_application_buttons(self)
+        self.view.dialogs.invalidate()
+        # Rebuilds the head text and the sysinfo panes in the new language
+        self.view.header.refresh_content()
+        self.view.top_main_menu.refresh_main_menu()
+        self.control.app_control.current_bottom_info = localization.retranslate(
+            self.control.app_control.current_bottom_info, previous
+        )
+        self.print(self.control.app_control.current_bottom_info)
+        return translate
+
+    def refresh_setup_state(self):
+        """Start the setup state probes and update the welcome screen on results."""
+        setup_state.refresh(self._notify_setup_state_probed)
+
+    def _notify_setup_state_probed(self):
+        """Wake up the main loop from a probe thread."""
+        try:
+            os.write(self._setup_state_pipe, b"\n")
+        except OSError:
+            pass
+
+    def _on_setup_state_probed(self, _data: bytes) -> bool:
+        """Show the setup state results which arrived so far."""
+        self.view.header.tb.tb_sysinfo_bottom.set_text(util.get_system_info("bottom"))
+        self.view.top_main_menu.refresh_admin_state()
+        if self.control.app_control.current_window in (MAIN, MAIN_MENU):
+            self.control.app_control.loop.request_draw()
+        return True
+
+    def _layout_footer(self) -> bool:
+        """Fit the footer cells to the screen width, return True if that changed."""
+        return self.view.main_footer.layout(
+            self.view.gscreen.screen.get_cols_rows()[0],
+            self.view.gscreen.quiet,
+            self.view.gscreen.debug,
+        )
+
     def _update_clock(self, cb_loop: urwid.MainLoop, data: Any = None):
         """
-        Updates taskbar every second.
+        Updates the clock and load cells of the taskbar every second.
+
+        Header, menu and the other footer cells are left alone; unchanged
+        widgets are served from urwid's canvas cache when drawing. The frame
+        is painted once the loop goes idle.
 
         :param cb_loop: The event loop calling next update_clock()
         :param data: Optional user data
         """
-        self.print(self.control.app_control.current_bottom_info)
+        self.view.main_footer.tick()
+        self._layout_footer()
+        cb_loop.request_draw()
         cb_loop.set_alarm_in(1, self._update_clock, data)
 
-    def start(self, immediate_restart: bool = False):
+    def start(self):
         """
         Starts the console UI
         """
         # set_trace(term_size=(129, 18))
         # set_trace()
-        if immediate_restart:
-            raise urwid.ExitMainLoop()
         self.prepare_mainscreen()
         self.control.app_control.loop.widget = self.control.app_control.body
+        if profiler.enabled:
+            self.control.app_control.loop.draw_hooks.append(self._report_startup_profile)
+        if self.view.gscreen.debug or render_stats.enabled:
+            render_stats.instrument()
+            self.control.app_control.loop.draw_hooks.append(self._record_render_stats)
         self.control.app_control.loop.run()
         if self.view.gscreen.old_termios is not None:
             self.view.gscreen.screen.tty_signal_keys(*self.view.gscreen.old_termios)
+        render_stats.dump()
+
+    def _report_startup_profile(self, loop: urwid.MainLoop):
+        """Dump the startup profile after the first frame has been painted."""
+        loop.draw_hooks.remove(self._report_startup_profile)
+        if profiler.dump():
+            # The report was written over the UI, so repaint everything.
+            loop.screen.clear()
+
+    def _record_render_stats(self, loop: urwid.MainLoop):
+        """Add the frame just painted to the render figures of the current window."""
+        render_stats.record(
+            self.control.app_control.current_window, loop.frame_time, loop.key_latency
+        )
 
     def dialog(
             self, frame: parameter.Frame,
@@ -980,4 +1564,4 @@ class ApplicationModel(BaseApplication):
         if getattr(self.control.app_control, "loop", None):
             self.control.app_control.loop.widget = widget
             if not modal:
-                self.control.app_control.loop.draw_screen()
+                self.control.app_control.loop.request_draw()
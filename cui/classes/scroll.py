@@ -1,6 +1,9 @@
 # SPDX-License-Identifier: AGPL-3.0-or-later
 # SPDX-FileCopyrightText: 2021 grommunio GmbH
 """This module contains Scrollable widgets"""
+import bisect
+import weakref
+
 import urwid
 from urwid.widget import BOX, FIXED, FLOW
 
@@ -43,9 +46,29 @@ class Scrollable(urwid.WidgetDecoration):
             raise ValueError(f"Not a fixed or flow widget: {widget}")
         self._trim_top = 0
         self._scroll_action = None
+        # Lines to scroll on the next render; repeated keys add up here
+        self._scroll_lines = 0
+        # Item of a wrapped Pile to scroll to on the next render
+        self._scroll_item = None
         self._forward_keypress = None
         self._old_cursor_coords = None
         self._rows_max_cached = 0
+        # Row offsets and size arguments of the items of a wrapped Pile per
+        # original widget size, valid for the items in _layout_widgets
+        self._layouts = {}
+        self._layout_widgets = []
+        # Sizing of the original widget if it is a Pile of _layout_widgets
+        self._pile_sizing = None
+        # Sizes of the items ever measured for the original widget size
+        # _heights_size, so items shown again after their Pile changed, e.g.
+        # by a filter, are not measured again
+        self._heights = weakref.WeakKeyDictionary()
+        self._heights_size = None
+        # Items of a Pile whose items all had the same sizing and height
+        # rule, and the sizing of such a Pile
+        self._uniform_items = weakref.WeakSet()
+        self._uniform_kind = None
+        self._uniform_sizing = None
         super().__init__(widget)
 
     def render(self, size, focus=False):
@@ -60,10 +83,27 @@ class Scrollable(urwid.WidgetDecoration):
                     func(0, diff)
 
         var = {"maxcol": size[0], "maxrow": size[1]}
-
-        # Render complete original widget
         original_widget = self._original_widget
         var["ow_size"] = self._get_original_widget_size(size)
+
+        # Render only the visible items of a long Pile
+        layout = self._pile_layout(var["ow_size"], focus)
+        if self._scroll_item is not None and layout is not None:
+            offsets = layout[0]
+            item_top = offsets[min(self._scroll_item, len(offsets) - 1)]
+            self._trim_top = max(item_top - var["maxrow"] // 2, 0)
+        self._scroll_item = None
+        if layout is not None and layout[0][-1] > var["maxrow"]:
+            canv = self._render_visible(size, focus, layout)
+            if canv is None:
+                # An item changed its height, measure them again
+                self.invalidate_layout()
+                layout = self._pile_layout(var["ow_size"], focus)
+                canv = self._render_visible(size, focus, layout)
+            if canv is not None:
+                return canv
+
+        # Render complete original widget
         var["canv_full"] = original_widget.render(var["ow_size"], focus)
 
         # Make full canvas editable
@@ -90,9 +130,12 @@ class Scrollable(urwid.WidgetDecoration):
             self._forward_keypress = (
                 True if canv.cursor is not None else original_widget.selectable()
             )
+            # Nothing to scroll; do not save up lines for when it grows
+            self._scroll_action = None
+            self._scroll_lines = 0
             return canv
 
-        self._adjust_trim_top(canv, size)
+        self._adjust_trim_top(canv_rows, canv.cursor, size)
 
         # Trim canvas if necessary
         trim_top = self._trim_top
@@ -133,6 +176,153 @@ class Scrollable(urwid.WidgetDecoration):
             self._forward_keypress = original_widget.selectable()
         return canv
 
+    def scroll_to_item(self, index):
+        """Show the item index of a wrapped Pile in the middle of the view"""
+        self._scroll_item = index
+        self._invalidate()
+
+    def invalidate_layout(self):
+        """Measure the items of a wrapped Pile again on the next render.
+
+        The item heights are cached per width, also across changes of the
+        items; items changing their height are noticed once they are
+        rendered, e.g. when scrolled into view.
+        Code changing items out of view calls this to update the scrollbar
+        right away.
+        """
+        self._layouts = {}
+        self._layout_widgets = []
+        self._pile_sizing = None
+        self._heights = weakref.WeakKeyDictionary()
+        self._invalidate()
+
+    def _pile_layout(self, ow_size, focus=False):
+        """Return the row offsets and size arguments of a wrapped Pile's
+        items for ow_size, or None if the original widget is no Pile"""
+        pile = self._original_widget
+        if not isinstance(pile, urwid.Pile) or not pile.contents or len(ow_size) > 1:
+            return None
+        self._check_pile_widgets(pile)
+        layout = self._layouts.get(ow_size)
+        if layout is None:
+            measured = self._measure_items(ow_size, focus)
+            if measured is not None:
+                heights, size_args = measured
+            elif hasattr(pile, "get_rows_sizes"):
+                _, heights, size_args = pile.get_rows_sizes(ow_size, focus)
+            elif ow_size:
+                # urwid < 2.6 knows flow Piles only
+                heights = pile.get_item_rows(ow_size, focus)
+                size_args = [
+                    (ow_size[0], height) if options[0] == urwid.GIVEN else ow_size
+                    for (_, options), height in zip(pile.contents, heights)
+                ]
+            else:
+                return None
+            offsets = [0]
+            for height in heights:
+                offsets.append(offsets[-1] + height)
+            layout = self._layouts[ow_size] = (offsets, size_args)
+        return layout
+
+    def _measure_items(self, ow_size, focus):
+        """Return the heights and size arguments of a wrapped Pile's items,
+        as Pile.get_rows_sizes() does for a flow or fixed Pile of flow items,
+        measuring only the items not measured for this size before; None if
+        an item does not fit that pattern"""
+        pile = self._original_widget
+        if len(ow_size) > 1:
+            return None
+        if self._heights_size != ow_size:
+            self._heights = weakref.WeakKeyDictionary()
+            self._heights_size = ow_size
+        sizes = []
+        for idx, (widget, (kind, amount)) in enumerate(pile.contents):
+            if kind == urwid.GIVEN and ow_size:
+                sizes.append((ow_size[0], amount))
+                continue
+            size = self._heights.get(widget)
+            if size is None:
+                sizing = widget.sizing()
+                focused = focus and idx == pile.focus_position
+                if kind == urwid.GIVEN or FLOW not in sizing:
+                    return None
+                if ow_size:
+                    size = (ow_size[0], widget.rows(ow_size, focused))
+                elif FIXED in sizing and BOX not in sizing and (kind == urwid.PACK or amount > 0):
+                    # A fixed Pile is as wide as its widest item, narrower
+                    # ones are rendered wider, without wrapping
+                    size = widget.pack((), focused)
+                else:
+                    return None
+                self._heights[widget] = size
+            sizes.append(size)
+        if not sizes:
+            return None
+        if ow_size:
+            return [height for _, height in sizes], [
+                (ow_size[0], height) if kind == urwid.GIVEN else ow_size
+                for (_, (kind, _)), (_, height) in zip(pile.contents, sizes)
+            ]
+        width = max(width for width, _ in sizes)
+        return [height for _, height in sizes], [(width,)] * len(sizes)
+
+    def _pile_cursor(self, layout, focus):
+        """Return the cursor position within the whole wrapped Pile, if any"""
+        pile = self._original_widget
+        if not focus:
+            return None
+        offsets, size_args = layout
+        idx = pile.focus_position
+        cursor = pile.contents[idx][0].render(size_args[idx], True).cursor
+        if cursor is None:
+            return None
+        return cursor[0], offsets[idx] + cursor[1]
+
+    def _render_visible(self, size, focus, layout):
+        """Render the items of a wrapped Pile in the viewport only.
+
+        Return None if an item no longer has the height it was measured with.
+        """
+        maxcol, maxrow = size
+        pile = self._original_widget
+        offsets, size_args = layout
+        cursor = self._pile_cursor(layout, focus)
+        self._adjust_trim_top(offsets[-1], cursor, size)
+        trim_top = self._trim_top
+
+        first = bisect.bisect_right(offsets, trim_top) - 1
+        end = bisect.bisect_left(offsets, trim_top + maxrow, first)
+        focus_position = pile.focus_position
+        combinelist = []
+        for idx in range(first, min(end, len(size_args))):
+            height = offsets[idx + 1] - offsets[idx]
+            if not height:
+                continue
+            item_canv = pile.contents[idx][0].render(
+                size_args[idx], focus and idx == focus_position
+            )
+            if item_canv.rows() != height:
+                return None
+            if item_canv.cols() != maxcol:
+                item_canv = urwid.CompositeCanvas(item_canv)
+                item_canv.pad_trim_left_right(0, maxcol - item_canv.cols())
+            combinelist.append((item_canv, idx, idx == focus_position))
+        canv = urwid.CanvasCombine(combinelist)
+        canv.trim(trim_top - offsets[first], maxrow)
+
+        if canv.cursor is not None:
+            _, cursrow = canv.cursor
+            if cursrow >= maxrow or cursrow < 0:
+                canv.cursor = None
+        if canv.cursor is not None:
+            self._forward_keypress = True
+        elif cursor is not None:
+            self._forward_keypress = False
+        else:
+            self._forward_keypress = pile.selectable()
+        return canv
+
     def keypress(self, size, key):
         """Handle key event while event is NOT a mouse event in the
         form size, event"""
@@ -142,7 +332,10 @@ class Scrollable(urwid.WidgetDecoration):
             ow_size = self._get_original_widget_size(size)
 
             # Remember previous cursor position if possible
-            if hasattr(original_widget, "get_cursor_coords"):
+            layout = self._pile_layout(ow_size, True)
+            if layout is not None:
+                self._old_cursor_coords = self._pile_cursor(layout, True)
+            elif hasattr(original_widget, "get_cursor_coords"):
                 self._old_cursor_coords = original_widget.get_cursor_coords(ow_size)
 
             key = original_widget.keypress(ow_size, key)
@@ -150,24 +343,28 @@ class Scrollable(urwid.WidgetDecoration):
                 return None
 
         # Handle up/down, page up/down, etc
+        # Line and page steps add up until the next render, so keys queued
+        # while a frame was painted scroll by all of them at once.
         command_map = self._command_map
         if command_map[key] == urwid.CURSOR_UP:
-            self._scroll_action = SCROLL_LINE_UP
+            self._scroll_lines -= 1
         elif command_map[key] == urwid.CURSOR_DOWN:
-            self._scroll_action = SCROLL_LINE_DOWN
+            self._scroll_lines += 1
 
         elif command_map[key] == urwid.CURSOR_PAGE_UP:
-            self._scroll_action = SCROLL_PAGE_UP
+            self._scroll_lines -= max(1, size[1] - 1)
             self._move_focus_by_page(size, "up")
         elif command_map[key] == urwid.CURSOR_PAGE_DOWN:
-            self._scroll_action = SCROLL_PAGE_DOWN
+            self._scroll_lines += max(1, size[1] - 1)
             self._move_focus_by_page(size, "down")
 
         elif command_map[key] == urwid.CURSOR_MAX_LEFT:  # 'home'
             self._scroll_action = SCROLL_TO_TOP
+            self._scroll_lines = 0
             self._move_focus_to_edge(size, "up")
         elif command_map[key] == urwid.CURSOR_MAX_RIGHT:  # 'end'
             self._scroll_action = SCROLL_TO_END
+            self._scroll_lines = 0
             self._move_focus_to_edge(size, "down")
 
         else:
@@ -217,14 +414,17 @@ class Scrollable(urwid.WidgetDecoration):
             return original_widget.mouse_event(ow_size, event, button, col, row, focus)
         return False
 
-    def _adjust_trim_top(self, canv, size):
-        """Adjust self._trim_top according to self._scroll_action"""
+    def _adjust_trim_top(self, canv_rows, cursor, size):
+        """Adjust self._trim_top according to self._scroll_action and the
+        lines scrolled since the last render, for a canvas of canv_rows rows
+        with the cursor at cursor"""
         action = self._scroll_action
+        lines = self._scroll_lines
         self._scroll_action = None
+        self._scroll_lines = 0
 
         var = {"maxcol": size[0], "maxrow": size[1]}
         trim_top = self._trim_top
-        canv_rows = canv.rows()
 
         if trim_top < 0:
             # Negative trim_top values use bottom of canvas as reference
@@ -237,23 +437,11 @@ class Scrollable(urwid.WidgetDecoration):
         def ensure_bounds(new_trim_top):
             return max(0, min(canv_rows - var["maxrow"], new_trim_top))
 
-        if action == SCROLL_LINE_UP:
-            self._trim_top = ensure_bounds(trim_top - 1)
-        elif action == SCROLL_LINE_DOWN:
-            self._trim_top = ensure_bounds(trim_top + 1)
-
-        elif action == SCROLL_PAGE_UP:
-            self._trim_top = ensure_bounds(trim_top - var["maxrow"] + 1)
-        elif action == SCROLL_PAGE_DOWN:
-            self._trim_top = ensure_bounds(trim_top + var["maxrow"] - 1)
-
-        elif action == SCROLL_TO_TOP:
-            self._trim_top = 0
+        if action == SCROLL_TO_TOP:
+            trim_top = 0
         elif action == SCROLL_TO_END:
-            self._trim_top = canv_rows - var["maxrow"]
-
-        else:
-            self._trim_top = ensure_bounds(trim_top)
+            trim_top = canv_rows - var["maxrow"]
+        self._trim_top = ensure_bounds(trim_top + lines)
 
         # If the cursor was moved by the most recent keypress, adjust trim_top
         # so that the new cursor position is within the displayed canvas part.
@@ -261,19 +449,52 @@ class Scrollable(urwid.WidgetDecoration):
         # still scroll out
         if (
             self._old_cursor_coords is not None
-            and canv.cursor is not None
-            and self._old_cursor_coords != canv.cursor
+            and cursor is not None
+            and self._old_cursor_coords != cursor
         ):
             self._old_cursor_coords = None
-            _, cursrow = canv.cursor
+            _, cursrow = cursor
             if cursrow < self._trim_top:
                 self._trim_top = cursrow
             elif cursrow >= self._trim_top + var["maxrow"]:
                 self._trim_top = max(0, cursrow - var["maxrow"] + 1)
 
+    def _check_pile_widgets(self, pile):
+        """Forget the cached layouts if the items of pile changed"""
+        widgets = [widget for widget, _ in pile.contents]
+        if widgets != self._layout_widgets:
+            self._layouts = {}
+            self._layout_widgets = widgets
+            self._pile_sizing = None
+
+    def _get_pile_sizing(self, pile):
+        """Return pile.sizing(); a Pile of items already known to size alike
+        is not asked again, e.g. after a filter dropped some of them"""
+        kinds = {options[0] for _, options in pile.contents}
+        if (
+            len(kinds) == 1
+            and self._uniform_sizing is not None
+            and kinds == {self._uniform_kind}
+            and all(widget in self._uniform_items for widget, _ in pile.contents)
+        ):
+            return self._uniform_sizing
+        sizing = pile.sizing()
+        if len(kinds) == 1 and len({widget.sizing() for widget, _ in pile.contents}) == 1:
+            self._uniform_items = weakref.WeakSet(widget for widget, _ in pile.contents)
+            self._uniform_kind = kinds.pop()
+            self._uniform_sizing = sizing
+        return sizing
+
     def _get_original_widget_size(self, size):
         original_widget = self._original_widget
-        sizing = original_widget.sizing()
+        if isinstance(original_widget, urwid.Pile):
+            # A Pile asks all its items, keep the answer as long as they stay
+            self._check_pile_widgets(original_widget)
+            if self._pile_sizing is None:
+                self._pile_sizing = self._get_pile_sizing(original_widget)
+            sizing = self._pile_sizing
+        else:
+            sizing = original_widget.sizing()
         if FIXED in sizing:
             return ()
         if FLOW in sizing:
@@ -308,10 +529,12 @@ class Scrollable(urwid.WidgetDecoration):
         if size is not None:
             original_widget = self._original_widget
             ow_size = self._get_original_widget_size(size)
-            sizing = original_widget.sizing()
-            if FIXED in sizing:
+            layout = self._pile_layout(ow_size, focus)
+            if layout is not None:
+                self._rows_max_cached = layout[0][-1]
+            elif FIXED in original_widget.sizing():
                 self._rows_max_cached = original_widget.pack(ow_size, focus)[1]
-            elif FLOW in sizing:
+            elif FLOW in original_widget.sizing():
                 self._rows_max_cached = original_widget.rows(ow_size, focus)
             else:
                 raise RuntimeError(f"Not a flow/box widget: {self._original_widget}")
@@ -344,6 +567,8 @@ class ScrollBar(urwid.WidgetDecoration):
         `trough_char` is used for the space above and below the handle.
         `side` must be 'left' or 'right'.
         `width` specifies the number of columns the scrollbar uses.
+        `accelerate_keys` lets held navigation keys move further the longer
+        they are held, see cui.classes.loop.GMainLoop.
         """
         thumb_char = kwargs.get("thumb_char", args[0] if len(args) > 0 else "\u2588")
         trough_char = kwargs.get("trough_char", args[1] if len(args) > 1 else " ")
@@ -357,6 +582,7 @@ class ScrollBar(urwid.WidgetDecoration):
         self.scrollbar_side = side
         self.scrollbar_width = max(1, width)
         self._original_widget_size = (0, 0)
+        self.accelerate_keys = kwargs.get("accelerate_keys", False)
 
     def render(self, size, focus=False):
         """
@@ -13,6 +13,22 @@ import subprocess
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from cui import factcache, hostcmd
+
+OS_RELEASE_FILES = ("/etc/os-release", "/usr/lib/os-release")
+# Enabling or disabling a network service, or editing the netplan/ifupdown
+# config touches one of these. Whether a unit is active is not file-backed,
+# so the detected backend is additionally re-checked every few minutes.
+NETWORK_BACKEND_SOURCES = (
+    "/etc/systemd/system/multi-user.target.wants",
+    "/etc/systemd/system/network-online.target.wants",
+    "/etc/netplan",
+    "/etc/network/interfaces",
+)
+NETWORK_BACKEND_MAX_AGE = 300
+
+# `systemctl is-enabled` states of units which are started on boot
+_ENABLED_STATES = ("enabled", "static", "alias", "indirect", "enabled-runtime")
 
 _DISTRO_CACHE: Optional[Dict[str, str]] = None
 _BACKEND_CACHE: Optional[str] = None
@@ -21,7 +37,7 @@ _BACKEND_CACHE: Optional[str] = None
 def _read_os_release() -> Dict[str, str]:
     """Parse /etc/os-release into a dict. Returns {} if the file is unreadable."""
     items: Dict[str, str] = {}
-    for path in ("/etc/os-release", "/usr/lib/os-release"):
+    for path in OS_RELEASE_FILES:
         try:
             with open(path, "r", encoding="utf-8") as fh:
                 for raw in fh:
@@ -41,7 +57,7 @@ def get_distro_info() -> Dict[str, str]:
     """Return cached os-release fields (ID, ID_LIKE, VERSION_ID, VERSION_CODENAME, ...)."""
     global _DISTRO_CACHE
     if _DISTRO_CACHE is None:
-        _DISTRO_CACHE = _read_os_release()
+        _DISTRO_CACHE = factcache.cached("os-release", _read_os_release, OS_RELEASE_FILES)
     return _DISTRO_CACHE
 
 
@@ -94,6 +110,12 @@ def _is_unit_active(unit: str) -> bool:
         return False
 
 
+async def _is_unit_active_async(unit: str) -> bool:
+    """Awaitable _is_unit_active() for the asyncio main loop."""
+    out = (await hostcmd.run(["systemctl", "is-active", unit], timeout=5))[1]
+    return out.strip() == "active"
+
+
 def _is_unit_enabled(unit: str) -> bool:
     try:
         out = subprocess.run(
@@ -101,11 +123,17 @@ def _is_unit_enabled(unit: str) -> bool:
             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=False, timeout=5,
         )
         state = out.stdout.decode().strip()
-        return state in ("enabled", "static", "alias", "indirect", "enabled-runtime")
+        return state in _ENABLED_STATES
     except (OSError, subprocess.SubprocessError):
         return False
 
 
+async def _is_unit_enabled_async(unit: str) -> bool:
+    """Awaitable _is_unit_enabled() for the asyncio main loop."""
+    out = (await hostcmd.run(["systemctl", "is-enabled", unit], timeout=5))[1]
+    return out.strip() in _ENABLED_STATES
+
+
 def get_network_backend() -> str:
     """Return the active network backend.
 
@@ -116,9 +144,16 @@ def get_network_backend() -> str:
     supported distributions.
     """
     global _BACKEND_CACHE
-    if _BACKEND_CACHE is not None:
-        return _BACKEND_CACHE
+    if _BACKEND_CACHE is None:
+        _BACKEND_CACHE = factcache.cached(
+            "network-backend", _detect_network_backend,
+            NETWORK_BACKEND_SOURCES, max_age=NETWORK_BACKEND_MAX_AGE,
+        )
+    return _BACKEND_CACHE
 
+
+def _detect_network_backend() -> str:
+    """Ask systemd and the filesystem for the network backend in use."""
     backend = ""
     candidates = [
         ("systemd-networkd.service", "networkd"),
@@ -143,7 +178,6 @@ def get_network_backend() -> str:
         elif Path("/etc/network/interfaces").is_file():
             backend = "ifupdown"
 
-    _BACKEND_CACHE = backend
     return backend
 
 
@@ -157,6 +191,11 @@ def is_resolved_active() -> bool:
     return _is_unit_active("systemd-resolved.service")
 
 
+async def is_resolved_active_async() -> bool:
+    """Awaitable is_resolved_active() for the asyncio main loop."""
+    return await _is_unit_active_async("systemd-resolved.service")
+
+
 def is_resolved_enabled() -> bool:
     """True if systemd-resolved is enabled (will own resolv.conf once started).
 
@@ -166,6 +205,11 @@ def is_resolved_enabled() -> bool:
     return _is_unit_enabled("systemd-resolved.service")
 
 
+async def is_resolved_enabled_async() -> bool:
+    """Awaitable is_resolved_enabled() for the asyncio main loop."""
+    return await _is_unit_enabled_async("systemd-resolved.service")
+
+
 def get_repo_file_path() -> str:
     """Return the path to the grommunio repository config file for this distro."""
     if is_suse_family():
@@ -379,3 +423,4 @@ def reset_caches():
     global _DISTRO_CACHE, _BACKEND_CACHE
     _DISTRO_CACHE = None
     _BACKEND_CACHE = None
+    factcache.invalidate("os-release", "network-backend")
@@ -0,0 +1,174 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: 2026 grommunio GmbH
+"""Warm-start cache for expensive host facts.
+
+Every CUI instance (grommunio-cui@tty1, ssh sessions, the re-exec after a
+language change) asks the host for the same lists: keymaps, locales,
+timezones, the distribution and the network backend, the grommunio-admin
+config. Their results are kept as JSON files in tmpfs so all instances share
+them until the next reboot.
+
+An entry is fresh as long as the modification times of its source files are
+unchanged (and, if given, it is younger than max_age). A stale entry is still
+returned immediately and recomputed in a background thread for the next
+caller. Only the first start after boot computes facts synchronously.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+CACHE_DIR: str = "/run/grommunio-cui"
+# Bump whenever the stored layout or the meaning of an entry changes
+CACHE_VERSION: int = 1
+
+_MEMORY: Dict[str, Any] = {}
+_REFRESHING: Set[str] = set()
+_LOCK = threading.Lock()
+
+
+def _stamp(sources: Iterable[str]) -> List[Optional[float]]:
+    """Return the modification times of sources, None for missing ones."""
+    stamp: List[Optional[float]] = []
+    for source in sources:
+        try:
+            stamp.append(os.stat(source).st_mtime)
+        except OSError:
+            stamp.append(None)
+    return stamp
+
+
+def _cache_dir() -> Optional[str]:
+    """Return the cache directory if it is private to us, None otherwise."""
+    try:
+        os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+        info = os.stat(CACHE_DIR)
+    except OSError:
+        return None
+    if info.st_uid != os.geteuid() or info.st_mode & 0o022:
+        return None
+    return CACHE_DIR
+
+
+def _entry_path(name: str) -> Optional[str]:
+    cache_dir = _cache_dir()
+    if cache_dir is None:
+        return None
+    return os.path.join(cache_dir, f"{name}.json")
+
+
+def _load(name: str) -> Optional[Dict[str, Any]]:
+    """Return the stored entry name, or None if there is no usable one."""
+    path = _entry_path(name)
+    if path is None:
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as file_handle:
+            entry = json.load(file_handle)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or entry.get("version") != CACHE_VERSION:
+        return None
+    return entry
+
+
+def _store(name: str, entry: Dict[str, Any]):
+    """Atomically write entry name, so readers never see a partial file."""
+    path = _entry_path(name)
+    if path is None:
+        return
+    tmp: Optional[str] = None
+    try:
+        handle, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f".{name}.")
+        with os.fdopen(handle, "w", encoding="utf-8") as file_handle:
+            json.dump(entry, file_handle)
+        os.replace(tmp, path)
+    except (OSError, TypeError, ValueError):
+        if tmp is not None:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+
+def _compute(name: str, func: Callable[[], Any], sources: List[str]) -> Any:
+    """Call func and remember its result in memory and, if not empty, on disk."""
+    stamp = _stamp(sources)
+    value = func()
+    _MEMORY[name] = value
+    if value:
+        _store(name, {
+            "version": CACHE_VERSION,
+            "stamp": stamp,
+            "time": time.time(),
+            "value": value,
+        })
+    return value
+
+
+def _refresh_in_background(name: str, func: Callable[[], Any], sources: List[str]):
+    """Recompute entry name in a daemon thread, once at a time."""
+    with _LOCK:
+        if name in _REFRESHING:
+            return
+        _REFRESHING.add(name)
+
+    def run():
+        try:
+            _compute(name, func, sources)
+        except Exception:  # pylint: disable=broad-except
+            pass
+        finally:
+            with _LOCK:
+                _REFRESHING.discard(name)
+
+    threading.Thread(target=run, name=f"factcache-{name}", daemon=True).start()
+
+
+def cached(
+        name: str,
+        func: Callable[[], Any],
+        sources: Iterable[str] = (),
+        max_age: Optional[float] = None,
+) -> Any:
+    """
+    Return the JSON serializable result of func, shared between processes.
+
+    :param name: The unique cache entry name.
+    :param func: Computes the fact; empty results are not persisted.
+    :param sources: Files whose modification times the fact depends on.
+    :param max_age: Seconds after which the entry is refreshed anyway.
+    """
+    if name in _MEMORY:
+        return _MEMORY[name]
+    sources = list(sources)
+    entry = _load(name)
+    if entry is None:
+        return _compute(name, func, sources)
+    value = entry.get("value")
+    _MEMORY[name] = value
+    expired = max_age is not None and time.time() - entry.get("time", 0) > max_age
+    if expired or entry.get("stamp") != _stamp(sources):
+        _refresh_in_background(name, func, sources)
+    return value
+
+
+def invalidate(*names: str):
+    """Forget the given entries, or all entries if no name is given."""
+    if not names:
+        names = tuple(_MEMORY)
+        cache_dir = _cache_dir()
+        if cache_dir is not None:
+            names += tuple(
+                entry[:-5] for entry in os.listdir(cache_dir) if entry.endswith(".json")
+            )
+    for name in names:
+        _MEMORY.pop(name, None)
+        path = _entry_path(name)
+        if path is not None:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
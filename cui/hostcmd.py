@@ -0,0 +1,56 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: 2026 grommunio GmbH
+"""Awaitable host commands.
+
+The main loop runs on asyncio, so host commands started from the console UI
+should not block it: the clock keeps ticking and dialogs can show a spinner
+while e.g. localectl or nmcli is running. The synchronous helpers in
+cui.localetime, cui.distro and cui.network stay for code running outside of
+the loop (startup probes, the fact cache workers).
+"""
+import asyncio
+import subprocess
+from typing import List, Tuple
+
+
+async def run(cmd: List[str], timeout: float = 15, capture: bool = True) -> Tuple[int, str]:
+    """Run cmd and return its exit code and stdout.
+
+    The exit code is -1 if the command could not be started or did not finish
+    within timeout seconds (it is killed then, as when the awaiting task is
+    cancelled). stdout is only collected with capture, stderr is always
+    discarded.
+    """
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return -1, ""
+    try:
+        out, _ = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        _kill(proc)
+        await proc.wait()
+        return -1, ""
+    except asyncio.CancelledError:
+        # Do not leave the command running behind a cancelled task
+        _kill(proc)
+        raise
+    return proc.returncode, (out or b"").decode(errors="replace")
+
+
+def _kill(proc: asyncio.subprocess.Process):
+    try:
+        proc.kill()
+    except ProcessLookupError:
+        pass
+
+
+async def succeeds(cmd: List[str], timeout: float = 15) -> bool:
+    """Return True if cmd ran and exited with 0."""
+    returncode, _ = await run(cmd, timeout=timeout, capture=False)
+    return returncode == 0
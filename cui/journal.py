@@ -0,0 +1,441 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: 2026 grommunio GmbH
+"""Reading the systemd journal for the log viewer.
+
+The log viewer shows the last lines a unit logged in the current boot. A
+busy unit logs millions of entries in a month of uptime, so JournalTail
+seeks to the end of the journal and walks backwards only as many entries
+as are shown. Showing more lines continues from the oldest entry read so
+far; the cost depends on the lines shown, not on the size of the journal.
+
+In follow mode, JournalFollow reads the entries appended to the journal
+whenever its file descriptor becomes readable, into the bounded ring
+buffer LogBuffer; the console UI only renders the visible end of the
+buffer, a few times a second.
+
+Both read one or more units. The journal matches several values of a field
+as alternatives and returns their entries interleaved by time, so several
+units read by one reader form a merged timeline without merging the units
+ourselves; each line names the unit it comes from.
+
+LogFilter selects lines by priority and text. JournalTail indexes the lines
+read by priority as it reads them, so the lines of a priority and the more
+severe ones are found without looking at the others.
+
+JournalSearch searches the messages of the whole boot in a worker thread;
+the journal narrows the entries to the units, the text is searched in the
+MESSAGE of each. A JournalTail may end shortly after the cursor of a found
+entry instead of at the end of the journal, to show its context.
+"""
+import asyncio
+import bisect
+import datetime
+import heapq
+import itertools
+import re
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Format of a log line, overridden by the grommunio-admin logging config
+DEFAULT_FORMAT: str = '[%(asctime)s] [%(levelname)s] (%(module)s): "%(message)s"'
+# Lines kept in follow mode
+FOLLOW_LINES: int = 10000
+# Entries read in one go in follow mode; a burst is read in several steps
+FOLLOW_BATCH: int = 2000
+# The syslog priorities, the most severe first
+PRIORITY_NAMES: Tuple[str, ...] = (
+    "emerg", "alert", "crit", "err", "warning", "notice", "info", "debug",
+)
+# Priority of entries which have none
+DEFAULT_PRIORITY: int = 6
+# Lines shown after the entry a JournalTail is anchored at
+CONTEXT_LINES: int = 50
+# Results a search collects at most
+SEARCH_RESULTS: int = 5000
+# Formats of the time range of a search; times without a date are today
+TIME_FORMATS: Tuple[str, ...] = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d")
+TIME_OF_DAY_FORMATS: Tuple[str, ...] = ("%H:%M:%S", "%H:%M")
+# Characters making a filter text a regular expression
+_REGEX_CHARS = re.compile(r"[\\^$.|?*+()\[\]{}]")
+
+
+def import_journal():
+    """Return the systemd.journal module; imported on first use."""
+    from systemd import journal  # pylint: disable=import-outside-toplevel
+    return journal
+
+
+def unit_name(unit: str) -> str:
+    """Return unit with the .service suffix."""
+    return unit if unit.strip().endswith(".service") else f"{unit}.service"
+
+
+def unit_names(units: Sequence[str]) -> Tuple[str, ...]:
+    """Return units with the .service suffix."""
+    return tuple(unit_name(unit) for unit in units)
+
+
+def format_entry(entry: Dict[str, Any], fmt: str = DEFAULT_FORMAT, tag: bool = False) -> str:
+    """Return a journal entry as a log line.
+
+    With tag, the line starts with the unit if the format does not name it.
+    """
+    module = entry.get("_SYSTEMD_UNIT", "gromox-http.service").split(".service")[0]
+    line = fmt % {
+        "asctime": entry.get(
+            "__REALTIME_TIMESTAMP", datetime.datetime(1970, 1, 1, 0, 0, 0)
+        ).isoformat(),
+        "levelname": entry.get("PRIORITY", ""),
+        "module": module,
+        "message": entry.get("MESSAGE", ""),
+    }
+    if tag and "%(module)" not in fmt:
+        line = f"{module}: {line}"
+    return line
+
+
+def entry_priority(entry: Dict[str, Any]) -> int:
+    """Return the syslog priority of a journal entry."""
+    try:
+        priority = int(entry.get("PRIORITY", DEFAULT_PRIORITY))
+    except (TypeError, ValueError):
+        return DEFAULT_PRIORITY
+    return min(max(priority, 0), len(PRIORITY_NAMES) - 1)
+
+
+def parse_time(text: str) -> Optional[datetime.datetime]:
+    """Return the local time text names, None if it is empty.
+
+    Raises ValueError if text is no time of TIME_FORMATS or TIME_OF_DAY_FORMATS.
+    """
+    text = text.strip()
+    if not text:
+        return None
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, fmt)
+        except ValueError:
+            pass
+    for fmt in TIME_OF_DAY_FORMATS:
+        try:
+            time = datetime.datetime.strptime(text, fmt).time()
+        except ValueError:
+            continue
+        return datetime.datetime.combine(datetime.date.today(), time)
+    raise ValueError(f"Not a time: {text}")
+
+
+def open_reader(units: Sequence[str]):
+    """Return a reader of the entries units logged in the current boot."""
+    journal = import_journal()
+    reader = journal.Reader()
+    reader.this_boot()
+    for unit in units:
+        reader.add_match(_SYSTEMD_UNIT=unit)
+    return reader
+
+
+class JournalTail:
+    """
+    The entries units logged in the current boot, read from the end.
+
+    lines holds the entries read so far as log lines, oldest first, and
+    priorities their priorities. complete is set once the start of the boot
+    has been reached.
+
+    With a cursor, the lines end CONTEXT_LINES after the entry at cursor;
+    anchor_age is the age of that entry then (0 is the newest line).
+    """
+    complete: bool = False
+    anchor_age: Optional[int] = None
+
+    def __init__(self, units: Sequence[str], fmt: str = DEFAULT_FORMAT, cursor: str = ""):
+        self.units = unit_names(units)
+        self.fmt = fmt
+        self.cursor = cursor
+        self.lines: List[str] = []
+        self.priorities: List[int] = []
+        # Per priority, the ages of its lines (0 is the newest line),
+        # ascending; reading back appends to them, as ages do not change
+        self._ages: List[List[int]] = [[] for _ in PRIORITY_NAMES]
+        self._reader = None
+        # Without units nothing matches, rather than everything
+        self.complete = not self.units
+
+    def _open(self):
+        reader = open_reader(self.units)
+        if not self.cursor:
+            reader.seek_tail()
+            return reader
+        # The entry at cursor and the ones after it are the newest lines
+        reader.seek_cursor(self.cursor)
+        newer: List[Dict[str, Any]] = []
+        while len(newer) <= CONTEXT_LINES:
+            entry = reader.get_next()
+            if not entry:
+                break
+            if entry.get("__REALTIME_TIMESTAMP", "") != "":
+                newer.append(entry)
+        for age, entry in enumerate(reversed(newer)):
+            self._ages[entry_priority(entry)].append(age)
+        self.lines = [format_entry(entry, self.fmt, len(self.units) > 1) for entry in newer]
+        self.priorities = [entry_priority(entry) for entry in newer]
+        if newer:
+            self.anchor_age = len(newer) - 1
+        # Stand on the entry at cursor, reading back continues before it
+        reader.seek_cursor(self.cursor)
+        reader.get_next()
+        return reader
+
+    def read_back(self, count: int) -> List[str]:
+        """Read up to count entries before the oldest one read so far.
+
+        Returns the new lines, oldest first; they are prepended to lines.
+        A count of 0 or less reads back to the start of the boot.
+        """
+        if self._reader is None:
+            self._reader = self._open()
+        older: List[str] = []
+        priorities: List[int] = []
+        while not self.complete and (count <= 0 or len(older) < count):
+            entry = self._reader.get_previous()
+            if not entry:
+                self.complete = True
+            elif entry.get("__REALTIME_TIMESTAMP", "") != "":
+                priority = entry_priority(entry)
+                self._ages[priority].append(len(self.lines) + len(older))
+                older.append(format_entry(entry, self.fmt, len(self.units) > 1))
+                priorities.append(priority)
+        older.reverse()
+        priorities.reverse()
+        self.lines[:0] = older
+        self.priorities[:0] = priorities
+        return older
+
+    def tail(self, count: int) -> List[str]:
+        """Return the last count lines (all with 0), reading only the missing ones."""
+        if self._reader is None:
+            self._reader = self._open()
+        if count <= 0:
+            self.read_back(0)
+            return list(self.lines)
+        if len(self.lines) < count:
+            self.read_back(count - len(self.lines))
+        return self.lines[-count:]
+
+    def select(self, count: int, max_priority: int) -> List[int]:
+        """Return the positions of the lines of max_priority or more severe.
+
+        The positions count in the last count lines (all with 0), ascending;
+        the cost depends on the lines returned, not on the lines read.
+        """
+        count = len(self.lines) if count <= 0 else min(count, len(self.lines))
+        ages = heapq.merge(*(
+            ages[:bisect.bisect_left(ages, count)]
+            for ages in self._ages[:max_priority + 1]
+        ))
+        positions = [count - 1 - age for age in ages]
+        positions.reverse()
+        return positions
+
+
+class LogFilter:
+    """
+    Selects log lines by priority and text.
+
+    max_priority keeps the lines of that priority and the more severe ones,
+    None the lines of all priorities. text is searched for ignoring case, as
+    a regular expression if it is a valid one, else literally.
+    """
+    def __init__(self, max_priority: Optional[int] = None, text: str = ""):
+        self.max_priority = max_priority
+        self.text = text
+        self.pattern = None
+        if text:
+            try:
+                self.pattern = re.compile(text, re.IGNORECASE)
+            except re.error:
+                self.pattern = re.compile(re.escape(text), re.IGNORECASE)
+
+    def __bool__(self) -> bool:
+        return self.max_priority is not None or bool(self.text)
+
+    def accepts(self, priority: int, line: str) -> bool:
+        """Return True if a line of priority passes the filter."""
+        if self.max_priority is not None and priority > self.max_priority:
+            return False
+        return self.pattern is None or self.pattern.search(line) is not None
+
+    def spans(self, line: str) -> List[Tuple[int, int]]:
+        """Return the start and end of the text found in line."""
+        if self.pattern is None:
+            return []
+        return [
+            match.span() for match in self.pattern.finditer(line)
+            if match.end() > match.start()
+        ]
+
+    def narrows(self, other: "LogFilter") -> bool:
+        """Return True if all lines passing this filter pass other, too.
+
+        Typing on a literal text narrows the filter, so only the lines
+        passing the previous one have to be searched again.
+        """
+        if other.max_priority is not None and (
+                self.max_priority is None or self.max_priority > other.max_priority):
+            return False
+        if not other.text:
+            return True
+        return not _REGEX_CHARS.search(self.text + other.text) and \
+            other.text.lower() in self.text.lower()
+
+
+class LogBuffer:
+    """
+    Bounded ring buffer of log lines, oldest first.
+
+    Provides the interface cui.classes.gwidgets.GTail shows.
+    """
+    # Increased on every change, for cheap change detection
+    version: int = 0
+
+    def __init__(self, lines: Iterable[str] = (), maxlen: int = FOLLOW_LINES):
+        self.lines = deque(lines, maxlen=maxlen)
+
+    def extend(self, lines: List[str]):
+        """Append lines, dropping the oldest ones beyond the bound."""
+        if lines:
+            self.lines.extend(lines)
+            self.version += 1
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def tail(self, count: int, offset: int = 0) -> List[str]:
+        """Return count lines, ending offset lines before the last one."""
+        lines = list(itertools.islice(reversed(self.lines), offset, offset + count))
+        lines.reverse()
+        return lines
+
+
+class JournalSearch:
+    """
+    Searches the messages units logged in the current boot for a text.
+
+    run() scans the entries from since to until (the whole boot with None)
+    in a worker thread and returns "", or the reason it failed. While it
+    runs, lines grows by the log line and results by (cursor, unit) of
+    every entry whose MESSAGE contains text, ignoring case, up to limit;
+    they and scanned may be read from the main loop at any time, a line is
+    appended after its result. cancel() stops the scan.
+    """
+    scanned: int = 0
+    done: bool = False
+
+    def __init__(self, units: Sequence[str], text: str,
+                 since: Optional[datetime.datetime] = None,
+                 until: Optional[datetime.datetime] = None,
+                 fmt: str = DEFAULT_FORMAT, limit: int = SEARCH_RESULTS):
+        self.units = unit_names(units)
+        self.text = text
+        self.since = since
+        self.until = until
+        self.fmt = fmt
+        self.limit = limit
+        self.results: List[Tuple[str, str]] = []
+        self.lines: List[str] = []
+        self._stop = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the scan was stopped before its end."""
+        return self._stop.is_set()
+
+    def cancel(self):
+        """Stop the scan; run() returns after the current entry."""
+        self._stop.set()
+
+    async def run(self) -> str:
+        """Scan the journal; return "" or the reason it failed."""
+        loop = asyncio.get_event_loop()
+        try:
+            await loop.run_in_executor(None, self._scan)
+        except OSError as exc:
+            return str(exc)
+        finally:
+            # Let the thread give up if the awaiting task was cancelled
+            if not self.done:
+                self._stop.set()
+            self.done = True
+        return ""
+
+    def _scan(self):
+        if not self.units:
+            self.done = True
+            return
+        reader = open_reader(self.units)
+        try:
+            if self.since is not None:
+                reader.seek_realtime(self.since)
+            else:
+                reader.seek_head()
+            needle = self.text.lower()
+            while not self._stop.is_set() and len(self.results) < self.limit:
+                entry = reader.get_next()
+                if not entry:
+                    break
+                stamp = entry.get("__REALTIME_TIMESTAMP")
+                if stamp is None:
+                    continue
+                if self.until is not None and stamp > self.until:
+                    break
+                self.scanned += 1
+                if needle in str(entry.get("MESSAGE", "")).lower():
+                    self.results.append(
+                        (entry.get("__CURSOR", ""), entry.get("_SYSTEMD_UNIT", ""))
+                    )
+                    self.lines.append(format_entry(entry, self.fmt, len(self.units) > 1))
+        finally:
+            reader.close()
+        self.done = True
+
+
+class JournalFollow:
+    """
+    The entries units append to the journal from now on.
+
+    fileno() becomes readable when the journal changed; read() then
+    returns the new entries as log lines with their priorities.
+    """
+    def __init__(self, units: Sequence[str], fmt: str = DEFAULT_FORMAT):
+        self.units = unit_names(units)
+        self.fmt = fmt
+        self._reader = open_reader(self.units)
+        # Stand on the last entry, the next one is new
+        self._reader.seek_tail()
+        self._reader.get_previous()
+
+    def fileno(self) -> int:
+        """The file descriptor to watch for changes."""
+        return self._reader.fileno()
+
+    def read(self, limit: int = FOLLOW_BATCH) -> List[Tuple[int, str]]:
+        """Return up to limit new (priority, line); call again while it returns limit."""
+        # Acknowledges the wakeup of the file descriptor
+        self._reader.process()
+        lines: List[Tuple[int, str]] = []
+        while self.units and len(lines) < limit:
+            entry = self._reader.get_next()
+            if not entry:
+                break
+            if entry.get("__REALTIME_TIMESTAMP", "") != "":
+                lines.append((
+                    entry_priority(entry),
+                    format_entry(entry, self.fmt, len(self.units) > 1),
+                ))
+        return lines
+
+    def close(self):
+        """Release the journal files."""
+        self._reader.close()
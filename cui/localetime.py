@@ -9,6 +9,13 @@ work on all supported distributions (openSUSE, Debian, Ubuntu, RHEL, Fedora).
 import subprocess
 from typing import List
 
+from cui import factcache, hostcmd
+
+# Files the host's lists of locales, keymaps and timezones are read from
+LOCALE_SOURCES = ("/usr/lib/locale", "/usr/lib/locale/locale-archive", "/etc/locale.gen")
+KEYMAP_SOURCES = ("/usr/share/kbd/keymaps", "/usr/lib/kbd/keymaps")
+TIMEZONE_SOURCES = ("/usr/share/zoneinfo", "/usr/share/zoneinfo/tzdata.zi")
+
 
 def _run(cmd: List[str], timeout: int = 15) -> str:
     try:
@@ -21,7 +28,27 @@ def _run(cmd: List[str], timeout: int = 15) -> str:
         return ""
 
 
+async def _run_async(cmd: List[str], timeout: int = 15) -> str:
+    """Awaitable _run() for the asyncio main loop."""
+    return (await hostcmd.run(cmd, timeout=timeout))[1]
+
+
+def _apply(cmd: List[str]) -> bool:
+    try:
+        rc = subprocess.run(
+            cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            check=False, timeout=15,
+        )
+        return rc.returncode == 0
+    except (OSError, subprocess.SubprocessError):
+        return False
+
+
 def list_locales() -> List[str]:
+    return factcache.cached("locales", _list_locales, LOCALE_SOURCES)
+
+
+def _list_locales() -> List[str]:
     raw = _run(["localectl", "list-locales"])
     locales = [line.strip() for line in raw.splitlines() if line.strip()]
     if locales:
@@ -32,7 +59,14 @@ def list_locales() -> List[str]:
 
 
 def get_current_locale() -> str:
-    raw = _run(["localectl", "status"])
+    return _parse_status_locale(_run(["localectl", "status"]))
+
+
+async def get_current_locale_async() -> str:
+    return _parse_status_locale(await _run_async(["localectl", "status"]))
+
+
+def _parse_status_locale(raw: str) -> str:
     for line in raw.splitlines():
         line = line.strip()
         if line.startswith("System Locale:"):
@@ -48,18 +82,20 @@ def get_current_locale() -> str:
 def set_locale(lang: str) -> bool:
     if not lang:
         return False
-    try:
-        rc = subprocess.run(
-            ["localectl", "set-locale", f"LANG={lang}"],
-            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
-            check=False, timeout=15,
-        )
-        return rc.returncode == 0
-    except (OSError, subprocess.SubprocessError):
+    return _apply(["localectl", "set-locale", f"LANG={lang}"])
+
+
+async def set_locale_async(lang: str) -> bool:
+    if not lang:
         return False
+    return await hostcmd.succeeds(["localectl", "set-locale", f"LANG={lang}"])
 
 
 def list_keymaps() -> List[str]:
+    return factcache.cached("keymaps", _list_keymaps, KEYMAP_SOURCES)
+
+
+def _list_keymaps() -> List[str]:
     raw = _run(["localectl", "list-keymaps"])
     return [line.strip() for line in raw.splitlines() if line.strip()]
 
@@ -82,18 +118,20 @@ def get_current_keymap() -> str:
 def set_keymap(keymap: str) -> bool:
     if not keymap:
         return False
-    try:
-        rc = subprocess.run(
-            ["localectl", "set-keymap", keymap],
-            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
-            check=False, timeout=15,
-        )
-        return rc.returncode == 0
-    except (OSError, subprocess.SubprocessError):
+    return _apply(["localectl", "set-keymap", keymap])
+
+
+async def set_keymap_async(keymap: str) -> bool:
+    if not keymap:
         return False
+    return await hostcmd.succeeds(["localectl", "set-keymap", keymap])
 
 
 def list_timezones() -> List[str]:
+    return factcache.cached("timezones", _list_timezones, TIMEZONE_SOURCES)
+
+
+def _list_timezones() -> List[str]:
     raw = _run(["timedatectl", "list-timezones"])
     return [line.strip() for line in raw.splitlines() if line.strip()]
 
@@ -103,22 +141,33 @@ def get_current_timezone() -> str:
     return raw.strip()
 
 
+async def get_current_timezone_async() -> str:
+    raw = await _run_async(["timedatectl", "show", "--property=Timezone", "--value"])
+    return raw.strip()
+
+
 def set_timezone(tz: str) -> bool:
     if not tz:
         return False
-    try:
-        rc = subprocess.run(
-            ["timedatectl", "set-timezone", tz],
-            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
-            check=False, timeout=15,
-        )
-        return rc.returncode == 0
-    except (OSError, subprocess.SubprocessError):
+    return _apply(["timedatectl", "set-timezone", tz])
+
+
+async def set_timezone_async(tz: str) -> bool:
+    if not tz:
         return False
+    return await hostcmd.succeeds(["timedatectl", "set-timezone", tz])
 
 
 def get_hostname() -> str:
-    raw = _run(["hostnamectl", "--static"]).strip()
+    return _hostname_or_file(_run(["hostnamectl", "--static"]))
+
+
+async def get_hostname_async() -> str:
+    return _hostname_or_file(await _run_async(["hostnamectl", "--static"]))
+
+
+def _hostname_or_file(raw: str) -> str:
+    raw = raw.strip()
     if raw and raw not in ("(unset)", "n/a", "-"):
         return raw
     try:
@@ -131,12 +180,10 @@ def get_hostname() -> str:
 def set_hostname(name: str) -> bool:
     if not name:
         return False
-    try:
-        rc = subprocess.run(
-            ["hostnamectl", "set-hostname", name],
-            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
-            check=False, timeout=15,
-        )
-        return rc.returncode == 0
-    except (OSError, subprocess.SubprocessError):
+    return _apply(["hostnamectl", "set-hostname", name])
+
+
+async def set_hostname_async(name: str) -> bool:
+    if not name:
         return False
+    return await hostcmd.succeeds(["hostnamectl", "set-hostname", name])
@@ -0,0 +1,138 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: 2026 grommunio GmbH
+"""Central localization service of the console user interface.
+
+All modules translate through the same Localization instance, so switching
+the language at runtime only exchanges the active gettext catalog. Catalogs
+are loaded once per language and kept for later switches.
+"""
+import locale
+import os
+from gettext import NullTranslations, translation
+from typing import Dict, List, Optional
+
+import urwid
+
+
+class Localization:
+    """Holds the gettext catalogs and translates with the active one."""
+    domain: str = "cui"
+    language: str = ""
+    initialized: bool = False
+    _active: NullTranslations
+    _catalogs: Dict[str, NullTranslations]
+    _reverse: Dict[int, Dict[str, str]]
+
+    def __init__(self):
+        self._active = NullTranslations()
+        self._catalogs = {}
+        self._reverse = {}
+
+    @staticmethod
+    def localedir() -> str:
+        """Return the directory the message catalogs are read from."""
+        if os.path.exists("locale/de/LC_MESSAGES/cui.mo"):
+            return "locale"
+        return "/usr/share/locale"
+
+    @property
+    def active(self) -> NullTranslations:
+        """Return the catalog currently used for translations."""
+        return self._active
+
+    def catalog(self, language: str = "") -> NullTranslations:
+        """Return the catalog of language ("" = from the environment)."""
+        if language not in self._catalogs:
+            self._catalogs[language] = translation(
+                self.domain,
+                self.localedir(),
+                languages=[language] if language else None,
+                fallback=True,
+            )
+        return self._catalogs[language]
+
+    def set_language(self, language: str = ""):
+        """Make language the active language of the process."""
+        try:
+            locale.setlocale(locale.LC_ALL, language)
+        except locale.Error:
+            # Not generated on this host; the messages can be translated anyway
+            pass
+        self._active = self.catalog(language)
+        self.language = language
+        self.initialized = True
+
+    def gettext(self, msg: str) -> str:
+        """Return msg translated into the active language."""
+        return self._active.gettext(msg)
+
+    def msgid(self, text: str, catalog: NullTranslations) -> str:
+        """Return the untranslated message text was translated from by catalog."""
+        key = id(catalog)
+        if key not in self._reverse:
+            # GNUTranslations keeps its messages in _catalog; plural forms
+            # use tuple keys and "" holds the header, neither is a message.
+            messages = getattr(catalog, "_catalog", {})
+            self._reverse[key] = {
+                msgstr: msgid for msgid, msgstr in messages.items()
+                if isinstance(msgid, str) and msgid and isinstance(msgstr, str)
+            }
+        return self._reverse[key].get(text, text)
+
+    def retranslate(self, text: str, previous: NullTranslations) -> str:
+        """Return text, translated by previous, in the active language."""
+        return self.gettext(self.msgid(text, previous))
+
+    def retranslate_widget(self, widget: urwid.Widget, previous: NullTranslations):
+        """
+        Re-translate the texts, captions and labels of widget and all its
+        children in place from the previous into the active language.
+
+        Texts which are not a single message (e.g. formatted or composed of
+        differently styled parts) are left alone; their owners rebuild them.
+        """
+        seen = set()
+        todo: List[urwid.Widget] = [widget]
+        while todo:
+            current = todo.pop()
+            if current is None or id(current) in seen:
+                continue
+            seen.add(id(current))
+            if isinstance(current, urwid.Edit):
+                caption = current.caption
+                if isinstance(caption, str) and caption:
+                    current.set_caption(self.retranslate(caption, previous))
+            elif isinstance(current, urwid.Text):
+                self._retranslate_text(current, previous)
+            todo.extend(self._children(current))
+
+    def _retranslate_text(self, widget: urwid.Text, previous: NullTranslations):
+        text, attrib = widget.get_text()
+        if not text:
+            return
+        translated = self.retranslate(text, previous)
+        if translated == text:
+            return
+        if not attrib:
+            widget.set_text(translated)
+        elif len(attrib) == 1 and attrib[0][1] == len(text):
+            widget.set_text((attrib[0][0], translated))
+
+    @staticmethod
+    def _children(widget: urwid.Widget) -> List[Optional[urwid.Widget]]:
+        """Return the direct children of a decoration, wrapper or container."""
+        if isinstance(widget, urwid.WidgetDecoration):
+            return [widget.original_widget]
+        if isinstance(widget, urwid.WidgetWrap):
+            return [getattr(widget, "_w", None)]
+        if isinstance(widget, urwid.ListBox):
+            return list(widget.body) if isinstance(widget.body, list) else []
+        contents = getattr(widget, "contents", None)
+        if contents is None:
+            return []
+        if isinstance(contents, dict) or hasattr(contents, "values"):
+            contents = list(contents.values())
+        return [item[0] if isinstance(item, tuple) else item for item in contents]
+
+
+localization: Localization = Localization()
@@ -25,7 +25,7 @@ from typing import Dict, List, Optional, Tuple
 
 import psutil
 
-from cui import distro
+from cui import distro, hostcmd
 
 
 # --- Data model -------------------------------------------------------------
@@ -277,8 +277,9 @@ def load_interface_config(iface: str) -> InterfaceConfig:
     return cfg
 
 
-def save_interface_config(cfg: InterfaceConfig, member_for_bond: bool = False) -> bool:
-    """Persist cfg and ask the backend to reload."""
+def save_interface_config(cfg: InterfaceConfig, member_for_bond: bool = False,
+                          live: bool = True) -> bool:
+    """Persist cfg and, with live, ask the backend to reload."""
     backend = get_backend()
     if backend == "wicked":
         ok = _write_wicked(cfg, member_for_bond=member_for_bond)
@@ -286,17 +287,29 @@ def save_interface_config(cfg: InterfaceConfig, member_for_bond: bool = False) -
         ok = _write_nm(cfg, member_for_bond=member_for_bond)
     else:
         ok = _write_networkd(cfg, member_for_bond=member_for_bond)
-    if ok:
+    if ok and live:
         apply_live(cfg.name)
     return ok
 
 
-def create_bond(cfg: InterfaceConfig) -> bool:
+async def save_interface_config_async(cfg: InterfaceConfig) -> bool:
+    """Awaitable save_interface_config() for the asyncio main loop."""
+    if get_backend() == "NetworkManager":
+        ok = await _write_nm_async(cfg)
+    else:
+        ok = save_interface_config(cfg, live=False)
+    if ok:
+        await apply_live_async(cfg.name)
+    return ok
+
+
+def create_bond(cfg: InterfaceConfig, live: bool = True) -> bool:
     """Create a new bond device with the given config and member list.
 
     cfg.name is the bond device name, cfg.bond_members lists the slaves, and
     cfg.bond_mode/bond_miimon configure the bond driver. Per-member files
-    are also written so the slaves attach automatically on reload.
+    are also written so the slaves attach automatically on reload. With live
+    the backend is asked to reload afterwards.
     """
     if not cfg.bond_members:
         return False
@@ -317,11 +330,23 @@ def create_bond(cfg: InterfaceConfig) -> bool:
             for member in cfg.bond_members:
                 slave = InterfaceConfig(name=member, bond_master=cfg.name)
                 _write_networkd(slave, member_for_bond=True)
-    if ok:
+    if ok and live:
         apply_live(cfg.name)
     return ok
 
 
+async def create_bond_async(cfg: InterfaceConfig) -> bool:
+    """Awaitable create_bond() for the asyncio main loop."""
+    if cfg.bond_members and get_backend() == "NetworkManager":
+        cfg.kind = "bond"
+        ok = await _create_nm_bond_async(cfg)
+    else:
+        ok = create_bond(cfg, live=False)
+    if ok:
+        await apply_live_async(cfg.name)
+    return ok
+
+
 def delete_interface_config(iface: str) -> bool:
     """Remove the grommunio-managed config file for `iface`, then reload."""
     backend = get_backend()
@@ -387,6 +412,27 @@ def apply_live(iface: str = "") -> bool:
     return ok
 
 
+async def apply_live_async(iface: str = "") -> bool:
+    """Awaitable apply_live() for the asyncio main loop."""
+    backend = get_backend()
+    ok = True
+    if backend == "wicked":
+        ok &= await _run_async(["wicked", "ifreload", iface or "all"])
+        await _run_async(["netconfig", "update"])
+    elif backend == "NetworkManager":
+        ok &= await _run_async(["nmcli", "connection", "reload"])
+        if iface:
+            await _run_async(["nmcli", "connection", "up", f"grommunio-{iface}"])
+    else:
+        ok &= await _run_async(["networkctl", "reload"])
+        if iface:
+            await _run_async(["networkctl", "reconfigure", iface])
+        resolved = (await distro.is_resolved_active_async()
+                    or await distro.is_resolved_enabled_async())
+        _networkd_sync_resolv_conf(resolved)
+    return ok
+
+
 def _run(cmd: List[str]) -> bool:
     try:
         rc = subprocess.run(
@@ -398,6 +444,10 @@ def _run(cmd: List[str]) -> bool:
         return False
 
 
+async def _run_async(cmd: List[str]) -> bool:
+    return await hostcmd.succeeds(cmd, timeout=30)
+
+
 def _unlink(path: Path) -> None:
     """Remove `path`, ignoring a missing file.
 
@@ -843,15 +893,18 @@ def _resolv_conf_preserved_lines(path: Path) -> List[str]:
     return preserved
 
 
-def _networkd_sync_resolv_conf() -> None:
+def _networkd_sync_resolv_conf(resolved: Optional[bool] = None) -> None:
     """Synthesise /etc/resolv.conf from networkd DNS when resolved is absent.
 
     No-op unless systemd-resolved is neither active nor enabled (genuinely
     absent): if resolved is enabled it will own resolv.conf once it starts, so
     we do not fight it. Best-effort and never raises. Mirrors the wicked branch
-    of apply_live regenerating resolv.conf via `netconfig update`.
+    of apply_live regenerating resolv.conf via `netconfig update`. resolved
+    is whether systemd-resolved is active or enabled, if already known.
     """
-    if distro.is_resolved_active() or distro.is_resolved_enabled():
+    if resolved is None:
+        resolved = distro.is_resolved_active() or distro.is_resolved_enabled()
+    if resolved:
         return
     servers, domains = _networkd_aggregate_dns()
     if servers:
@@ -1249,15 +1302,38 @@ def _read_nm(iface: str) -> InterfaceConfig:
 
 
 def _write_nm(cfg: InterfaceConfig, member_for_bond: bool = False) -> bool:
+    delete_cmd, add_cmd, up_cmd = _nm_commands(cfg, member_for_bond)
+    try:
+        subprocess.run(delete_cmd, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=False, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        pass
+    ok = _run(add_cmd)
+    if ok and up_cmd:
+        _run(up_cmd)
+    return ok
+
+
+async def _write_nm_async(cfg: InterfaceConfig, member_for_bond: bool = False) -> bool:
+    delete_cmd, add_cmd, up_cmd = _nm_commands(cfg, member_for_bond)
+    await hostcmd.run(delete_cmd, timeout=10, capture=False)
+    ok = await _run_async(add_cmd)
+    if ok and up_cmd:
+        await _run_async(up_cmd)
+    return ok
+
+
+def _nm_commands(cfg: InterfaceConfig, member_for_bond: bool = False
+                 ) -> Tuple[List[str], List[str], Optional[List[str]]]:
+    """Return the nmcli delete, add and (if any) up commands writing cfg."""
     conname = f"grommunio-{cfg.name}"
     base = ["nmcli", "connection"]
-    subprocess.run(base + ["delete", conname], stdout=subprocess.DEVNULL,
-                   stderr=subprocess.DEVNULL, check=False, timeout=10)
+    delete_cmd = base + ["delete", conname]
     if member_for_bond or cfg.bond_master:
         add_cmd = base + ["add", "type", "ethernet", "ifname", cfg.name,
                           "con-name", conname,
                           "master", cfg.bond_master, "slave-type", "bond"]
-        return _run(add_cmd)
+        return delete_cmd, add_cmd, None
     iftype = "bond" if cfg.kind == "bond" else "ethernet"
     add_cmd = base + ["add", "type", iftype, "ifname", cfg.name, "con-name", conname]
     if iftype == "bond":
@@ -1282,10 +1358,7 @@ def _write_nm(cfg: InterfaceConfig, member_for_bond: bool = False) -> bool:
             add_cmd += ["ipv6.method", "manual", "ipv6.addresses", ",".join(v6)]
             if cfg.gateway6:
                 add_cmd += ["ipv6.gateway", cfg.gateway6]
-    ok = _run(add_cmd)
-    if ok:
-        _run(base + ["up", conname])
-    return ok
+    return delete_cmd, add_cmd, base + ["up", conname]
 
 
 def _create_nm_bond(cfg: InterfaceConfig) -> bool:
@@ -1297,6 +1370,15 @@ def _create_nm_bond(cfg: InterfaceConfig) -> bool:
     return True
 
 
+async def _create_nm_bond_async(cfg: InterfaceConfig) -> bool:
+    if not await _write_nm_async(cfg):
+        return False
+    for member in cfg.bond_members:
+        slave = InterfaceConfig(name=member, bond_master=cfg.name)
+        await _write_nm_async(slave, member_for_bond=True)
+    return True
+
+
 # --- Validation ------------------------------------------------------------
 
 def validate_cidr(value: str) -> Optional[str]:
@@ -0,0 +1,258 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: 2026 grommunio GmbH
+"""Running the package update inside the console UI.
+
+The package manager runs on a pseudo terminal, so it prints its progress
+like on the console. Its output is kept in a bounded scrollback buffer and
+parsed into package counts and download rates; the console UI only renders
+the visible end of the buffer, a few times a second.
+"""
+import asyncio
+import codecs
+import fcntl
+import itertools
+import os
+import re
+import struct
+import termios
+from collections import deque
+from typing import Callable, List, Optional
+
+from cui import util
+
+_ = util.init_localization()
+
+# Lines kept in the scrollback buffer
+SCROLLBACK_LINES: int = 5000
+# Terminal escape sequences (CSI, OSC, charset selection, keypad modes)
+_ESCAPES = re.compile(
+    r"\x1b(?:\[[0-?]*[ -/]*[@-~]|\][^\x07\x1b]*(?:\x07|\x1b\\)|[()][0-9A-Za-z]|[=>78])"
+)
+# Control characters left after the escape sequences are removed
+_CONTROLS = re.compile(r"[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f]")
+
+
+class Scrollback:
+    """
+    Bounded ring buffer of output lines.
+
+    A carriage return starts the current line anew, as on a terminal, so
+    progress indicators redrawn in place occupy a single line.
+    """
+    # Increased on every change, for cheap change detection
+    version: int = 0
+
+    def __init__(self, maxlen: int = SCROLLBACK_LINES):
+        self.lines = deque(maxlen=maxlen)
+        self._partial = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add output, return the lines it completed."""
+        text = _CONTROLS.sub("", _ESCAPES.sub("", text)).expandtabs()
+        parts = text.split("\n")
+        done = []
+        for part in parts[:-1]:
+            line = self._visible(self._partial + part)
+            self.lines.append(line)
+            done.append(line)
+            self._partial = ""
+        partial = self._partial + parts[-1]
+        # Keep a pending carriage return, the next output overwrites the line
+        self._partial = self._visible(partial) + ("\r" if partial.endswith("\r") else "")
+        self.version += 1
+        return done
+
+    @staticmethod
+    def _visible(line: str) -> str:
+        """Return what a terminal would show of line."""
+        return line.rstrip("\r").rsplit("\r", 1)[-1]
+
+    def __len__(self) -> int:
+        return len(self.lines) + (1 if self._visible(self._partial) else 0)
+
+    def tail(self, count: int, offset: int = 0) -> List[str]:
+        """Return count lines, ending offset lines before the last one."""
+        partial = self._visible(self._partial)
+        newest = itertools.chain([partial] if partial else [], reversed(self.lines))
+        lines = list(itertools.islice(newest, offset, offset + count))
+        lines.reverse()
+        return lines
+
+
+class ProgressParser:
+    """Turns zypper, dnf and apt output into package counts and download rates."""
+    phase: str = ""
+    current: int = 0
+    total: int = 0
+    rate: str = ""
+
+    # zypper: "Retrieving: vim-9.1 (Main Repository)  (3/12),   1.5 MiB"
+    _ZYPPER_GET = re.compile(r"^Retrieving:?\s+(?:package\s+)?.*\((\d+)/(\d+)\),")
+    # zypper: "(3/12) Installing: vim-9.1 ..."
+    _ZYPPER_INSTALL = re.compile(r"^\((\d+)/(\d+)\)\s+(?:Installing|Removing):")
+    # dnf: "(3/12): vim-9.1.rpm   1.2 MB/s | 1.5 MB   00:01"
+    _DNF_GET = re.compile(r"^\((\d+)/(\d+)\):\s")
+    # dnf: "  Upgrading        : vim-9.1     3/24"
+    _DNF_INSTALL = re.compile(
+        r"^\s+(?:Installing|Upgrading|Cleanup|Erasing|Obsoleting|Reinstalling|"
+        r"Downgrading|Verifying)\s*:.*\s(\d+)/(\d+)\s*$"
+    )
+    # dnf5: "[ 3/12] vim-9.1  100% |   1.2 MiB/s |   1.5 MiB |  00m01s"
+    _DNF5 = re.compile(r"^\[\s*(\d+)/(\d+)\]\s")
+    # apt: "12 upgraded, 3 newly installed, 0 to remove and 0 not upgraded."
+    _APT_SUMMARY = re.compile(r"^(\d+) upgraded, (\d+) newly installed")
+    _APT_GET = re.compile(r"^Get:(\d+)\s")
+    _APT_INSTALL = re.compile(r"^Setting up\s")
+    # "1.2 MiB/s", "4,100 kB/s", "850 B/s"
+    _RATE = re.compile(r"(\d[\d.,]*\s?[kKMG]?i?B/s)")
+
+    def feed(self, line: str) -> bool:
+        """Parse an output line, return True if the progress changed."""
+        before = (self.phase, self.current, self.total, self.rate)
+        rate = self._RATE.findall(line)
+        if rate:
+            self.rate = rate[-1]
+        for pattern, phase in (
+                (self._ZYPPER_GET, _("Downloading")),
+                (self._ZYPPER_INSTALL, _("Installing")),
+                (self._DNF_GET, _("Downloading")),
+                (self._DNF_INSTALL, _("Installing")),
+                (self._DNF5, _("Processing")),
+        ):
+            match = pattern.match(line)
+            if match:
+                self.phase = phase
+                self.current, self.total = int(match.group(1)), int(match.group(2))
+                break
+        else:
+            self._feed_apt(line)
+        return before != (self.phase, self.current, self.total, self.rate)
+
+    def _feed_apt(self, line: str):
+        """apt numbers its downloads only; count the packages set up."""
+        match = self._APT_SUMMARY.match(line)
+        if match:
+            self.phase = _("Downloading")
+            self.total = int(match.group(1)) + int(match.group(2))
+            self.current = 0
+            return
+        match = self._APT_GET.match(line)
+        if match:
+            self.phase = _("Downloading")
+            self.current = int(match.group(1))
+        elif self._APT_INSTALL.match(line):
+            if self.phase != _("Installing"):
+                self.phase = _("Installing")
+                self.current = 0
+            self.current += 1
+
+    def fraction(self) -> float:
+        """Return the progress of the current phase, between 0 and 1."""
+        if not self.total:
+            return 0.0
+        return min(self.current / self.total, 1.0)
+
+    def describe(self) -> str:
+        """Return the progress for display."""
+        if not self.phase:
+            return ""
+        text = self.phase
+        if self.total:
+            text += _(": package %(current)d of %(total)d") % {
+                "current": self.current, "total": self.total,
+            }
+        elif self.current:
+            text += _(": package %d") % self.current
+        if self.rate and self.phase == _("Downloading"):
+            text += f" ({self.rate})"
+        return text
+
+
+class PtyProcess:
+    """Runs commands on a pseudo terminal and hands their output on."""
+    master: Optional[int] = None
+
+    def __init__(self, on_output: Callable[[str], None]):
+        self.on_output = on_output
+
+    async def run(self, cmd: List[str], columns: int = 80, rows: int = 24) -> int:
+        """Run cmd to its end and return its exit code (-1 if it did not start)."""
+        master, slave = os.openpty()
+        fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack("HHHH", rows, columns, 0, 0))
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, stdin=slave, stdout=slave, stderr=slave,
+                start_new_session=True, env=dict(os.environ, TERM="dumb"),
+            )
+        except OSError as exc:
+            os.close(master)
+            os.close(slave)
+            self.on_output(f"{cmd[0]}: {exc}\n")
+            return -1
+        os.close(slave)
+        loop = asyncio.get_event_loop()
+        closed = loop.create_future()
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        def readable():
+            try:
+                data = os.read(master, 65536)
+            except OSError:
+                # EIO once the last writer has gone
+                data = b""
+            if data:
+                self.on_output(decoder.decode(data))
+            else:
+                loop.remove_reader(master)
+                if not closed.done():
+                    closed.set_result(None)
+
+        self.master = master
+        loop.add_reader(master, readable)
+        try:
+            await closed
+            return await proc.wait()
+        finally:
+            loop.remove_reader(master)
+            self.master = None
+            os.close(master)
+
+    def write(self, text: str):
+        """Pass input on to the running command."""
+        if self.master is not None:
+            try:
+                os.write(self.master, text.encode())
+            except OSError:
+                pass
+
+
+class PackageUpdate:
+    """
+    Refreshes the repositories and updates all packages on a pseudo terminal.
+
+    scrollback holds the output and progress the parsed state; both may be
+    read from the main loop at any time. returncode is set once run()
+    finished.
+    """
+    returncode: Optional[int] = None
+
+    def __init__(self, refresh_cmd: List[str], update_cmd: List[str]):
+        self.commands = [refresh_cmd, update_cmd]
+        self.scrollback = Scrollback()
+        self.progress = ProgressParser()
+        self.pty = PtyProcess(self._output)
+
+    def _output(self, text: str):
+        for line in self.scrollback.feed(text):
+            self.progress.feed(line)
+
+    async def run(self, columns: int = 80, rows: int = 24) -> int:
+        """Run the commands one after the other; return the first failing exit code."""
+        returncode = 0
+        for cmd in self.commands:
+            self._output(f"\n# {' '.join(cmd)}\n")
+            self.progress = ProgressParser()
+            result = await self.pty.run(cmd, columns, rows)
+            returncode = returncode or result
+        self.returncode = returncode
+        return returncode
@@ -0,0 +1,232 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: 2026 grommunio GmbH
+"""Wall-clock timing of the CUI startup phases and of the painted frames.
+
+Started with ``--profile-startup`` the CUI reports how long each startup
+phase took once the first frame has been painted. The report goes to stderr,
+or is appended to FILE with ``--profile-startup=FILE``.
+
+Started with ``-v`` or ``--render-stats`` the CUI keeps rolling figures of
+the key-to-paint latency and the frame render time per window, and of the
+widget classes the render time went to. ``-v`` shows them in the footer;
+``--render-stats`` reports them on exit, to stderr or appended to FILE with
+``--render-stats=FILE``.
+"""
+import functools
+import sys
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+OPTION = "--profile-startup"
+RENDER_STATS_OPTION = "--render-stats"
+# Frames per window the rolling figures are taken from
+RENDER_STATS_SAMPLES: int = 500
+
+
+class StartupProfiler:
+    """Collects the duration of named startup phases and reports them once."""
+
+    def __init__(self, argv: Optional[List[str]] = None):
+        self.origin: float = time.monotonic()
+        self.phases: List[Tuple[str, float]] = []
+        self.enabled: bool = False
+        self.target: Optional[str] = None
+        self.reported: bool = False
+        self.configure(sys.argv if argv is None else argv)
+
+    def configure(self, argv: List[str]):
+        """Enable the profiler if OPTION is found in argv."""
+        for arg in argv:
+            if arg == OPTION:
+                self.enabled = True
+            elif arg.startswith(f"{OPTION}="):
+                self.enabled = True
+                self.target = arg.split("=", 1)[1] or None
+
+    def add(self, name: str, start: float, end: Optional[float] = None):
+        """Record phase name as running from start until end (default: now)."""
+        if end is None:
+            end = time.monotonic()
+        self.phases.append((name, end - start))
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as phase name."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(name, start)
+
+    def report(self) -> str:
+        """Return the collected timings as a human readable table."""
+        lines = ["grommunio-cui startup profile (wall clock)"]
+        width = max([len(name) for name, _ in self.phases] + [len("first paint")])
+        for name, duration in self.phases:
+            lines.append(f"  {name.ljust(width)}  {duration * 1000:9.1f} ms")
+        lines.append(
+            f"  {'first paint'.ljust(width)}  "
+            f"{(time.monotonic() - self.origin) * 1000:9.1f} ms after start"
+        )
+        return "\n".join(lines) + "\n"
+
+    def dump(self) -> bool:
+        """Write the report once. Return True if it went to stderr."""
+        if not self.enabled or self.reported:
+            return False
+        self.reported = True
+        text = self.report()
+        if self.target:
+            try:
+                with open(self.target, "a", encoding="utf-8") as file_handle:
+                    file_handle.write(text)
+                return False
+            except OSError:
+                pass
+        sys.stderr.write(text)
+        sys.stderr.flush()
+        return True
+
+
+def percentiles(samples: Sequence[float]) -> Tuple[float, float, float]:
+    """Return p50, p95 and the maximum of samples (zeros if there are none)."""
+    if not samples:
+        return 0.0, 0.0, 0.0
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return ordered[last // 2], ordered[min(last, int(len(ordered) * 0.95))], ordered[last]
+
+
+class RenderStats:
+    """
+    Rolling frame timings per window and the render time per widget class.
+
+    instrument() wraps the render() methods of all widget classes, so each
+    class is charged the time spent in its own render() minus the time of
+    the widgets it rendered in turn; which class dominated a slow frame
+    shows without a profiler.
+    """
+
+    def __init__(self, argv: Optional[List[str]] = None, samples: int = RENDER_STATS_SAMPLES):
+        self.samples = samples
+        self.enabled: bool = False
+        self.target: Optional[str] = None
+        self.reported: bool = False
+        self.instrumented: bool = False
+        # window -> rolling frame times and key-to-paint latencies, in seconds
+        self.frame_times: Dict[str, Deque[float]] = {}
+        self.key_latencies: Dict[str, Deque[float]] = {}
+        # window -> widget class -> render time in seconds, all frames
+        self.widget_times: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        # Widget render times of the frame being painted, and of the last one
+        self._frame_widgets: Dict[str, float] = defaultdict(float)
+        self.last_frame_widgets: Dict[str, float] = {}
+        # Render time of the nested widgets of the render() calls running
+        self._nested: List[float] = []
+        self.configure(sys.argv if argv is None else argv)
+
+    def configure(self, argv: List[str]):
+        """Enable the report on exit if RENDER_STATS_OPTION is found in argv."""
+        for arg in argv:
+            if arg == RENDER_STATS_OPTION:
+                self.enabled = True
+            elif arg.startswith(f"{RENDER_STATS_OPTION}="):
+                self.enabled = True
+                self.target = arg.split("=", 1)[1] or None
+
+    def instrument(self):
+        """Time the render() method of every urwid widget class defined so far."""
+        if self.instrumented:
+            return
+        import urwid  # pylint: disable=import-outside-toplevel
+        self.instrumented = True
+        todo = [urwid.Widget]
+        while todo:
+            cls = todo.pop()
+            todo.extend(cls.__subclasses__())
+            if "render" in cls.__dict__:
+                cls.render = self._timed(cls.__dict__["render"])
+
+    def _timed(self, render: Callable) -> Callable:
+        @functools.wraps(render)
+        def timed(widget, *args, **kwargs):
+            self._nested.append(0.0)
+            start = time.perf_counter()
+            try:
+                return render(widget, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = self._nested.pop()
+                if self._nested:
+                    self._nested[-1] += elapsed
+                self._frame_widgets[type(widget).__name__] += elapsed - nested
+        return timed
+
+    def record(self, window: str, frame_time: float, key_latency: Optional[float]):
+        """Add a painted frame of window."""
+        if window not in self.frame_times:
+            self.frame_times[window] = deque(maxlen=self.samples)
+            self.key_latencies[window] = deque(maxlen=self.samples)
+        self.frame_times[window].append(frame_time)
+        if key_latency is not None:
+            self.key_latencies[window].append(key_latency)
+        totals = self.widget_times[window]
+        for name, elapsed in self._frame_widgets.items():
+            totals[name] += elapsed
+        self.last_frame_widgets = dict(self._frame_widgets)
+        self._frame_widgets.clear()
+
+    def summary(self, window: str) -> str:
+        """Return the figures of window in one line, for the footer."""
+        if window not in self.frame_times:
+            return ""
+        key = "/".join(f"{value * 1000:.0f}" for value in percentiles(self.key_latencies[window]))
+        frame = "/".join(f"{value * 1000:.0f}" for value in percentiles(self.frame_times[window]))
+        text = f"key {key} ms, frame {frame} ms (p50/p95/max)"
+        if self.last_frame_widgets:
+            name, elapsed = max(self.last_frame_widgets.items(), key=lambda item: item[1])
+            total = sum(self.last_frame_widgets.values())
+            if total > 0:
+                text += f", {name}.render {elapsed / total:.0%}"
+        return text
+
+    def report(self, top: int = 5) -> str:
+        """Return the figures of all windows as a human readable table."""
+        lines = ["grommunio-cui render statistics (ms, p50/p95/max, "
+                 f"last {self.samples} frames per window)"]
+        for window in sorted(self.frame_times):
+            frames = self.frame_times[window]
+            keys = self.key_latencies[window]
+            lines.append(f"  {window}: {len(frames)} frames, {len(keys)} after input")
+            for label, samples in (("key to paint", keys), ("frame", frames)):
+                p50, p95, peak = percentiles(samples)
+                lines.append(f"    {label:<14}{p50 * 1000:9.1f}{p95 * 1000:9.1f}{peak * 1000:9.1f}")
+            widgets = sorted(self.widget_times[window].items(), key=lambda item: item[1],
+                             reverse=True)
+            total = sum(elapsed for _, elapsed in widgets)
+            for name, elapsed in widgets[:top]:
+                share = elapsed / total if total > 0 else 0.0
+                lines.append(f"    {name + '.render':<32}{elapsed * 1000:9.1f} ms {share:4.0%}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self):
+        """Write the report once, if enabled."""
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        text = self.report()
+        if self.target:
+            try:
+                with open(self.target, "a", encoding="utf-8") as file_handle:
+                    file_handle.write(text)
+                return
+            except OSError:
+                pass
+        sys.stderr.write(text)
+        sys.stderr.flush()
+
+
+profiler: StartupProfiler = StartupProfiler()
+render_stats: RenderStats = RenderStats()
@@ -0,0 +1,161 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: 2026 grommunio GmbH
+"""Applying a changed software repository configuration.
+
+Downloading the repository key, importing it and refreshing the package
+manager's metadata can take minutes on a slow mirror. RepoApply runs these
+steps on the asyncio main loop (the download in a worker thread), reports
+the current stage and the download progress, and can be cancelled. The whole
+run is bounded by a timeout.
+"""
+import asyncio
+import threading
+from pathlib import Path
+from typing import Optional
+
+from cui import distro, hostcmd, util
+
+_ = util.init_localization()
+
+# Connect and read timeout of the key download
+KEY_DOWNLOAD_TIMEOUT: float = 30
+# Upper bound of a whole run, in seconds
+APPLY_TIMEOUT: float = 600
+DOWNLOAD_CHUNK_SIZE: int = 8192
+
+# Stages of a run and the share of the progress bar they take
+STAGE_DOWNLOAD = "download"
+STAGE_WRITE = "write"
+STAGE_IMPORT = "import"
+STAGE_REFRESH = "refresh"
+STAGE_DONE = "done"
+_STAGE_SPANS = {
+    STAGE_DOWNLOAD: (0.0, 0.3),
+    STAGE_WRITE: (0.3, 0.4),
+    STAGE_IMPORT: (0.4, 0.5),
+    STAGE_REFRESH: (0.5, 1.0),
+    STAGE_DONE: (1.0, 1.0),
+}
+
+
+class RepoApply:
+    """
+    Downloads and imports the repository key, optionally writes the
+    repository file and refreshes the package manager's metadata.
+
+    run() returns "" on success, otherwise the reason of the failure. The
+    attributes stage, received and total may be read from the main loop
+    at any time to show the progress.
+    """
+    stage: str = STAGE_DOWNLOAD
+    # Bytes of the key received so far and the announced size, if any
+    received: int = 0
+    total: Optional[int] = None
+
+    def __init__(self, keyurl: str, keyfile: str, repofile: Optional[str] = None,
+                 repo_body: Optional[str] = None, timeout: float = APPLY_TIMEOUT):
+        self.keyurl = keyurl
+        self.keyfile = keyfile
+        self.repofile = repofile
+        self.repo_body = repo_body
+        self.timeout = timeout
+        self._stop = threading.Event()
+        self._task: Optional[asyncio.Future] = None
+
+    def fraction(self) -> float:
+        """Return the progress of the whole run, between 0 and 1."""
+        start, end = _STAGE_SPANS[self.stage]
+        if self.stage == STAGE_DOWNLOAD and self.total:
+            return start + (end - start) * min(self.received / self.total, 1.0)
+        return start
+
+    def describe(self) -> str:
+        """Return the current stage for display."""
+        if self.stage == STAGE_DOWNLOAD:
+            if self.total:
+                return _("Downloading the repository key (%(received)s of %(total)s)") % {
+                    "received": util.get_hr(self.received),
+                    "total": util.get_hr(self.total),
+                }
+            return _("Downloading the repository key (%s)") % util.get_hr(self.received)
+        return {
+            STAGE_WRITE: _("Writing the repository configuration"),
+            STAGE_IMPORT: _("Importing the repository key"),
+            STAGE_REFRESH: _("Refreshing the repositories"),
+            STAGE_DONE: _("Done"),
+        }[self.stage]
+
+    def cancel(self):
+        """Stop the run; run() returns as soon as the current step is aborted."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+
+    async def run(self) -> str:
+        """Apply the configuration; return "" or the reason it failed."""
+        self._task = asyncio.ensure_future(self._run())
+        try:
+            return await asyncio.wait_for(self._task, self.timeout)
+        except asyncio.TimeoutError:
+            return _("The repository update did not finish within %d seconds.") % self.timeout
+        except asyncio.CancelledError:
+            return _("The repository update has been cancelled.")
+        finally:
+            # Let a still running download thread give up
+            self._stop.set()
+
+    async def _run(self) -> str:
+        requests = util.import_requests()
+        loop = asyncio.get_event_loop()
+        try:
+            key = await loop.run_in_executor(None, self._download, requests)
+        except requests.RequestException:
+            return _("Could not download the grommunio GPG key from %s.") % self.keyurl
+        if key is None:
+            return _("Software repository selection has not been updated. Something "
+                     "went wrong while importing key file.")
+        self.stage = STAGE_WRITE
+        try:
+            path = Path(self.keyfile)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("w", encoding="utf-8") as file:
+                file.write(key.decode())
+        except OSError as exc:
+            return _("Failed to write key file %(path)s: %(err)s") % {
+                "path": self.keyfile, "err": str(exc),
+            }
+        if self.repofile and self.repo_body is not None:
+            try:
+                with open(self.repofile, "w", encoding="utf-8") as file:
+                    file.write(self.repo_body)
+            except OSError as exc:
+                return _("Failed to write repo file %(path)s: %(err)s") % {
+                    "path": self.repofile, "err": str(exc),
+                }
+        self.stage = STAGE_IMPORT
+        import_cmd = distro.pkg_import_key_cmd(self.keyfile)
+        if import_cmd:
+            await hostcmd.run(import_cmd, timeout=self.timeout, capture=False)
+        self.stage = STAGE_REFRESH
+        refresh_cmd = distro.pkg_refresh_cmd()
+        # Without a package manager the files have at least been written
+        if refresh_cmd and not await hostcmd.succeeds(refresh_cmd, timeout=self.timeout):
+            return _("Software repository selection has not been updated. Something "
+                     "went wrong while importing key file.")
+        self.stage = STAGE_DONE
+        return ""
+
+    def _download(self, requests) -> Optional[bytes]:
+        """Return the key, or None if it is not available or the run stopped."""
+        with requests.get(self.keyurl, stream=True, timeout=KEY_DOWNLOAD_TIMEOUT) as res:
+            if res.status_code != 200:
+                return None
+            length = res.headers.get("Content-Length", "")
+            self.total = int(length) if length.isdigit() else None
+            chunks = []
+            for chunk in res.iter_content(DOWNLOAD_CHUNK_SIZE):
+                if self._stop.is_set():
+                    return None
+                chunks.append(chunk)
+                self.received += len(chunk)
+        return b"".join(chunks)
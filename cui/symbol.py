@@ -18,6 +18,7 @@ DNS_CONFIG: str = "DNS-CONFIG"
 MESSAGE_BOX: str = "MESSAGE-BOX"
 INPUT_BOX: str = "INPUT-BOX"
 LOG_VIEWER: str = "LOG-VIEWER"
+LOG_SEARCH: str = "LOG-SEARCH"
 ADMIN_WEB_PW: str = "ADMIN-WEB-PW"
 TIMESYNCD: str = "TIMESYNCD"
 KEYBOARD_SWITCH: str = "KEYBOARD_SWITCH"
@@ -29,3 +30,6 @@ HOSTNAME_CONFIG: str = "HOSTNAME-CONFIG"
 NETWORK_INTERFACE_SELECT: str = "NETWORK-INTERFACE-SELECT"
 NETWORK_INTERFACE_EDIT: str = "NETWORK-INTERFACE-EDIT"
 NETWORK_BOND_CREATE: str = "NETWORK-BOND-CREATE"
+BUSY: str = "BUSY"
+REPO_APPLY: str = "REPOSITORY-APPLY"
+PKG_UPDATE: str = "PACKAGE-UPDATE"
@@ -1,10 +1,8 @@
 # SPDX-License-Identifier: AGPL-3.0-or-later
 # SPDX-FileCopyrightText: 2021 grommunio GmbH
 """The module contains all cui utilities/functions"""
-import cffi
 import os
 import subprocess
-import sys
 import time
 from pathlib import Path
 import ipaddress
@@ -12,23 +10,16 @@ import locale
 import platform
 import socket
 import shlex
-from typing import Any, Dict, List, Tuple, Union, Iterable
+from typing import Any, Dict, List, Optional, Tuple, Union
 from datetime import datetime
 import re
 
 import psutil
-from pamela import authenticate, PAMError
-
-try:
-    import requests
-    from requests import Response
-except ImportError:  # requests is optional; only the repo dialog uses it
-    requests = None
-    Response = None  # type: ignore
 
 import urwid
 import cui
 from cui import distro as _distro
+from cui.localization import localization
 
 
 def _(msg):
@@ -36,7 +27,8 @@ def _(msg):
     return msg
 
 
-STATES = {
+# Untranslated messages, STATES holds them in the active language
+_STATE_MESSAGES = {
     1: _("System password is not set."),
     2: _("Network configuration is missing."),
     4: _("grommunio-setup has not been run yet."),
@@ -44,6 +36,7 @@ STATES = {
     16: _("nginx is not running."),
     32: _("grommunio-admin is not installed."),
 }
+STATES = dict(_STATE_MESSAGES)
 
 
 def reset_states():
@@ -51,33 +44,22 @@ def reset_states():
     # pylint: disable=global-statement
     # because that is needed for on the fly translation
     global STATES
-    new_states = {}
-    if STATES:
-        for key, val in STATES.items():
-            new_states[key] = _(val)
-    STATES = new_states
+    STATES = {key: localization.gettext(val) for key, val in _STATE_MESSAGES.items()}
     return STATES
 
 
-def init_localization(language: Union[str, str, Iterable[Union[str, str]], None] = ''):
-    """Initialize localisation"""
-    locale.setlocale(locale.LC_ALL, language)
-    try:
-        locale.bindtextdomain(
-            'cui', 'locale' if os.path.exists("locale/de/LC_MESSAGES/cui.mo") else None
-        )
-        locale.textdomain('cui')
-        _ = locale.gettext
-        reset_states()
-        return _
-    except (OSError, AttributeError):
-        def _(msg):
-            """
-            Function for tagging text for translations.
-            """
-            return msg
+def init_localization(language: Optional[str] = None):
+    """
+    Return the translation function of the central localization service.
+
+    The first call, or one naming a language, (re)selects the active language
+    ("" = from the environment). The returned function always translates into
+    the currently active language.
+    """
+    if language is not None or not localization.initialized:
+        localization.set_language(language or "")
         reset_states()
-        return _
+    return localization.gettext
 
 
 _ = init_localization()
@@ -107,35 +89,29 @@ def get_button_type(key, open_func_on_ok, mb_func, cancel_msgbox_params, size):
     return val
 
 
-def restart_gui():
-    """Restart complete GUI to source language in again."""
-    ret_val = _
+def restart_gui(app=None):
+    """Switch the running GUI to the configured system language."""
     # SUSE only: /etc/sysconfig/language has a ROOT_USES_LANG flag we want set
     # so root sees the localized UI. On other distros that file doesn't exist
     # and locale is handled entirely through /etc/locale.conf, which is fine.
     langfile = _distro.get_suse_language_path()
     if langfile:
+        import cui.classes.parser  # pylint: disable=import-outside-toplevel
         config = cui.classes.parser.ConfigParser(infile=langfile)
         config['ROOT_USES_LANG'] = '"yes"'
         config.write()
     locale_conf = minishell_read(_distro.get_locale_conf_path())
-    if os.getppid() == 1:
-        # from pudb.remote import set_trace; set_trace(term_size=(230, 60))
-        ret_val = init_localization(language=locale_conf.get('LANG', ''))
-        cui.main_app(True)
-        # raise ExitMainLoop()
-    else:
-        env = {}
-        for k in os.environ:
-            env[k] = os.environ.get(k)
-        for k in locale_conf:
-            env[k] = locale_conf.get(k)
-        os.execve(sys.executable, [sys.executable] + sys.argv, env)
-    return ret_val
+    for k in locale_conf:
+        # Children like the terminal or the update run inherit the language
+        os.environ[k] = locale_conf.get(k)
+    language = locale_conf.get('LANG', '')
+    if app is not None:
+        return app.switch_language(language)
+    return init_localization(language=language)
 
 
 def create_main_loop(app):
-    """Create urwid main loop"""
+    """Create urwid main loop (running on asyncio, see GMainLoop)"""
     urwid.set_encoding("utf-8")
     app.view.gscreen = cui.classes.application.GScreen()
     app.view.gscreen.screen = urwid.raw_display.Screen()
@@ -144,7 +120,7 @@ def create_main_loop(app):
     app.view.gscreen.screen.tty_signal_keys(*app.view.gscreen.blank_termios)
     app.prepare_mainscreen()
     # Loop
-    return urwid.MainLoop(
+    return cui.classes.loop.GMainLoop(
         app.control.app_control.body,
         get_palette(app.view.header.get_colormode()),
         unhandled_input=app.handle_event,
@@ -169,6 +145,19 @@ def get_repo_url(user: str = None, password: str = None):
     return f"{url}?ssl_verify=no" if "?" not in url else url
 
 
+def import_requests():
+    """Return the requests module, or None if it is not installed.
+
+    requests is optional and slow to import; only the repository dialog
+    needs it, so it is imported on first use.
+    """
+    try:
+        import requests  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return requests
+
+
 def check_repo_dialog(app, height):
     """Check the repository selection dialog"""
     updateable = False
@@ -178,6 +167,7 @@ def check_repo_dialog(app, height):
         # supported selected
         user = app.control.menu_control.repo_selection_body.base_widget[4][1].edit_text
         password = app.control.menu_control.repo_selection_body.base_widget[5][1].edit_text
+        requests = import_requests()
         if requests is None:
             app.message_box(
                 cui.parameter.MsgBoxParams(
@@ -447,12 +437,11 @@ def extract_bits(binary):
     return ret_val
 
 
-def check_socket(host="127.0.0.1", port=22):
+def check_socket(host="127.0.0.1", port=22, timeout=3):
     """Check if socket is open"""
     try:
-        socket.setdefaulttimeout(3)
-        socket.socket(socket.AF_INET, socket.SOCK_STREAM).connect((host, port))
-        return True
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
     except socket.error:
         return False
 
@@ -530,6 +519,8 @@ def authenticate_user(username: str, password: str, service: str = "login") -> b
     :param service: PAM service to use. "login" is default.
     :return: True on success, False if not.
     """
+    # pamela searches for libpam on import, so only load it for a login
+    from pamela import authenticate, PAMError  # pylint: disable=import-outside-toplevel
     try:
         authenticate(username, password, service)
         return True
@@ -575,6 +566,7 @@ def get_ip_list() -> List[str]:
 
 def get_last_login_time():
     """Return last login time as string"""
+    import cffi  # pylint: disable=import-outside-toplevel
     last_login = ["Unknown"]
     bld = cffi.FFI()
 
@@ -646,10 +638,26 @@ def get_load_avg_format_list():
     return load_format[:-1]
 
 
+_HOST_FACT_CACHE: Dict[str, Any] = {}
+
+
+def get_host_fact(name: str, func, *args) -> Any:
+    """Return func(*args), calling it only on the first request for name.
+
+    Meant for facts that do not change while the CUI runs (processor, CPU
+    count, boot time), so refreshing the screen does not probe them again.
+    The hostname, CPU frequency, os-release and last login may change and
+    are read on every refresh.
+    """
+    if name not in _HOST_FACT_CACHE:
+        _HOST_FACT_CACHE[name] = func(*args)
+    return _HOST_FACT_CACHE[name]
+
+
 def get_system_info_top():
     """Return top sysinfo"""
     ret_val: List[Union[str, Tuple[str, str]]] = []
-    uname = platform.uname()
+    processor = get_host_fact("processor", platform.processor)
     cpufreq = psutil.cpu_freq()
     svmem = psutil.virtual_memory()
     distro, version = get_os_release()
@@ -668,12 +676,13 @@ def get_system_info_top():
     ret_val.append("\n")
     if cpufreq:
         ret_val.append(
-            f"{psutil.cpu_count()} x {uname.processor} CPUs"
+            f"{get_host_fact('cpu_count', psutil.cpu_count)} x {processor} CPUs"
             f" @ {get_hr(cpufreq.current * 1000 * 1000, 'Hz', 1000)}"
         )
     else:
         ret_val.append(
-            f"{psutil.cpu_count(logical=False)} x {uname.processor} CPUs"
+            f"{get_host_fact('cpu_count_physical', psutil.cpu_count, False)} x "
+            f"{processor} CPUs"
         )
     ret_val.append("\n")
     ret_val.append(
@@ -692,19 +701,20 @@ def get_system_info_bottom():
     from cui.classes.application import setup_state
     """Return bottom sysinfo"""
     ret_val: List[Union[str, Tuple[str, str]]] = []
-    uname = platform.uname()
+    # Not platform.uname(), which keeps its first answer for the hostname
+    node = os.uname().nodename
     if_addrs = psutil.net_if_addrs()
-    boot_time_timestamp = psutil.boot_time()
+    boot_time_timestamp = get_host_fact("boot_time", psutil.boot_time)
     boot_time = datetime.fromtimestamp(boot_time_timestamp)
     proto = "https"
-    if setup_state.check_setup_state() == 0:
+    if setup_state.check_setup_state() == 0 and not setup_state.pending:
         ret_val += [
             "\n",
             _("For further configuration, these URLs can be used:"),
             "\n",
         ]
         ret_val.append("\n")
-        if uname.node.lower().startswith("localhost."):
+        if node.lower().startswith("localhost."):
             ret_val.append(
                 (
                     "important",
@@ -712,7 +722,7 @@ def get_system_info_bottom():
                 )
             )
             ret_val.append("\n")
-        ret_val.append(f"{proto}://{uname.node}:8443/\n")
+        ret_val.append(f"{proto}://{node}:8443/\n")
         for interface_name, interface_addresses in if_addrs.items():
             if interface_name in ["lo"]:
                 continue
@@ -732,15 +742,19 @@ def get_system_info_bottom():
                     f"{proto}://{address.address}:8443/ (interface {interface_name})\n"
                 )
     else:
-        ret_val.append("\n")
-        ret_val.append(
-            _("There are still some tasks missing to run/use grommunio.")
-        )
         ret_val.append("\n")
         statelist = extract_bits(setup_state.check_setup_state())
+        if statelist:
+            ret_val.append(
+                _("There are still some tasks missing to run/use grommunio.")
+            )
+            ret_val.append("\n")
         for state in statelist:
             ret_val.append("\n")
             ret_val.append(("important", STATES.get(state)))
+        if setup_state.pending:
+            ret_val.append("\n")
+            ret_val.append(("reverse", _("Checking the setup state …")))
         ret_val.append("\n")
     ret_val.append("\n")
     ret_val.append(_("Boot Time: "))
@@ -891,6 +905,18 @@ def fast_tail(file: str, line_count: int = 0) -> List[str]:
     return [line.strip() for line in lines[-line_count:]]
 
 
+def get_journal_stamp() -> float:
+    """Return the newest modification time of the active journal files"""
+    stamp: float = 0.0
+    for pattern in ("/var/log/journal/*/system.journal", "/run/log/journal/*/system.journal"):
+        for journal in Path("/").glob(pattern.lstrip("/")):
+            try:
+                stamp = max(stamp, journal.stat().st_mtime)
+            except OSError:
+                pass
+    return stamp
+
+
 def lineconfig_read(file):
     """Read file to items dictionary. lineconfig,
     does NOT recognize quotes and backslashes."""
@@ -0,0 +1,146 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: 2026 grommunio GmbH
+"""Latency benchmark of held navigation keys.
+
+Holds "down" in a log viewer sized Scrollable while the terminal auto-repeats
+it at a fixed rate, and measures how long each key press takes until the
+frame showing it is painted. The key presses arrive on a simulated clock
+which advances by the measured processing time, so a loop which cannot keep
+up queues the keys, as the terminal would. The run fails if the latency at
+the end of the hold exceeds the budget of a few frame times, i.e. if it
+keeps growing the longer the key is held.
+
+The per-key mode processes and paints every key press on its own, as the
+console UI did before held keys were collapsed, for comparison.
+
+    python3 tools/bench_key_repeat.py [--rate HZ] [--seconds S] [--lines N]
+                                      [--per-key] [--budget FRAMES]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import List, Tuple
+
+import urwid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from cui.classes.loop import GMainLoop  # noqa: E402
+from cui.classes.scroll import Scrollable, ScrollBar  # noqa: E402
+
+DEFAULT_RATE: float = 30.0
+DEFAULT_SECONDS: float = 5.0
+DEFAULT_LINES: int = 10000
+# Frame times a key press may wait at most: the frame being painted when it
+# arrives, the frame showing it and some slack
+DEFAULT_BUDGET_FRAMES: float = 3.0
+SCREEN_SIZE: Tuple[int, int] = (100, 40)
+
+
+class _Screen(urwid.BaseScreen):
+    """Screen which renders the canvas content but prints nothing."""
+    def get_cols_rows(self):
+        return SCREEN_SIZE
+
+    def draw_screen(self, size, canvas):
+        for _ in canvas.content():
+            pass
+
+    def hook_event_loop(self, event_loop, callback):
+        """The input is fed by the benchmark."""
+
+    def unhook_event_loop(self, event_loop):
+        """The input is fed by the benchmark."""
+
+
+def build_loop(lines: int) -> GMainLoop:
+    """Return a main loop showing lines log lines, as the log viewer does."""
+    widget = ScrollBar(Scrollable(urwid.Pile([
+        urwid.Text(f"Oct 16 12:00:{i % 60:02d} host grommunio-cui[42]: log line {i}")
+        for i in range(lines)
+    ])))
+    loop = GMainLoop(widget, screen=_Screen())
+    loop.screen.start()
+    loop.entering_idle()
+    return loop
+
+
+def frame_time(loop: GMainLoop, runs: int = 5) -> float:
+    """Return the fastest time in seconds to render and paint a frame."""
+    times = []
+    for _ in range(runs):
+        loop.widget.original_widget._invalidate()  # pylint: disable=protected-access
+        start = time.perf_counter()
+        loop.draw_screen()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def hold(loop: GMainLoop, rate: float, seconds: float, per_key: bool) -> List[float]:
+    """Hold down and return the latency of each key press in seconds."""
+    arrivals = [i / rate for i in range(int(rate * seconds))]
+    latencies: List[float] = []
+    clock = 0.0
+    pending = 0
+    while pending < len(arrivals):
+        clock = max(clock, arrivals[pending])
+        due = pending
+        while due < len(arrivals) and arrivals[due] <= clock:
+            due += 1
+        batches = [["down"]] * (due - pending) if per_key else [["down"] * (due - pending)]
+        for keys in batches:
+            start = time.perf_counter()
+            loop.process_input(keys)
+            loop.entering_idle()
+            clock += time.perf_counter() - start
+            for _ in keys:
+                latencies.append(clock - arrivals[pending])
+                pending += 1
+    return latencies
+
+
+def main(argv: List[str]) -> int:
+    """Run the benchmark and return the exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help="auto-repeat rate in Hz (default: %(default)s)")
+    parser.add_argument("--seconds", type=float, default=DEFAULT_SECONDS,
+                        help="how long the key is held (default: %(default)s)")
+    parser.add_argument("--lines", type=int, default=DEFAULT_LINES,
+                        help="lines in the scrolled text (default: %(default)s)")
+    parser.add_argument("--per-key", action="store_true",
+                        help="paint after every key press instead of collapsing them")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_FRAMES,
+                        help="latency budget at the end of the hold in frame times "
+                             "(default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    loop = build_loop(args.lines)
+    frame_ms = frame_time(loop) * 1000
+    budget_ms = args.budget * frame_ms + 1000 / args.rate
+    frames = loop.frames
+    latencies = hold(loop, args.rate, args.seconds, args.per_key)
+    frames = loop.frames - frames
+    scrolled = loop.widget.original_widget.get_scrollpos()
+    ms = sorted(latency * 1000 for latency in latencies)
+    tail = [latency * 1000 for latency in latencies[-max(1, int(args.rate)):]]
+    print(f"{len(latencies)} key presses at {args.rate:g} Hz, {frames} frames, "
+          f"scrolled {scrolled} lines ({'per key' if args.per_key else 'collapsed'})")
+    print(f"  frame time  {frame_ms:8.1f} ms")
+    print(f"  latency p50 {statistics.median(ms):8.1f} ms")
+    print(f"  latency p95 {ms[int(len(ms) * 0.95) - 1]:8.1f} ms")
+    print(f"  latency max {ms[-1]:8.1f} ms")
+    print(f"  last second {max(tail):8.1f} ms (budget {budget_ms:.1f} ms)")
+    if max(tail) > budget_ms:
+        print(f"FAIL: latency at the end of the hold exceeds the budget by "
+              f"{max(tail) - budget_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
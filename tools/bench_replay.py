@@ -0,0 +1,563 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: 2026 grommunio GmbH
+"""Headless key replay benchmark of the console UI.
+
+Runs the full Application on a fake screen of fixed size and replays
+scripted key sequences, measuring for every key the time until its frame is
+painted and, in a second pass under tracemalloc, the memory it allocates.
+Every host interaction is stubbed with canned, deterministic answers:
+subprocess (also the asyncio variant and os.system), psutil, the systemd
+journal, PAM and the /etc/shadow lookup. The host facts cache goes to a
+temporary directory. Results of different releases are thus comparable
+without an appliance.
+
+The results can be written as JSON and compared with the JSON of a previous
+run; the comparison fails if the p95 latency of a scenario got worse by more
+than the tolerance.
+
+    python3 tools/bench_replay.py [--scenario NAME]... [--runs N] [--no-alloc]
+                                  [--json FILE] [--compare FILE] [--tolerance PCT]
+"""
+import argparse
+import asyncio
+import collections
+import datetime
+import io
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+import warnings
+from typing import Any, Dict, List, Optional, Tuple
+
+import urwid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCREEN_SIZE: Tuple[int, int] = (120, 40)
+DEFAULT_RUNS: int = 2
+# Allowed p95 latency regression against --compare, in percent
+DEFAULT_TOLERANCE: float = 20.0
+# Regressions below this many milliseconds are noise
+MIN_REGRESSION_MS: float = 1.0
+JOURNAL_ENTRIES: int = 5000
+# Seconds a key may keep background tasks (host commands) busy
+SETTLE_TIMEOUT: float = 5.0
+RESULT_FORMAT: int = 1
+
+LOGIN: List[str] = ["f2", *"secret", "enter"]
+# name -> (keys, window expected at the end)
+SCENARIOS: Dict[str, Tuple[List[str], str]] = {
+    "main-menu-walk": (LOGIN + ["down"] * 15 + ["up"] * 15, "MAIN-MENU"),
+    "timezone-to-end": (
+        LOGIN + ["down"] * 5 + ["enter"] + ["page down"] * 30 + ["end"], "TIMEZONE-SELECTION"
+    ),
+    "log-viewer-grow": (["h"] + ["+"] * 20, "LOG-VIEWER"),
+    "keyboard-list": (LOGIN + ["f5"] + ["down"] * 40 + ["page up"] * 5, "KEYBOARD_SWITCH"),
+}
+
+
+# --- host stubs -------------------------------------------------------------
+
+def _canned_lists() -> Dict[Tuple[str, ...], str]:
+    languages = ["ar", "cs", "da", "de", "el", "en", "es", "fi", "fr", "hu",
+                 "it", "ja", "ko", "nl", "pl", "pt", "ru", "sv", "tr", "zh"]
+    countries = ["AT", "BE", "BR", "CA", "CH", "CN", "DE", "ES", "FR", "GB",
+                 "IN", "IT", "JP", "MX", "NL", "PL", "PT", "RU", "SE", "US"]
+    regions = ["Africa", "America", "Antarctica", "Asia", "Atlantic", "Australia",
+               "Europe", "Indian", "Pacific"]
+    return {
+        ("localectl", "list-locales"): "\n".join(
+            f"{lang}_{country}.UTF-8" for lang in languages for country in countries
+        ),
+        ("localectl", "list-keymaps"): "\n".join(
+            f"{lang}-{variant}" for lang in languages
+            for variant in ("latin1", "nodeadkeys", "mac", "dvorak", "intl", "alt",
+                            "qwerty", "qwertz", "azerty", "std", "ext", "win")
+        ),
+        ("timedatectl", "list-timezones"): "\n".join(
+            [f"{region}/City{idx:02d}" for region in regions for idx in range(66)] + ["UTC"]
+        ),
+        ("localectl", "status"): "System Locale: LANG=en_US.UTF-8\n    VC Keymap: de-latin1\n",
+        ("timedatectl", "show"): "Europe/City10\n",
+        ("timedatectl", "status"): "Network time on: yes\nNTP synchronized: yes\n",
+        ("hostnamectl",): "bench.example.com\n",
+        ("systemctl", "is-active"): "active\n",
+        ("systemctl", "is-enabled"): "enabled\n",
+    }
+
+
+CANNED: Dict[Tuple[str, ...], str] = _canned_lists()
+
+
+def _canned(cmd: Any) -> str:
+    args = cmd.split() if isinstance(cmd, str) else [str(arg) for arg in cmd]
+    for prefix, out in CANNED.items():
+        if tuple(args[:len(prefix)]) == prefix:
+            return out
+    return ""
+
+
+def _encode(out: str, kwargs: Dict[str, Any]):
+    text = kwargs.get("text") or kwargs.get("universal_newlines") or kwargs.get("encoding")
+    return out if text else out.encode()
+
+
+def _run(cmd, *_args, **kwargs) -> subprocess.CompletedProcess:
+    out = _encode(_canned(cmd), kwargs)
+    return subprocess.CompletedProcess(cmd, 0, stdout=out, stderr=out[:0])
+
+
+def _check_output(cmd, *_args, **kwargs):
+    return _encode(_canned(cmd), kwargs)
+
+
+class _Popen:
+    """subprocess.Popen answering from CANNED; the command exits with 0."""
+    returncode = 0
+    pid = 4242
+
+    def __init__(self, cmd, *_args, **kwargs):
+        self.args = cmd
+        self._out = _encode(_canned(cmd), kwargs)
+        self.stdout = io.BytesIO(self._out) if isinstance(self._out, bytes) else io.StringIO(
+            self._out)
+        self.stdin = io.BytesIO()
+        self.stderr = None
+
+    def communicate(self, *_args, **_kwargs):
+        return self._out, self._out[:0]
+
+    def wait(self, *_args, **_kwargs) -> int:
+        return 0
+
+    def poll(self) -> int:
+        return 0
+
+    def terminate(self):
+        """The canned command has finished already."""
+
+    def kill(self):
+        """The canned command has finished already."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _AsyncProcess:
+    """asyncio.subprocess.Process answering from CANNED."""
+    returncode = 0
+    pid = 4242
+
+    def __init__(self, cmd: List[str], stdout: Any):
+        self._out = _canned(cmd).encode() if stdout == subprocess.PIPE else None
+
+    async def communicate(self, *_args):
+        return self._out, None
+
+    async def wait(self) -> int:
+        return 0
+
+    def kill(self):
+        """The canned command has finished already."""
+
+
+async def _create_subprocess_exec(*cmd, stdout=None, **_kwargs):
+    return _AsyncProcess(list(cmd), stdout)
+
+
+def _fake_psutil() -> types.ModuleType:
+    snicaddr = collections.namedtuple("snicaddr", "family address netmask broadcast ptp")
+    snicstats = collections.namedtuple("snicstats", "isup duplex speed mtu flags")
+    scpufreq = collections.namedtuple("scpufreq", "current min max")
+    svmem = collections.namedtuple("svmem", "total available percent used free")
+    module = types.ModuleType("psutil")
+    module.AF_LINK = getattr(socket, "AF_PACKET", 17)
+    addrs = {
+        "lo": [snicaddr(socket.AF_INET, "127.0.0.1", "255.0.0.0", None, None)],
+        "eth0": [
+            snicaddr(socket.AF_INET, "192.0.2.10", "255.255.255.0", "192.0.2.255", None),
+            snicaddr(socket.AF_INET6, "2001:db8::10", "ffff:ffff:ffff:ffff::", None, None),
+            snicaddr(module.AF_LINK, "52:54:00:12:34:56", None, None, None),
+        ],
+    }
+    module.net_if_addrs = lambda: addrs
+    module.net_if_stats = lambda: {
+        "lo": snicstats(True, 0, 0, 65536, "up,loopback,running"),
+        "eth0": snicstats(True, 2, 1000, 1500, "up,broadcast,running,multicast"),
+    }
+    module.cpu_freq = lambda percpu=False: scpufreq(2400.0, 800.0, 3600.0)
+    module.virtual_memory = lambda: svmem(8 << 30, 6 << 30, 25.0, 2 << 30, 4 << 30)
+    module.cpu_count = lambda logical=True: 8 if logical else 4
+    module.boot_time = lambda: 1760000000.0
+    return module
+
+
+def _fake_journal() -> types.ModuleType:
+    base = datetime.datetime(2026, 10, 16, 8, 0, 0)
+    # Readable end of the journal's file descriptor, and the end signalling
+    # new entries (after raising JOURNAL_ENTRIES)
+    wakeup = os.pipe()
+    os.set_blocking(wakeup[0], False)
+
+    class Reader:
+        """systemd.journal.Reader over JOURNAL_ENTRIES entries of the matched units.
+
+        The entries take turns between the matched units.
+        """
+        def __init__(self, *_args, **_kwargs):
+            self.units = []
+            # Index of the current entry; -1 is before the first one
+            self.pos = -1
+
+        def this_boot(self, *_args):
+            """All entries are of this boot."""
+
+        def add_match(self, *_args, **kwargs):
+            if "_SYSTEMD_UNIT" in kwargs:
+                self.units.append(kwargs["_SYSTEMD_UNIT"])
+
+        def _entry(self, idx):
+            return {
+                "__REALTIME_TIMESTAMP": base + datetime.timedelta(seconds=idx),
+                "PRIORITY": 6 - idx % 4,
+                "_SYSTEMD_UNIT": (self.units or ["gromox-http.service"])[idx % max(len(self.units), 1)],
+                "MESSAGE": f"request {idx} served in {idx % 97} ms",
+                "__CURSOR": f"i={idx}",
+            }
+
+        def seek_head(self):
+            self.pos = -1
+
+        def seek_cursor(self, cursor):
+            # The next entry is the one at cursor
+            self.pos = int(cursor.split("=")[1]) - 1
+
+        def seek_realtime(self, when):
+            seconds = (when - base).total_seconds()
+            self.pos = min(max(math.ceil(seconds), 0), JOURNAL_ENTRIES) - 1
+
+        def seek_tail(self):
+            self.pos = JOURNAL_ENTRIES
+
+        def get_next(self, skip=1):
+            # Stays on the last entry at the end, as the journal does
+            if self.pos + skip >= JOURNAL_ENTRIES:
+                return {}
+            self.pos += skip
+            return self._entry(self.pos)
+
+        def get_previous(self, skip=1):
+            if self.pos - skip < 0:
+                return {}
+            self.pos -= skip
+            return self._entry(self.pos)
+
+        def fileno(self):
+            return wakeup[0]
+
+        def process(self):
+            try:
+                os.read(wakeup[0], 4096)
+            except BlockingIOError:
+                pass
+            return 1
+
+        def close(self):
+            """Nothing to release."""
+
+        def __iter__(self):
+            while True:
+                entry = self.get_next()
+                if not entry:
+                    return
+                yield entry
+
+    module = types.ModuleType("systemd.journal")
+    module.Reader = Reader
+    module.wakeup = wakeup[1]
+    module.LOG_INFO = 6
+    return module
+
+
+def _fake_pamela() -> types.ModuleType:
+    module = types.ModuleType("pamela")
+
+    class PAMError(Exception):
+        """Raised for a wrong password."""
+
+    def authenticate(_username, password, _service="login"):
+        if password != "secret":
+            raise PAMError("Authentication failure")
+
+    module.PAMError = PAMError
+    module.authenticate = authenticate
+    return module
+
+
+class FakeScreen(urwid.BaseScreen):
+    """Stands in for urwid.raw_display.Screen: fixed size, no terminal."""
+
+    def get_cols_rows(self):
+        return SCREEN_SIZE
+
+    def draw_screen(self, size, canvas):
+        for _ in canvas.content():
+            pass
+
+    def clear(self):
+        """Nothing to clear."""
+
+    def tty_signal_keys(self, *args, **kwargs):
+        return ["undefined"] * 5
+
+    def set_terminal_properties(self, *args, **kwargs):
+        """No terminal."""
+
+    def hook_event_loop(self, event_loop, callback):
+        """The input is fed by the benchmark."""
+
+    def unhook_event_loop(self, event_loop):
+        """The input is fed by the benchmark."""
+
+
+def install_stubs(cache_dir: str):
+    """Replace the host interfaces before cui is imported."""
+    subprocess.run = _run
+    subprocess.check_output = _check_output
+    subprocess.Popen = _Popen
+    os.system = lambda cmd: _canned(cmd) and 0
+    asyncio.create_subprocess_exec = _create_subprocess_exec
+    sys.modules["psutil"] = _fake_psutil()
+    systemd = types.ModuleType("systemd")
+    systemd.journal = _fake_journal()
+    sys.modules["systemd"] = systemd
+    sys.modules["systemd.journal"] = systemd.journal
+    sys.modules["pamela"] = _fake_pamela()
+    sys.argv = [sys.argv[0]]
+    sys.path.insert(0, ROOT)
+
+    with warnings.catch_warnings():
+        # cui.util still creates the screen from the urwid.raw_display alias
+        warnings.simplefilter("ignore", DeprecationWarning)
+        urwid.raw_display.Screen = FakeScreen
+    from cui import factcache, util  # pylint: disable=import-outside-toplevel
+    factcache.CACHE_DIR = cache_dir
+    # The login dialog is only shown if the user has a password in /etc/shadow
+    util.check_if_password_is_set = lambda user: True
+
+
+# --- replay -----------------------------------------------------------------
+
+class Replay:
+    """One Application replaying one scenario."""
+
+    def __init__(self):
+        import cui  # pylint: disable=import-outside-toplevel
+        self.app = cui.Application()
+        self.app.set_debug(False)
+        self.app.view.gscreen.quiet = True
+        self.loop = self.app.control.app_control.loop
+        self.app.prepare_mainscreen()
+        self.loop.widget = self.app.control.app_control.body
+        self.loop.screen.start()
+        self.settle()
+
+    def settle(self):
+        """Let the background tasks of the last key finish and paint the frame."""
+        aio = self.loop.asyncio_loop
+        deadline = time.monotonic() + SETTLE_TIMEOUT
+        # pylint: disable=protected-access
+        while self.loop._tasks and time.monotonic() < deadline:
+            aio.run_until_complete(asyncio.wait(list(self.loop._tasks), timeout=SETTLE_TIMEOUT))
+            # The task callbacks are delivered as alarms
+            aio.run_until_complete(asyncio.sleep(0))
+        aio.run_until_complete(asyncio.sleep(0))
+        self.loop.entering_idle()
+
+    def press(self, key: str) -> bool:
+        """Feed key and paint; return False if it ended the main loop."""
+        try:
+            self.loop.process_input([key])
+        except urwid.ExitMainLoop:
+            return False
+        self.settle()
+        return True
+
+    def window(self) -> str:
+        """Return the symbol of the current window."""
+        return self.app.control.app_control.current_window
+
+    def close(self):
+        """Release the event loop of the application."""
+        for task in list(self.loop._tasks):  # pylint: disable=protected-access
+            task.cancel()
+        self.loop.asyncio_loop.close()
+
+
+def time_scenario(keys: List[str]) -> Tuple[List[float], int, str]:
+    """Return the latency of each key in seconds, the frames painted and the final window."""
+    replay = Replay()
+    frames = replay.loop.frames
+    latencies = []
+    try:
+        for key in keys:
+            start = time.perf_counter()
+            if not replay.press(key):
+                break
+            latencies.append(time.perf_counter() - start)
+        return latencies, replay.loop.frames - frames, replay.window()
+    finally:
+        replay.close()
+
+
+def trace_scenario(keys: List[str]) -> Tuple[List[int], int]:
+    """Return the peak allocation of each key and the memory retained, in bytes."""
+    replay = Replay()
+    peaks = []
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        for key in keys:
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            if not replay.press(key):
+                break
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+        replay.close()
+    return peaks, retained
+
+
+def run_scenario(name: str, runs: int, alloc: bool = True) -> Dict[str, Any]:
+    """Replay scenario name runs times and return its figures."""
+    from cui.profiling import percentiles  # pylint: disable=import-outside-toplevel
+    keys, expected = SCENARIOS[name]
+    latencies: List[float] = []
+    frames = 0
+    window = ""
+    for _ in range(max(runs, 1)):
+        times, frames, window = time_scenario(keys)
+        latencies.extend(times)
+    p50, p95, peak = percentiles(latencies)
+    result = {
+        "keys": len(keys),
+        "window": window,
+        "expected_window": expected,
+        "frames": frames,
+        "latency_ms": {"p50": round(p50 * 1000, 3), "p95": round(p95 * 1000, 3),
+                       "max": round(peak * 1000, 3)},
+        "alloc_kib": None,
+    }
+    if alloc:
+        # A pass of its own, tracemalloc slows everything down
+        peaks, retained = trace_scenario(keys)
+        result["alloc_kib"] = {
+            "peak_p50": round(percentiles(peaks)[0] / 1024, 1),
+            "peak_max": round(percentiles(peaks)[2] / 1024, 1),
+            "retained": round(retained / 1024, 1),
+        }
+    return result
+
+
+def compare(results: Dict[str, Any], previous: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return the scenarios whose p95 latency regressed against previous."""
+    failed = []
+    for name, result in results["scenarios"].items():
+        old = previous.get("scenarios", {}).get(name)
+        if old is None:
+            continue
+        new_p95 = result["latency_ms"]["p95"]
+        old_p95 = old["latency_ms"]["p95"]
+        change = (new_p95 - old_p95) / old_p95 * 100 if old_p95 > 0 else 0.0
+        print(f"  {name:<20} p95 {old_p95:8.1f} -> {new_p95:8.1f} ms ({change:+.0f}%)")
+        if change > tolerance and new_p95 - old_p95 > MIN_REGRESSION_MS:
+            failed.append(name)
+    return failed
+
+
+def main(argv: List[str]) -> int:
+    """Run the benchmark and return the exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to replay, may be repeated (default: all)")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS,
+                        help="timed replays per scenario (default: %(default)s)")
+    parser.add_argument("--no-alloc", action="store_true",
+                        help="skip the allocation pass under tracemalloc")
+    parser.add_argument("--json", metavar="FILE",
+                        help="write the results as JSON to FILE ('-' for stdout)")
+    parser.add_argument("--compare", metavar="FILE",
+                        help="compare with the JSON results of a previous run")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed p95 latency regression in percent (default: %(default)s)")
+    args = parser.parse_args(argv)
+    previous: Optional[Dict[str, Any]] = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file_handle:
+            previous = json.load(file_handle)
+
+    with tempfile.TemporaryDirectory(prefix="cui-bench-") as cache_dir:
+        install_stubs(cache_dir)
+        with open(os.path.join(ROOT, "version.txt"), encoding="utf-8") as file_handle:
+            version = file_handle.read().strip()
+        results: Dict[str, Any] = {
+            "format": RESULT_FORMAT,
+            "version": version,
+            "python": platform.python_version(),
+            "urwid": urwid.__version__,
+            "screen": list(SCREEN_SIZE),
+            "runs": args.runs,
+            "scenarios": {},
+        }
+        for name in args.scenario or sorted(SCENARIOS):
+            results["scenarios"][name] = run_scenario(name, args.runs, not args.no_alloc)
+
+    failed = False
+    report = sys.stderr if args.json == "-" else sys.stdout
+    print(f"{'scenario':<20} {'keys':>5} {'frames':>6} {'p50':>8} {'p95':>8} {'max':>8} ms"
+          f" {'alloc p50':>10} {'max':>8} {'retained':>9} KiB", file=report)
+    for name, result in results["scenarios"].items():
+        latency = result["latency_ms"]
+        line = (f"{name:<20} {result['keys']:>5} {result['frames']:>6} {latency['p50']:8.1f} "
+                f"{latency['p95']:8.1f} {latency['max']:8.1f}   ")
+        alloc = result["alloc_kib"]
+        if alloc is not None:
+            line += (f" {alloc['peak_p50']:10.1f} {alloc['peak_max']:8.1f} "
+                     f"{alloc['retained']:9.1f}")
+        print(line, file=report)
+        if result["window"] != result["expected_window"]:
+            print(f"FAIL: {name} ended on {result['window']} instead of "
+                  f"{result['expected_window']}", file=report)
+            failed = True
+    if args.json == "-":
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as file_handle:
+            json.dump(results, file_handle, indent=2)
+    if previous is not None:
+        print(f"compared with {args.compare} (version {previous.get('version', '?')}):",
+              file=report)
+        regressed = compare(results, previous, args.tolerance)
+        if regressed:
+            print(f"FAIL: p95 latency regressed by more than {args.tolerance:g}%: "
+                  + ", ".join(regressed), file=report)
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
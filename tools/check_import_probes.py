@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: 2026 grommunio GmbH
+"""Check that importing the console UI does not probe the host.
+
+Imports cui.classes.application with subprocess.Popen, os.system, os.popen,
+asyncio.create_subprocess_exec and the functions of psutil replaced by
+recorders, and fails if any of them was called: the host is probed when
+the screens are built, not at import.
+
+urwid is imported before the recorders are installed: its optional event
+loop libraries look up system libraries with ldconfig and uname at import,
+which is not ours to change (see EXCLUDED_MODULES of check_import_time.py).
+
+    python3 tools/check_import_probes.py [--module NAME]
+"""
+import argparse
+import asyncio
+import importlib
+import inspect
+import os
+import subprocess
+import sys
+import traceback
+from typing import Any, Callable, List, Tuple
+
+import psutil
+# Imported before the recorders on purpose: its own import probes the host
+import urwid  # noqa: F401
+
+DEFAULT_MODULE: str = "cui.classes.application"
+
+# (probe, location in cui) of every call
+_CALLS: List[Tuple[str, str]] = []
+
+
+def _caller() -> str:
+    """Return the innermost cui frame of the current stack."""
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        if f"{os.sep}cui{os.sep}" in frame.filename:
+            return f"{frame.filename}:{frame.lineno}"
+    return "?"
+
+
+def _recorder(name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    """Return a stand-in for func which records its calls and then makes them."""
+    def record(*args, **kwargs):
+        _CALLS.append((name, _caller()))
+        return func(*args, **kwargs)
+    return record
+
+
+def install_recorders():
+    """Replace the process spawning functions and psutil's functions."""
+    popen = subprocess.Popen
+
+    class RecordingPopen(popen):  # pylint: disable=too-few-public-methods
+        """subprocess.Popen recording its instances."""
+        def __init__(self, *args, **kwargs):
+            _CALLS.append(("subprocess.Popen", _caller()))
+            super().__init__(*args, **kwargs)
+
+    subprocess.Popen = RecordingPopen
+    os.system = _recorder("os.system", os.system)
+    os.popen = _recorder("os.popen", os.popen)
+    asyncio.create_subprocess_exec = _recorder(
+        "asyncio.create_subprocess_exec", asyncio.create_subprocess_exec
+    )
+    for name, func in inspect.getmembers(psutil, inspect.isfunction):
+        if not name.startswith("_"):
+            setattr(psutil, name, _recorder(f"psutil.{name}", func))
+
+
+def main(argv: List[str]) -> int:
+    """Run the check and return the exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default=DEFAULT_MODULE,
+                        help="module to import (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    if any(name == "cui" or name.startswith("cui.") for name in sys.modules):
+        print("FAIL: cui was imported before the recorders were installed")
+        return 1
+    install_recorders()
+    importlib.import_module(args.module)
+
+    if _CALLS:
+        print(f"FAIL: importing {args.module} probed the host:")
+        for name, where in _CALLS:
+            print(f"  {name:<36} {where}")
+        return 1
+    print(f"import {args.module}: no subprocess and no psutil call "
+          f"(urwid {urwid.__version__} imported before)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
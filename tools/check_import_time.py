@@ -0,0 +1,153 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: 2026 grommunio GmbH
+"""Cold import time benchmark of the cui package.
+
+Imports cui in fresh interpreters with ``python -X importtime`` and fails if
+one of the modules which are deliberately imported on first use is loaded at
+import already, or if its import time regressed.
+
+The import time depends on the machine, so it is compared with the import
+time of cui at a baseline revision (--baseline), measured in turns with the
+working tree by the same interpreter, and may exceed it by the tolerance.
+--budget sets an absolute limit instead, for a known machine.
+
+urwid itself is not counted: it is needed for the first paint anyway and its
+import time depends mostly on the optional event loop libraries installed
+next to it.
+
+    python3 tools/check_import_time.py [--baseline REV] [--tolerance PCT]
+                                       [--budget MS] [--runs N]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+# Only needed by single dialogs or actions, never for the first paint
+DEFERRED_MODULES: Tuple[str, ...] = (
+    "requests",
+    "yaml",
+    "systemd.journal",
+    "cffi",
+    "configobj",
+    "pamela",
+)
+# Baked in third-party toolkits whose import time is not ours to budget
+EXCLUDED_MODULES: Tuple[str, ...] = ("urwid",)
+DEFAULT_RUNS: int = 5
+# Allowed import time regression against --baseline, in percent
+DEFAULT_TOLERANCE: float = 10.0
+# Regressions below this many milliseconds are noise
+MIN_REGRESSION_MS: float = 5.0
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)$")
+
+
+def measure(root: str) -> Dict[str, Tuple[int, int]]:
+    """Return {module: (self us, cumulative us)} of one cold import of cui."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import cui"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=env, check=False,
+    )
+    stderr = proc.stderr.decode(errors="replace")
+    if proc.returncode != 0:
+        errors = [line for line in stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError("import cui failed:\n" + "\n".join(errors))
+    modules: Dict[str, Tuple[int, int]] = {}
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return modules
+
+
+def cost(modules: Dict[str, Tuple[int, int]]) -> int:
+    """Return the cumulative import time of cui in us, without EXCLUDED_MODULES."""
+    return modules["cui"][1] - sum(
+        modules[name][1] for name in EXCLUDED_MODULES if name in modules
+    )
+
+
+def export(root: str, rev: str, dest: str):
+    """Write the cui package of revision rev of the git tree at root to dest."""
+    archive = subprocess.run(
+        ["git", "-C", root, "archive", rev, "cui"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False,
+    )
+    if archive.returncode != 0:
+        raise RuntimeError(f"git archive {rev} failed:\n" + archive.stderr.decode(errors="replace"))
+    subprocess.run(["tar", "-x", "-C", dest], input=archive.stdout, check=True)
+
+
+def main(argv: List[str]) -> int:
+    """Run the benchmark and return the exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", metavar="REV",
+                        help="git revision whose import time is the budget")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed regression against --baseline in percent "
+                             "(default: %(default)s)")
+    parser.add_argument("--budget", type=float,
+                        help="absolute import time budget in ms without urwid")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS,
+                        help="imports to measure, the fastest counts (default: %(default)s)")
+    parser.add_argument("--top", type=int, default=10,
+                        help="show the N slowest cui modules (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    runs = []
+    base_runs = []
+    try:
+        with tempfile.TemporaryDirectory() as base_root:
+            if args.baseline:
+                export(root, args.baseline, base_root)
+            # In turns, so that the load of the machine hits both alike
+            for _ in range(max(args.runs, 1)):
+                runs.append(measure(root))
+                if args.baseline:
+                    base_runs.append(measure(base_root))
+    except RuntimeError as error:
+        print(f"FAIL: {error}")
+        return 1
+    best = min(runs, key=cost)
+    total_ms = best["cui"][1] / 1000
+    cost_ms = cost(best) / 1000
+
+    own = sorted(
+        ((name, times[0]) for name, times in best.items() if name.split(".")[0] == "cui"),
+        key=lambda item: item[1], reverse=True,
+    )
+    print(f"import cui: {cost_ms:.1f} ms without urwid, {total_ms:.1f} ms in total "
+          f"(best of {len(runs)})")
+    for name, self_us in own[:args.top]:
+        print(f"  {name:<32} {self_us / 1000:8.1f} ms self")
+
+    failed = False
+    eager = [name for name in DEFERRED_MODULES if name in best]
+    if eager:
+        print("FAIL: imported eagerly: " + ", ".join(eager))
+        failed = True
+    if base_runs:
+        base_ms = min(cost(modules) for modules in base_runs) / 1000
+        limit_ms = max(base_ms * (1 + args.tolerance / 100), base_ms + MIN_REGRESSION_MS)
+        print(f"baseline {args.baseline}: {base_ms:.1f} ms without urwid "
+              f"(limit {limit_ms:.1f} ms)")
+        if cost_ms > limit_ms:
+            print(f"FAIL: import time exceeds the baseline by {cost_ms - base_ms:.1f} ms "
+                  f"({(cost_ms - base_ms) / base_ms * 100:+.0f}%)")
+            failed = True
+    if args.budget is not None and cost_ms > args.budget:
+        print(f"FAIL: import time exceeds the budget by {cost_ms - args.budget:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
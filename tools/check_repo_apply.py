@@ -0,0 +1,215 @@
+#!/usr/bin/python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# SPDX-FileCopyrightText: 2026 grommunio GmbH
+"""Check of cui.repository.RepoApply against a local HTTP stand-in.
+
+Serves a repository key with http.server on 127.0.0.1 and runs RepoApply
+with the key import and the repository refresh replaced by a command doing
+nothing. Checks the download progress (bytes received of the announced
+total), a missing key (404), cancelling in the middle of the download and
+the timeout of the whole run, and fails if one of them misbehaves.
+
+    python3 tools/check_repo_apply.py
+"""
+import asyncio
+import http.server
+import os
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from cui import distro, repository  # noqa: E402
+
+KEY: bytes = b"-----BEGIN PGP PUBLIC KEY BLOCK-----\n" + b"k" * 60000 + b"\n"
+# Chunks and the pause between them of the served key
+SERVE_CHUNK: int = 4096
+SERVE_PAUSE: float = 0.02
+# Pause between the chunks of the key which never finishes downloading
+TRICKLE_PAUSE: float = 0.2
+# A cancelled or timed out run has to return within this many seconds
+RETURN_BUDGET: float = 2.0
+# Command standing in for the key import and the repository refresh
+NOOP_CMD: List[str] = [sys.executable, "-c", ""]
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """Serves /key slowly, /trickle never completely and nothing else."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Answer the key download."""
+        if self.path not in ("/key", "/trickle"):
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/pgp-keys")
+        self.send_header("Content-Length", str(len(KEY)))
+        self.end_headers()
+        pause = SERVE_PAUSE if self.path == "/key" else TRICKLE_PAUSE
+        chunks = range(0, len(KEY), SERVE_CHUNK)
+        if self.path == "/trickle":
+            # Never sends the last chunk
+            chunks = chunks[:-1]
+        try:
+            for start in chunks:
+                self.wfile.write(KEY[start:start + SERVE_CHUNK])
+                self.wfile.flush()
+                time.sleep(pause)
+            if self.path == "/trickle":
+                time.sleep(60)
+        except OSError:
+            # The client gave up
+            pass
+
+    def log_message(self, *_args):
+        """Keep the report readable."""
+
+
+class _Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+def _apply(url: str, keyfile: str, timeout: float = repository.APPLY_TIMEOUT,
+           cancel_after_bytes: int = 0) -> Tuple[repository.RepoApply, str, List, float]:
+    """Run RepoApply; return it, its result, the progress samples and the run time.
+
+    With cancel_after_bytes, the run is cancelled once that many bytes arrived.
+    """
+    job = repository.RepoApply(url, keyfile, timeout=timeout)
+    samples: List[Tuple[int, int]] = []
+    cancelled_at: List[float] = []
+
+    async def watch():
+        while True:
+            samples.append((job.received, job.total))
+            if cancel_after_bytes and job.received >= cancel_after_bytes and not cancelled_at:
+                cancelled_at.append(time.monotonic())
+                job.cancel()
+            await asyncio.sleep(0.01)
+
+    async def main() -> str:
+        watcher = asyncio.ensure_future(watch())
+        try:
+            return await job.run()
+        finally:
+            watcher.cancel()
+
+    loop = asyncio.new_event_loop()
+    start = time.monotonic()
+    try:
+        result = loop.run_until_complete(main())
+    finally:
+        loop.close()
+    end = time.monotonic()
+    return job, result, samples, end - (cancelled_at[0] if cancelled_at else start)
+
+
+def check_progress(base: str, tmp: str) -> List[str]:
+    """The key arrives with its size announced, and the run completes."""
+    keyfile = os.path.join(tmp, "progress.key")
+    job, result, samples, _elapsed = _apply(f"{base}/key", keyfile)
+    errors = []
+    if result:
+        errors.append(f"run failed: {result}")
+    if job.total != len(KEY) or job.received != len(KEY):
+        errors.append(f"received {job.received} of {job.total}, expected {len(KEY)}")
+    if not any(0 < received < len(KEY) for received, _ in samples):
+        errors.append("no progress seen between the first and the last byte")
+    if job.stage != repository.STAGE_DONE or job.fraction() != 1.0:
+        errors.append(f"ended in stage {job.stage} at {job.fraction():.2f}")
+    if not os.path.isfile(keyfile) or open(keyfile, "rb").read() != KEY:
+        errors.append("the key file does not hold the key")
+    return errors
+
+
+def check_missing(base: str, tmp: str) -> List[str]:
+    """A missing key fails the run before anything is written."""
+    keyfile = os.path.join(tmp, "missing.key")
+    job, result, _samples, _elapsed = _apply(f"{base}/missing", keyfile)
+    errors = []
+    if not result:
+        errors.append("run succeeded")
+    if job.stage != repository.STAGE_DOWNLOAD:
+        errors.append(f"went on to stage {job.stage}")
+    if os.path.exists(keyfile):
+        errors.append("the key file was written")
+    return errors
+
+
+def check_cancel(base: str, tmp: str) -> List[str]:
+    """Cancelling in the middle of the download returns right away."""
+    keyfile = os.path.join(tmp, "cancel.key")
+    job, result, _samples, elapsed = _apply(
+        f"{base}/trickle", keyfile, cancel_after_bytes=SERVE_CHUNK
+    )
+    errors = []
+    expected = repository._("The repository update has been cancelled.")
+    if result != expected:
+        errors.append(f"returned {result!r}, expected {expected!r}")
+    if not 0 < job.received < len(KEY):
+        errors.append(f"cancelled after {job.received} bytes, not during the download")
+    if elapsed > RETURN_BUDGET:
+        errors.append(f"returned {elapsed:.1f} s after cancel()")
+    if os.path.exists(keyfile):
+        errors.append("the key file was written")
+    return errors
+
+
+def check_timeout(base: str, tmp: str) -> List[str]:
+    """A download outlasting the timeout of the whole run ends it."""
+    keyfile = os.path.join(tmp, "timeout.key")
+    timeout = 0.5
+    _job, result, _samples, elapsed = _apply(f"{base}/trickle", keyfile, timeout=timeout)
+    errors = []
+    expected = repository._(
+        "The repository update did not finish within %d seconds."
+    ) % timeout
+    if result != expected:
+        errors.append(f"returned {result!r}, expected {expected!r}")
+    if elapsed > timeout + RETURN_BUDGET:
+        errors.append(f"returned after {elapsed:.1f} s")
+    if os.path.exists(keyfile):
+        errors.append("the key file was written")
+    return errors
+
+
+CHECKS: List[Tuple[str, Callable[[str, str], List[str]]]] = [
+    ("progress", check_progress),
+    ("404", check_missing),
+    ("cancel", check_cancel),
+    ("timeout", check_timeout),
+]
+
+
+def main() -> int:
+    """Run the checks and return the exit code."""
+    distro.pkg_import_key_cmd = lambda _keyfile: NOOP_CMD
+    distro.pkg_refresh_cmd = lambda: NOOP_CMD
+    server = _Server(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    failed = False
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, check in CHECKS:
+                errors = check(base, tmp)
+                print(f"  {name:<10} {'FAIL' if errors else 'ok'}")
+                for error in errors:
+                    print(f"    {error}")
+                failed = failed or bool(errors)
+    finally:
+        server.shutdown()
+        server.server_close()
+    if failed:
+        print("FAIL: RepoApply misbehaved")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())